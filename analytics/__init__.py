@@ -0,0 +1,25 @@
+"""Расчётные модули дашборда (без зависимостей от Streamlit)"""
+
+from analytics.allocation import Allocation, allocate, parse_capacity, production_from_crops
+from analytics.concentration import concentration, subsidy_concentration
+from analytics.localization import (
+    Localization,
+    compute_localization,
+    localization_table,
+    weighted_localization,
+)
+from analytics.montecarlo import simulate
+
+__all__ = [
+    "Allocation",
+    "Localization",
+    "allocate",
+    "compute_localization",
+    "concentration",
+    "localization_table",
+    "parse_capacity",
+    "production_from_crops",
+    "simulate",
+    "subsidy_concentration",
+    "weighted_localization",
+]
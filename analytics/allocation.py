@@ -0,0 +1,181 @@
+"""
+Распределение продукции по перерабатывающим мощностям района.
+
+Мощности в перечне записаны текстом («5000 т/год», «150000 т»);
+parse_capacity() переводит их в тонны в год. allocate() решает задачу
+линейного программирования: сколько тонн каждой продукции направить на
+каждое предприятие, чтобы в районе осталось больше всего добавленной
+стоимости, если продукции не больше, чем произведено, а загрузка
+предприятия не выше его мощности. Результат — предел местной переработки
+и К_локализации при нынешних мощностях и узкие места: предприятия, чья
+мощность ограничивает результат (теневая цена > 0 — сколько тенге
+добавленной стоимости даст ещё одна тонна мощности в год).
+
+Матрица ограничений разреженная, задачу решает HiGHS (scipy) — сотни
+предприятий по всем районам области решаются за миллисекунды, поэтому
+страница пересчитывает её при каждом изменении сценария.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.localization import compute_localization, weighted_localization
+from analytics.yields import YIELD_NORMS
+
+# Рабочих дней в году — для мощностей, записанных в сутки или смены
+WORK_DAYS = 300
+# Единица периода -> множитель до года; без периода (склад, элеватор) —
+# вместимость, которая заполняется один раз за сезон
+PERIODS = {'': 1, 'год': 1, 'мес': 12, 'сут': WORK_DAYS, 'смен': WORK_DAYS}
+SCALES = {'': 1, 'тыс': 1_000, 'млн': 1_000_000}
+_CAPACITY_RE = (r'^\s*(?P<number>\d[\d\s ]*(?:[.,]\d+)?)\s*(?P<scale>тыс|млн)?\.?\s*'
+                r'(?:т|тонн[а-я]*)?\.?\s*(?:/\s*(?P<period>год|мес|сут|смен)[а-я]*\.?)?\s*$')
+
+# Тип предприятия (начало названия в нижнем регистре) -> продукция, которую
+# оно принимает, и доля её добавленной стоимости, остающаяся в районе.
+# Элеватор не перерабатывает, но подработка и хранение до весны оставляют
+# в районе часть разницы цен — оценка, как и доли в load_value_chain_flows().
+ELEVATOR_SHARE = 0.2
+FACILITY_PRODUCTS = {
+    'мельниц': {'Зерно': 1.0},
+    'элеватор': {'Зерно': ELEVATOR_SHARE},
+    'комбикорм': {'Корма': 1.0, 'Зерно': 1.0},
+    'мясо': {'Мясо КРС': 1.0},
+    'молок': {'Молоко': 1.0},
+    'хранение овощ': {'Овощи': 1.0},
+}
+
+# Культура в книге посевов -> продукция цепочки (урожайность — норма из analytics/yields.py)
+CROP_PRODUCTS = {
+    'Пшеница': 'Зерно',
+    'Ячмень': 'Зерно',
+    'Овёс': 'Зерно',
+    'Горох': 'Зерно',
+    'Кормовые': 'Корма',
+}
+
+
+class Allocation(NamedTuple):
+    """Результат allocate()"""
+    products: pd.DataFrame     # по продукции: оценка и предел местной переработки, К_локализации
+    facilities: pd.DataFrame   # по предприятиям: загрузка, теневая цена, узкое место
+    current: float             # К_локализации по оценкам долей, % (взвешенный по ДС)
+    maximum: float             # К_локализации при полной загрузке мощностей, %
+
+
+def parse_capacity(texts):
+    """Текст мощности -> «Мощность_т» (число в тоннах) и «Мощность_т_год».
+
+    Понимает «5000 т/год», «150 000 т», «1,5 тыс. т», «20 т/сут», «0»;
+    нераспознанный текст даёт NaN.
+    """
+    text = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower().str.replace('ё', 'е')
+    parts = text.str.extract(_CAPACITY_RE)
+    number = pd.to_numeric(parts['number'].str.replace(r'[\s ]', '', regex=True).str.replace(',', '.'),
+                           errors='coerce')
+    tonnes = number * parts['scale'].fillna('').map(SCALES)
+    per_year = tonnes * parts['period'].fillna('').map(PERIODS)
+    return pd.DataFrame({'Мощность_т': tonnes.to_numpy(dtype=np.float64),
+                         'Мощность_т_год': per_year.to_numpy(dtype=np.float64)}, index=text.index)
+
+
+def facility_products(kinds):
+    """Типы предприятий -> словари {продукция: доля ДС}; неизвестный тип — пустой словарь"""
+    lowered = pd.Series(kinds, dtype=object).fillna('').astype(str).str.lower()
+    return [next((products for prefix, products in FACILITY_PRODUCTS.items() if kind.startswith(prefix)), {})
+            for kind in lowered]
+
+
+def production_from_crops(crops):
+    """Производство по посевам (столбцы «<Культура>_факт» сводки хозяйств), т по продукции"""
+    tonnes = {}
+    for crop, product in CROP_PRODUCTS.items():
+        column = f'{crop}_факт'
+        if column in crops:
+            tonnes[product] = tonnes.get(product, 0.0) + crops[column].sum() * YIELD_NORMS[crop] / 10
+    return pd.Series(tonnes, dtype=np.float64)
+
+
+def allocate(flows, facilities, max_load=1.0):
+    """Наибольшая местная переработка при заданных мощностях.
+
+    flows — потоки продукции (load_value_chain_flows: «Продукция»,
+    «Производство_т», доли и цены); facilities — перечень мощностей с
+    «Тип_переработки» и «Мощность_т_год» (мощность строки — на все её
+    предприятия). Если в обеих таблицах есть «Район», продукция района
+    распределяется только по его предприятиям — все районы решаются одной
+    задачей. max_load — допустимая загрузка мощностей (доля).
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_array
+
+    by_district = 'Район' in flows and 'Район' in facilities
+    flows = flows.reset_index(drop=True)
+    facilities = facilities.reset_index(drop=True)
+    gap = (flows['Цена_конечная_тг'] - flows['Цена_производителя_тг']).clip(lower=0).to_numpy(dtype=np.float64)
+    supply = flows['Производство_т'].fillna(0).to_numpy(dtype=np.float64)
+    capacity = facilities['Мощность_т_год'].fillna(0).clip(lower=0).to_numpy(dtype=np.float64) * max_load
+
+    # Переменные — пары (продукция, предприятие), которые предприятие может принять
+    product_row = {(d, p): i for i, (d, p) in enumerate(zip(
+        flows['Район'] if by_district else [None] * len(flows), flows['Продукция']))}
+    rows, cols, share = [], [], []
+    districts = facilities['Район'] if by_district else [None] * len(facilities)
+    for f, (district, accepts) in enumerate(zip(districts, facility_products(facilities['Тип_переработки']))):
+        for product, weight in accepts.items():
+            p = product_row.get((district, product))
+            if p is not None and capacity[f] > 0:
+                rows.append(p)
+                cols.append(f)
+                share.append(weight)
+    rows, cols, share = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(share)
+    n_vars, n_products = len(rows), len(flows)
+
+    tonnes = np.zeros(n_vars)
+    supply_price = np.zeros(n_products)
+    capacity_price = np.zeros(len(facilities))
+    if n_vars:
+        # Строки ограничений: сначала продукция (≤ производства), затем предприятия (≤ мощности)
+        var = np.arange(n_vars)
+        a_ub = coo_array((np.ones(2 * n_vars), (np.r_[rows, n_products + cols], np.r_[var, var])),
+                         shape=(n_products + len(facilities), n_vars)).tocsr()
+        result = linprog(-gap[rows] * share, A_ub=a_ub, b_ub=np.r_[supply, capacity],
+                         bounds=(0, None), method='highs')
+        if result.status != 0:
+            raise RuntimeError(f"Задача распределения не решена: {result.message}")
+        tonnes = result.x
+        marginals = -result.ineqlin.marginals
+        supply_price, capacity_price = marginals[:n_products], marginals[n_products:]
+
+    # Эффективная местная переработка: тонны на элеваторах засчитываются с долей ДС
+    processed = np.bincount(rows, weights=tonnes * share, minlength=n_products)
+    loaded = np.bincount(cols, weights=tonnes, minlength=len(facilities))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        limit_pct = np.where(supply > 0, processed / supply * 100, 0.0)
+        used_pct = np.where(capacity > 0, loaded / (capacity / max_load) * 100, np.nan)
+
+    local_pct = flows['Местная_переработка_%'].to_numpy(dtype=np.float64)
+    astana_pct = flows['Вывоз_в_Астану_%'].to_numpy(dtype=np.float64)
+    prices = (flows['Цена_производителя_тг'].to_numpy(dtype=np.float64),
+              flows['Цена_конечная_тг'].to_numpy(dtype=np.float64))
+    now = compute_localization(local_pct, astana_pct, *prices, supply)
+    # Переработанное на месте сначала уменьшает вывоз за пределы области, потом — в Астану
+    best = compute_localization(limit_pct, np.minimum(astana_pct, 100 - limit_pct), *prices, supply)
+
+    products = flows[[c for c in ('Район', 'Продукция') if c in flows]].assign(
+        Производство_т=supply,
+        Переработка_т=processed,
+        **{'Местная_переработка_%': local_pct, 'Предел_переработки_%': limit_pct,
+           'К_локализации': now.coefficient, 'К_локализации_макс': best.coefficient},
+        Сырьё_исчерпано=supply_price > 1e-9,
+    )
+    facilities = facilities.assign(
+        Загрузка_т=loaded,
+        **{'Загрузка_макс_%': used_pct},
+        Теневая_цена_тг_т=capacity_price,
+        Узкое_место=capacity_price > 1e-9,
+    )
+    return Allocation(products, facilities,
+                      float(weighted_localization(now)), float(weighted_localization(best)))
@@ -0,0 +1,98 @@
+"""
+Концентрация субсидий: HHI, коэффициент Джини, доли топ-N и кривые Лоренца.
+
+Показатели считаются по суммам на получателя (выплаты одного получателя
+складываются) сразу для всех групп: получатели сортируются один раз по
+(группа, сумма), а суммы по группам берутся np.add.reduceat — без цикла
+Python по группам. Хранилище пересчитывает их только для района и года,
+чей реестр загружен заново (Store.replace_subsidies).
+"""
+
+import numpy as np
+import pandas as pd
+
+TOP_N = (1, 5, 10)
+# Кривая Лоренца: доля суммы у беднейших p% получателей, p = 0, 5, ..., 100%
+LORENZ_POINTS = np.linspace(0, 1, 21)
+
+# Разрезы концентрации: измерение -> столбец реестра (None — район в целом)
+DIMENSIONS = {
+    'Все': None,
+    'Тип': 'Тип',
+    'Программа': 'Программа',
+}
+ALL = 'Все получатели'
+
+
+def concentration(amounts, groups=None):
+    """Показатели концентрации по группам.
+
+    amounts — суммы на получателя, groups — метка группы каждого
+    получателя (None — одна группа). Возвращает DataFrame по группам:
+    число получателей, сумма, HHI (0–10 000), Джини (0–1), доли топ-N в %
+    и точки кривой Лоренца (массив длины LORENZ_POINTS).
+    """
+    x = np.asarray(amounts, dtype=np.float64)
+    codes, labels = pd.factorize(pd.Series(np.zeros(len(x)) if groups is None else groups), sort=True)
+    keep = (codes >= 0) & np.isfinite(x) & (x > 0)
+    x, codes = x[keep], codes[keep]
+    columns = ['Группа', 'Получателей', 'Сумма_тг', 'HHI', 'Джини'] + [f'Топ{n}_%' for n in TOP_N] + ['Лоренц']
+    if not len(x):
+        return pd.DataFrame(columns=columns)
+
+    order = np.lexsort((x, codes))
+    x, codes = x[order], codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    n = np.diff(np.r_[starts, len(x)])
+    total = np.add.reduceat(x, starts)
+    n_each = np.repeat(n, n)
+    total_each = np.repeat(total, n)
+    # Ранг по возрастанию суммы внутри группы: 1..n
+    rank = np.arange(len(x)) - np.repeat(starts, n) + 1
+
+    share = x / total_each
+    hhi = np.add.reduceat(share ** 2, starts) * 10_000
+    gini = 2 * np.add.reduceat(rank * x, starts) / (n * total) - (n + 1) / n
+    tops = {f'Топ{k}_%': np.add.reduceat(np.where(rank > n_each - k, share, 0), starts) * 100 for k in TOP_N}
+
+    cumulative = np.cumsum(x)
+    before = np.r_[0, cumulative[starts[1:] - 1]]
+    # Доля p приходится на pos = p·n получателей: целые k = floor(pos) и часть следующего
+    pos = LORENZ_POINTS[None, :] * n[:, None]
+    k = np.floor(pos).astype(np.int64)
+    head = np.where(k > 0, cumulative[starts[:, None] + np.maximum(k, 1) - 1] - before[:, None], 0)
+    nxt = x[starts[:, None] + np.minimum(k, n[:, None] - 1)]
+    at = head + np.where(k < n[:, None], (pos - k) * nxt, 0)
+    lorenz = at / total[:, None]
+
+    group_codes = codes[starts]
+    return pd.DataFrame({
+        'Группа': labels[group_codes] if groups is not None else ALL,
+        'Получателей': n,
+        'Сумма_тг': total,
+        'HHI': hhi,
+        'Джини': gini,
+        **tops,
+        'Лоренц': list(lorenz),
+    })[columns]
+
+
+def subsidy_concentration(registry):
+    """Концентрация реестра района за год во всех разрезах DIMENSIONS.
+
+    registry — выплаты или готовые итоги (Получатель, Тип, Программа,
+    Сумма_тг; БИН — если есть). Получатель в разрезе — сумма его выплат в
+    этой группе; «Доля_%» — доля группы в субсидиях района.
+    """
+    key = ['Получатель', 'БИН'] if 'БИН' in registry else ['Получатель']
+    frames = []
+    for dimension, column in DIMENSIONS.items():
+        by = key + ([column] if column else [])
+        per_recipient = registry.groupby(by, observed=True, dropna=False)['Сумма_тг'].sum().reset_index()
+        part = concentration(per_recipient['Сумма_тг'], per_recipient[column] if column else None)
+        part.insert(0, 'Измерение', dimension)
+        frames.append(part)
+    table = pd.concat(frames, ignore_index=True).rename(columns={'Группа': 'Значение'})
+    district_total = table.loc[table['Измерение'] == 'Все', 'Сумма_тг'].sum()
+    table.insert(4, 'Доля_%', table['Сумма_тг'] / district_total * 100 if district_total else np.nan)
+    return table
@@ -0,0 +1,102 @@
+"""
+Коэффициент локализации, утечка и маржа посредников.
+
+Все показатели считаются за один проход над массивами NumPy формы
+(продукты, районы, годы) — одинаково для 5 продуктов одного района и для
+всех продуктов всех районов страны за несколько лет. Пустые оси задаются
+размером 1, так что таблица потоков одного района — это массивы (P, 1, 1).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Доля добавленной стоимости, которая остаётся в районе при вывозе в Астану
+# (короткая цепочка, часть маржи получает фермер)
+ASTANA_WEIGHT = 0.3
+
+
+class Localization(NamedTuple):
+    """Результат расчёта; все поля — массивы формы (продукты, районы, годы)"""
+    coefficient: np.ndarray   # К_локализации, %
+    leakage: np.ndarray       # Потеря_стоимости_%: доля конечной цены, уходящая из района
+    margin: np.ndarray        # Маржа_посредников, % к цене производителя
+    local_value: np.ndarray   # Добавленная стоимость, оставшаяся в районе, тг
+    total_value: np.ndarray   # Добавленная стоимость до конечного потребителя, тг
+
+
+def compute_localization(local_pct, astana_pct, producer_price, final_price, production=None):
+    """Все показатели локализации одним векторизованным проходом.
+
+    Аргументы — массивы (или скаляры), приводимые к общей форме
+    (продукты, районы, годы). production (т) нужен только для стоимостных
+    показателей; без него local_value и total_value считаются на 1 т.
+    """
+    local = np.asarray(local_pct, dtype=np.float64) / 100
+    astana = np.asarray(astana_pct, dtype=np.float64) / 100
+    producer = np.asarray(producer_price, dtype=np.float64)
+    final = np.asarray(final_price, dtype=np.float64)
+    volume = np.float64(1) if production is None else np.asarray(production, dtype=np.float64)
+
+    gap = final - producer
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share_lost = np.where(final > 0, gap / final, np.nan)
+        margin = np.where(producer > 0, gap / producer * 100, np.nan)
+
+    coefficient = (local + astana * ASTANA_WEIGHT) * 100
+    leakage = share_lost * (1 - local) * 100
+    total_value = gap * volume
+    local_value = total_value * (local + astana * ASTANA_WEIGHT)
+
+    shape = np.broadcast_shapes(coefficient.shape, leakage.shape, total_value.shape)
+    return Localization(*(np.broadcast_to(a, shape) for a in
+                          (coefficient, leakage, margin, local_value, total_value)))
+
+
+def weighted_localization(result, axis=0):
+    """Коэффициент локализации, взвешенный по добавленной стоимости (по умолчанию — по продуктам)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return result.local_value.sum(axis=axis) / result.total_value.sum(axis=axis) * 100
+
+
+# Столбцы таблицы потоков -> аргументы compute_localization
+FLOW_COLUMNS = {
+    'local_pct': 'Местная_переработка_%',
+    'astana_pct': 'Вывоз_в_Астану_%',
+    'producer_price': 'Цена_производителя_тг',
+    'final_price': 'Цена_конечная_тг',
+    'production': 'Производство_т',
+}
+AXES = ('Продукция', 'Район', 'Год')
+
+
+def flows_to_arrays(flows):
+    """Таблица потоков (load_value_chain_flows) -> массивы формы (продукты, районы, годы)
+
+    Если в таблице нет столбцов «Район» или «Год», соответствующая ось
+    имеет размер 1. Отсутствующие сочетания заполняются NaN.
+    """
+    flows = flows.assign(**{c: '' for c in AXES[1:] if c not in flows})
+    cube = flows.set_index(list(AXES))
+    axes = [cube.index.unique(level=i) for i in range(len(AXES))]
+    cube = cube.reindex(pd.MultiIndex.from_product(axes))
+    shape = [len(a) for a in axes]
+    arrays = {arg: cube[col].to_numpy(dtype=np.float64).reshape(shape) for arg, col in FLOW_COLUMNS.items()}
+    return arrays, axes
+
+
+def localization_table(flows):
+    """Таблица потоков с добавленными столбцами показателей — для страниц и экспорта"""
+    arrays, axes = flows_to_arrays(flows)
+    result = compute_localization(**arrays)
+    out = pd.DataFrame({
+        'К_локализации': result.coefficient.reshape(-1),
+        'Потеря_стоимости_%': result.leakage.reshape(-1),
+        'Маржа_посредников_%': result.margin.reshape(-1),
+        'ДС_местная_тг': result.local_value.reshape(-1),
+        'ДС_общая_тг': result.total_value.reshape(-1),
+    }, index=pd.MultiIndex.from_product(axes, names=AXES))
+    keys = [c for c in AXES if c in flows]
+    out = out.droplevel([c for c in AXES if c not in flows]) if len(keys) < len(AXES) else out
+    return flows.join(out, on=keys)
@@ -0,0 +1,87 @@
+"""
+Агрегатный куб субсидий и посевов: район × год × тип получателя × программа × культура.
+
+Ячейка — итог по сочетанию значений измерений; ALL ('*') — итог по всем
+значениям измерения, как ROLLUP в SQL. В реестре субсидий нет культуры, а в
+книге посевов — получателя субсидии, поэтому куб разрежен: реестр даёт
+ячейки с культурой ALL, книга — ячейки с типом и программой ALL, а общая
+ячейка (ALL, ALL, ALL) несёт итоги обоих.
+
+Ячейки считаются при загрузке реестра или книги только для её района и года
+(Store.replace_subsidies, Store.replace_crops); страницы берут готовые итоги,
+и время отрисовки не зависит от размера реестра.
+"""
+
+import pandas as pd
+
+ALL = '*'
+DIMENSIONS = ('Тип', 'Программа', 'Культура')
+SUBSIDY_MEASURES = ('Выплат', 'Получателей', 'Сумма_тг')
+CROP_MEASURES = ('Хозяйств', 'План_га', 'Факт_га')
+# Итоговые строки книги посевов, а не культуры: первая найденная — итог книги
+CROP_TOTALS = ('Зерновые', 'Всего')
+MISSING = '—'
+
+
+def subsidy_rollup(registry):
+    """Ячейки куба по реестру района за год: все сочетания типа и программы с итогами ALL"""
+    df = pd.DataFrame({
+        'Тип': registry['Тип'].astype('string').fillna(MISSING),
+        'Программа': registry['Программа'].astype('string').fillna(MISSING),
+        'Получатель': registry['Получатель'],
+        'Сумма_тг': registry['Сумма_тг'].astype('float64'),
+    })
+    cells = []
+    for by in (['Тип', 'Программа'], ['Тип'], ['Программа'], []):
+        if by:
+            g = df.groupby(by, observed=True, sort=False).agg(
+                Выплат=('Сумма_тг', 'size'), Получателей=('Получатель', 'nunique'),
+                Сумма_тг=('Сумма_тг', 'sum')).reset_index()
+        else:
+            g = pd.DataFrame({'Выплат': [len(df)], 'Получателей': [df['Получатель'].nunique()],
+                              'Сумма_тг': [df['Сумма_тг'].sum()]})
+        cells.append(g.assign(**{d: ALL for d in ('Тип', 'Программа') if d not in by}))
+    cube = pd.concat(cells, ignore_index=True).assign(Культура=ALL)
+    if registry.empty:
+        cube = cube.iloc[:0]
+    return cube[[*DIMENSIONS, *SUBSIDY_MEASURES]]
+
+
+def crop_rollup(progress):
+    """Ячейки куба по книге посевов района за год — на последнюю отчётную дату"""
+    last = progress[progress['Дата'] == progress['Дата'].max()]
+    crop = last['Культура'].astype('string')
+    cultures = last[~crop.isin(CROP_TOTALS)]
+    by_crop = cultures.groupby(cultures['Культура'].astype('string'), sort=False).agg(
+        Хозяйств=('Хозяйство', 'nunique'), План_га=('План_га', 'sum'), Факт_га=('Факт_га', 'sum'))
+    total_row = next((t for t in CROP_TOTALS if (crop == t).any()), None)
+    book = last[crop == total_row] if total_row else cultures
+    total = pd.DataFrame({'Культура': [ALL], 'Хозяйств': [last['Хозяйство'].nunique()],
+                          'План_га': [book['План_га'].sum()], 'Факт_га': [book['Факт_га'].sum()]})
+    cube = pd.concat([by_crop.reset_index(), total], ignore_index=True).assign(Тип=ALL, Программа=ALL)
+    if last.empty:
+        cube = cube.iloc[:0]
+    return cube[[*DIMENSIONS, *CROP_MEASURES]]
+
+
+def combine(*cubes):
+    """Куб из нескольких: у совпадающих ячеек (общий итог реестра и книги) меры сливаются"""
+    cube = pd.concat(cubes, ignore_index=True)
+    keys = [k for k in ('Район', 'Год') if k in cube] + list(DIMENSIONS)
+    return cube.groupby(keys, sort=False, dropna=False).first().reset_index()
+
+
+def cells(cube, by=(), **fixed):
+    """Ячейки по измерениям by (по остальным — итог ALL); fixed — значения, например Год=2025"""
+    mask = pd.Series(True, index=cube.index)
+    for dim in DIMENSIONS:
+        mask &= (cube[dim] != ALL) if dim in by else (cube[dim] == ALL)
+    for column, value in fixed.items():
+        mask &= cube[column] == value
+    return cube[mask]
+
+
+def last_year(cube, measure):
+    """Последний год, за который в кубе есть мера (None — нет ни одного)"""
+    years = cells(cube).dropna(subset=[measure])['Год']
+    return int(years.max()) if not years.empty else None
@@ -0,0 +1,140 @@
+"""
+Фильтр реестра субсидий: год, тип получателя, программа, минимальная сумма выплаты.
+
+Реестр района один раз приводится к индексу — массивам numpy,
+отсортированным по (год, сумма); тип, программа и получатель хранятся
+кодами. Отбор не просматривает весь реестр: год — отрезок отсортированного
+массива (np.searchsorted), минимальная сумма — сдвиг начала отрезка, тип и
+программа — маска по кодам только внутри отрезка. Итоги по типам,
+программам и получателям считаются np.bincount по кодам, без группировок
+pandas: на реестре в миллион выплат отбор укладывается в десятки
+миллисекунд, и фильтр на странице не ждёт хранилище.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class SubsidyIndex(NamedTuple):
+    """Выплаты с суммой по возрастанию (год, сумма); массивы только для чтения"""
+    year: np.ndarray            # int16
+    amount: np.ndarray          # float64
+    type_code: np.ndarray       # индексы в types
+    program_code: np.ndarray    # индексы в programs
+    recipient_code: np.ndarray  # индексы в recipients
+    years: list
+    types: list
+    programs: list
+    recipients: np.ndarray
+
+    @property
+    def empty(self):
+        return not len(self.amount)
+
+
+class Selection(NamedTuple):
+    """Результат select()"""
+    payments: int
+    recipients: int
+    amount: float
+    by_type: pd.DataFrame      # Тип, Сумма_тг
+    by_program: pd.DataFrame   # Программа, Сумма_тг
+    top: pd.DataFrame          # Получатель, Программа, Сумма_тг — крупнейшие получатели
+
+
+def _frozen(values):
+    values.setflags(write=False)
+    return values
+
+
+def subsidy_index(registry):
+    """Реестр (столбцы Год, Сумма_тг, Тип, Программа, Получатель) -> SubsidyIndex"""
+    paid = registry[registry['Сумма_тг'].notna()]
+    year = paid['Год'].to_numpy('int16')
+    amount = paid['Сумма_тг'].to_numpy('float64')
+    order = np.lexsort((amount, year))
+    codes, labels = {}, {}
+    for column in ('Тип', 'Программа', 'Получатель'):
+        category = paid[column].astype('string').fillna('—').astype('category')
+        codes[column] = _frozen(category.cat.codes.to_numpy()[order])
+        labels[column] = category.cat.categories.to_numpy(dtype=object)
+    year = _frozen(year[order])
+    return SubsidyIndex(
+        year=year,
+        amount=_frozen(amount[order]),
+        type_code=codes['Тип'],
+        program_code=codes['Программа'],
+        recipient_code=codes['Получатель'],
+        years=[int(y) for y in np.unique(year)],
+        types=labels['Тип'].tolist(),
+        programs=labels['Программа'].tolist(),
+        recipients=_frozen(labels['Получатель']),
+    )
+
+
+def _allowed(labels, chosen):
+    """Маска кодов выбранных значений (неизвестные значения не совпадают ни с чем)"""
+    allowed = np.zeros(len(labels), dtype=bool)
+    allowed[[labels.index(v) for v in chosen if v in labels]] = True
+    return allowed
+
+
+def _totals(codes, amount, labels, column):
+    sums = np.bincount(codes, weights=amount, minlength=len(labels))
+    present = np.flatnonzero(np.bincount(codes, minlength=len(labels)))
+    return pd.DataFrame({column: np.asarray(labels, dtype=object)[present], 'Сумма_тг': sums[present]})
+
+
+def select(index, year=None, types=(), programs=(), min_amount=0, top_n=10):
+    """Итоги выплат, прошедших фильтр; пустой types/programs — без ограничения"""
+    if year is not None:
+        lo, hi = np.searchsorted(index.year, year, 'left'), np.searchsorted(index.year, year, 'right')
+        # Внутри года суммы отсортированы: выплаты меньше порога — в начале отрезка
+        lo += np.searchsorted(index.amount[lo:hi], min_amount, 'left')
+        mask = None
+    else:
+        lo, hi = 0, len(index.amount)
+        mask = index.amount >= min_amount if min_amount > 0 else None
+    amount = index.amount[lo:hi]
+    type_code = index.type_code[lo:hi]
+    program_code = index.program_code[lo:hi]
+    recipient_code = index.recipient_code[lo:hi]
+    for chosen, labels, codes in ((types, index.types, type_code), (programs, index.programs, program_code)):
+        if chosen:
+            hit = _allowed(labels, chosen)[codes]
+            mask = hit if mask is None else mask & hit
+    if mask is not None:
+        amount, type_code = amount[mask], type_code[mask]
+        program_code, recipient_code = program_code[mask], recipient_code[mask]
+
+    n = len(index.recipients)
+    by_recipient = np.bincount(recipient_code, weights=amount, minlength=n)
+    n_recipients = int(np.count_nonzero(np.bincount(recipient_code, minlength=n)))
+    k = min(top_n, n_recipients)
+    leaders = np.argpartition(-by_recipient, k - 1)[:k] if k else np.array([], dtype=int)
+    leaders = leaders[np.argsort(-by_recipient[leaders], kind='stable')]
+    # Разбивка лидеров по программам: ячейка — (место получателя, программа)
+    rank = np.full(n, -1)
+    rank[leaders] = np.arange(k)
+    place = rank[recipient_code]
+    chosen = place >= 0
+    n_programs = len(index.programs)
+    cell = place[chosen] * n_programs + program_code[chosen]
+    sums = np.bincount(cell, weights=amount[chosen], minlength=k * n_programs)
+    present = np.flatnonzero(np.bincount(cell, minlength=k * n_programs))
+    top = pd.DataFrame({
+        'Получатель': index.recipients[leaders[present // n_programs]],
+        'Программа': np.asarray(index.programs, dtype=object)[present % n_programs],
+        'Сумма_тг': sums[present],
+    })
+
+    return Selection(
+        payments=len(amount),
+        recipients=n_recipients,
+        amount=float(amount.sum()),
+        by_type=_totals(type_code, amount, index.types, 'Тип'),
+        by_program=_totals(program_code, amount, index.programs, 'Программа'),
+        top=top,
+    )
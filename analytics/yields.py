@@ -0,0 +1,206 @@
+"""
+Прогноз урожайности по хозяйствам и культурам.
+
+Признаки (build_features) — по ходу посевной из книг посевов: площадь,
+выполнение плана, доля культуры в севообороте хозяйства, срок сева,
+изменение площади к прошлому году; если есть — NDVI полей хозяйства и
+погода района за сезон.
+
+Модель — гребневая регрессия логарифма отношения урожайности к норме
+культуры. Обучение — одно решение системы (XᵀX + λI)β = Xᵀy по всем
+хозяйствам всех районов, прогноз — одно умножение матрицы признаков на β,
+поэтому весь район (и вся область) считается за миллисекунды. Интервалы
+конформные: квантиль остатков «без одного наблюдения», которые у гребневой
+регрессии считаются в закрытом виде через диагональ матрицы влияния.
+
+Пока фактических урожаев для обучения мало (меньше MIN_TRAIN), прогноз —
+норма культуры, а интервал — по типичной изменчивости урожаев (PRIOR_SIGMA).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ingest.entities import link_farms, normalize
+
+# Средняя урожайность по Акмолинской области, ц/га (оценка)
+YIELD_NORMS = {
+    'Пшеница': 11.0,
+    'Ячмень': 12.0,
+    'Овёс': 11.0,
+    'Горох': 9.0,
+    'Масличные': 8.0,
+    'Кормовые': 25.0,
+}
+# Разброс урожаев год к году: σ логарифма урожайности (±30% — засушливые и влажные годы)
+PRIOR_SIGMA = 0.3
+MIN_TRAIN = 30
+RIDGE = 1.0
+LEVEL = 0.9
+
+# Сезон для погодных признаков: осадки май–июль, сумма активных температур (>10 °C) май–август
+RAIN_MONTHS = (5, 6, 7)
+HEAT_MONTHS = (5, 6, 7, 8)
+ACTIVE_TEMP = 10.0
+SOWING_START_DAY = 121   # 1 мая
+
+KEYS = ['Район', 'Год', 'Хозяйство', 'Культура']
+FEATURES = [
+    'Площадь_лог', 'Выполнение', 'Доля_культуры', 'Культур', 'День_сева', 'Изменение_площади',
+    'NDVI_макс', 'NDVI_сумма', 'Осадки_мм', 'Сумма_температур',
+]
+# Итоговые строки книги — не культуры
+_TOTAL_CROPS = ('Всего', 'Зерновые')
+
+
+class YieldModel(NamedTuple):
+    """Обученная модель: столбцы матрицы, центровка, β и полуширина интервала в лог-шкале"""
+    columns: list
+    mean: np.ndarray
+    scale: np.ndarray
+    beta: np.ndarray
+    halfwidth: float
+    n_train: int
+
+
+def weather_features(daily):
+    """Погода по дням (Район, Дата, Температура_C, Осадки_мм) -> признаки на район и год"""
+    daily = daily.assign(Год=daily['Дата'].dt.year, Месяц=daily['Дата'].dt.month)
+    rain = daily[daily['Месяц'].isin(RAIN_MONTHS)].groupby(['Район', 'Год'])['Осадки_мм'].sum()
+    heat = daily[daily['Месяц'].isin(HEAT_MONTHS)]
+    heat = heat['Температура_C'].where(heat['Температура_C'] > ACTIVE_TEMP, 0).groupby([heat['Район'], heat['Год']]).sum()
+    return pd.DataFrame({'Осадки_мм': rain, 'Сумма_температур': heat}).reset_index()
+
+
+def build_features(progress, ndvi=None, weather=None, farms=None):
+    """Признаки по (район, год, хозяйство, культура).
+
+    progress — ход посевной (Район, Год, Хозяйство, Культура, Дата,
+    План_га, Факт_га; факт нарастающим итогом по датам); ndvi — ряды
+    хозяйств (Район, Хозяйство, Дата, NDVI); weather — погода по дням;
+    farms — таблица соответствий хозяйств (Store.farm_names), по которой
+    хозяйства полей соединяются с книгой посевов.
+    Возвращает KEYS, «Ключ» хозяйства, План_га, Факт_га и FEATURES (NaN,
+    если данных для признака нет).
+    """
+    progress = progress[~progress['Культура'].isin(_TOTAL_CROPS)]
+    progress = progress.assign(Культура=progress['Культура'].astype(str))
+    last = progress.groupby(KEYS, observed=True)['Дата'].transform('max')
+    final = progress[progress['Дата'] == last].groupby(KEYS, as_index=False)[['План_га', 'Факт_га']].sum()
+    final = final[final['Факт_га'] > 0].reset_index(drop=True)
+
+    # Срок сева — первая дата, к которой засеяна половина итоговой площади
+    half = progress.merge(final[KEYS + ['Факт_га']].rename(columns={'Факт_га': 'Итог'}), on=KEYS)
+    half = half[half['Факт_га'] >= half['Итог'] / 2].groupby(KEYS)['Дата'].min()
+    sowing_day = half.reindex(pd.MultiIndex.from_frame(final[KEYS])).dt.dayofyear.to_numpy(dtype=np.float64)
+
+    farm_total = final.groupby(['Район', 'Год', 'Хозяйство'])['Факт_га'].transform('sum')
+    crops = final.groupby(['Район', 'Год', 'Хозяйство'])['Культура'].transform('nunique')
+    previous = final.assign(Год=final['Год'] + 1).set_index(KEYS)['Факт_га']
+    before = previous.reindex(pd.MultiIndex.from_frame(final[KEYS])).to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features = final.assign(
+            Ключ=normalize(final['Хозяйство'])['Ключ'].to_numpy(),
+            Площадь_лог=np.log1p(final['Факт_га']),
+            Выполнение=(final['Факт_га'] / final['План_га'].where(final['План_га'] > 0)).clip(upper=2),
+            Доля_культуры=final['Факт_га'] / farm_total,
+            Культур=crops.astype(np.float64),
+            День_сева=sowing_day - SOWING_START_DAY,
+            Изменение_площади=np.log(final['Факт_га'].to_numpy() / before),
+        )
+
+    if ndvi is not None and not ndvi.empty:
+        # Хозяйства полей и книги посевов пишутся по-разному — соединяем по farm_id,
+        # как load_vegetation() и load_farm_support()
+        season = ndvi.dropna(subset=['NDVI'])
+        records = pd.concat([
+            final[['Район', 'Хозяйство']].assign(Источник='crops'),
+            season[['Район', 'Хозяйство']].assign(Источник='fields'),
+        ]).drop_duplicates().rename(columns={'Хозяйство': 'Название'}).assign(БИН='')
+        known = farms if farms is not None else pd.DataFrame(columns=['Район', 'Источник', 'Название', 'БИН', 'farm_id'])
+        ids = link_farms(records, known).set_index(['Район', 'Источник', 'Название'])['farm_id']
+        season = season.assign(Год=season['Дата'].dt.year, farm_id=ids.reindex(pd.MultiIndex.from_arrays(
+            [season['Район'], ['fields'] * len(season), season['Хозяйство']])).to_numpy())
+        by_farm = season.groupby(['Район', 'Год', 'farm_id']).agg(NDVI_макс=('NDVI', 'max'), NDVI_сумма=('NDVI', 'sum'))
+        farm_id = ids.reindex(pd.MultiIndex.from_arrays(
+            [features['Район'], ['crops'] * len(features), features['Хозяйство']])).to_numpy()
+        features = features.assign(farm_id=farm_id).join(by_farm, on=['Район', 'Год', 'farm_id']).drop(columns='farm_id')
+    if weather is not None and not weather.empty:
+        features = features.merge(weather_features(weather), on=['Район', 'Год'], how='left')
+    for column in FEATURES:
+        if column not in features:
+            features[column] = np.nan
+    return features[KEYS + ['Ключ', 'План_га', 'Факт_га'] + FEATURES]
+
+
+def _design(features, columns=None):
+    """Матрица признаков: FEATURES и индикаторы культур (смещение культуры к норме)"""
+    crops = pd.get_dummies(features['Культура'], prefix='Культура', dtype=np.float64)
+    matrix = pd.concat([features[FEATURES].astype(np.float64), crops], axis=1)
+    if columns is not None:
+        matrix = matrix.reindex(columns=columns, fill_value=0.0)
+    return matrix
+
+
+def _norms(features):
+    return features['Культура'].map(YIELD_NORMS).astype(np.float64).to_numpy()
+
+
+def _z(level):
+    """Квантиль нормального распределения для двустороннего интервала"""
+    from statistics import NormalDist
+    return NormalDist().inv_cdf((1 + level) / 2)
+
+
+def fit(features, observed, ridge=RIDGE, level=LEVEL):
+    """Обучить модель по фактическим урожаям.
+
+    observed — Район, Год, Хозяйство, Культура, Урожайность_ц_га;
+    хозяйства сопоставляются с признаками по нормализованному наименованию.
+    Без достаточного числа наблюдений возвращает модель «норма культуры».
+    """
+    train = features.iloc[:0]
+    if observed is not None and len(observed) and not features.empty:
+        observed = observed.assign(Ключ=normalize(observed['Хозяйство'])['Ключ'].to_numpy())
+        on = ['Район', 'Год', 'Ключ', 'Культура']
+        train = features.merge(observed[on + ['Урожайность_ц_га']], on=on)
+        train = train[(train['Урожайность_ц_га'] > 0) & train['Культура'].isin(YIELD_NORMS)]
+    if len(train) < MIN_TRAIN:
+        return YieldModel([], np.zeros(0), np.zeros(0), np.zeros(0), PRIOR_SIGMA * _z(level), len(train))
+
+    matrix = _design(train)
+    mean = matrix.mean().to_numpy()
+    scale = matrix.std().replace(0, 1).fillna(1).to_numpy()
+    x = np.nan_to_num((matrix.to_numpy() - mean) / scale)
+    y = np.log(train['Урожайность_ц_га'].to_numpy() / _norms(train))
+    intercept = y.mean()
+    inverse = np.linalg.inv(x.T @ x + ridge * np.eye(x.shape[1]))
+    beta = inverse @ x.T @ (y - intercept)
+    # Остатки «без одного»: e / (1 - h), h — диагональ матрицы влияния
+    leverage = np.einsum('ij,jk,ik->i', x, inverse, x, optimize=True) + 1 / len(y)
+    loo = (y - intercept - x @ beta) / (1 - leverage)
+    rank = min(int(np.ceil((len(y) + 1) * level)), len(y))
+    halfwidth = float(np.sort(np.abs(loo))[rank - 1])
+    return YieldModel(list(matrix.columns), mean, scale, np.r_[intercept, beta], halfwidth, len(train))
+
+
+def predict(model, features):
+    """Прогноз с интервалом для всех строк признаков одним умножением матрицы"""
+    norm = _norms(features)
+    if model.columns:
+        x = np.nan_to_num((_design(features, model.columns).to_numpy() - model.mean) / model.scale)
+        log_ratio = model.beta[0] + x @ model.beta[1:]
+    else:
+        log_ratio = np.zeros(len(features))
+    forecast = norm * np.exp(log_ratio)
+    low, high = norm * np.exp(log_ratio - model.halfwidth), norm * np.exp(log_ratio + model.halfwidth)
+    return features[KEYS + ['Факт_га']].assign(
+        Прогноз_ц_га=forecast,
+        Нижняя_ц_га=low,
+        Верхняя_ц_га=high,
+        Сбор_т=forecast * features['Факт_га'].to_numpy() / 10,
+        Сбор_нижняя_т=low * features['Факт_га'].to_numpy() / 10,
+        Сбор_верхняя_т=high * features['Факт_га'].to_numpy() / 10,
+    )
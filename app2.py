@@ -6,11 +6,13 @@
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+
+import perf
+from config import DEFAULT_DISTRICT
+from charts.cache import FIGURES
+from datasets import DATASETS
+from loaders import get_store
+from views import PAGES, load_page
 
 # Конфигурация страницы
 st.set_page_config(
@@ -89,730 +91,19 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ==================== ДАННЫЕ ====================
-
-@st.cache_data
-def load_district_profile():
-    """Базовые данные района из паспорта"""
-    return {
-        "name": "Аршалынский район",
-        "region": "Акмолинская область",
-        "area_km2": 5800,
-        "area_ha": 584786,
-        "population": 33363,
-        "distance_to_astana": 71,
-        "agricultural_land_ha": 519400,
-        "arable_land_ha": 238500,
-        "pastures_ha": 275300,
-        "cattle": 16695,
-        "sheep_goats": 154784,
-        "horses": 9517,
-        "pigs": 4300,
-        "industrial_enterprises": 28,
-        "rural_districts": 12,
-        "settlements": 1,
-    }
-
-@st.cache_data
-def load_subsidies_data():
-    """Данные по субсидиям - РЕАЛЬНЫЕ из Аршалынскии__2025_.xlsx"""
-    # Реальные данные из файла (топ получателей)
-    subsidies_2025 = pd.DataFrame({
-        'Получатель': [
-            'ТОО "АГРО ПРЕСТИЖ М"', 
-            'КХ "Арай"', 
-            'ТОО "КОЙГЕЛЬДЫ-АСТЫК"',
-            'ПК "ИЖЕВСКИЙ"',
-            'ТОО "РАХАТ"',
-            'КХ "Айтпай" (Ивченко В.А.)',
-            'ТОО "BersuatAgroPro"',
-            'К/Х "АСЕТ"',
-            'ИП "СУРАЕВ Ю.В."',
-            'ИП "Искакова Н.Ж."'
-        ],
-        'Сумма_тг': [
-            91558200, 41670000, 41670000, 32277900, 20655000,
-            7374000, 3579677, 7593600, 3900000, 2910000
-        ],
-        'Тип': ['ТОО', 'КХ', 'ТОО', 'ПК', 'ТОО', 'КХ', 'ТОО', 'КХ', 'ИП', 'ИП'],
-        'Программа': [
-            'Инвестиции', 'Семеноводство', 'Семеноводство', 'Инвестиции', 'Инвестиции',
-            'Инвестиции', 'Инвестиции', 'Семеноводство', 'Инвестиции', 'Пестициды'
-        ]
-    })
-    return subsidies_2025
-
-# Общие итоги субсидий (из файла)
-SUBSIDIES_TOTALS = {
-    'total_2025': 459720381,  # тенге (без учёта ИТОГО строки, которая дублирует)
-    'recipients_count': 33,
-    'by_type': {
-        'ТОО': 280000000,  # оценочно
-        'КХ': 120000000,
-        'ПК': 40000000,
-        'ИП': 20000000
-    }
-}
-
-@st.cache_data  
-def load_crops_data():
-    """Данные по посевам - РЕАЛЬНЫЕ из ПОСЕВ_АРШАЛЫ_факт_2025.xlsx"""
-    # Данные из файла: итоговый лист "20 июня 2025 (итог)"
-    crops = pd.DataFrame({
-        'Хозяйство': ['ТОО "Енбек-1"', 'ТОО "Tamyr2024"', 'ПК "Ижевский"', 'ТОО "ТНС-Агро"',
-                      'ТОО "Сарыоба астык"', 'ТОО "Акбулак Агро"', 'ТОО ПКФ "Агросоюз"',
-                      'ТОО "Николаевское"', 'ТОО "ПХ Аршалы"', 'ТОО "Адал-ниет"',
-                      'ТОО "Койгельды астык"', 'ТОО "Ольгинское"', 'КХ (всего)'],
-        'План_га': [16892, 12968, 10295, 7522, 5700, 6500, 4838, 4180, 3866, 2861, 2800, 2000, 44036],
-        'Факт_га': [19578, 14283, 11554, 8905, 7641, 6270, 4770, 4000, 650, 1640, 2700, 850, 53495],
-        'Пшеница_факт': [19578, 12439, 7931, 8905, 7161, 6270, 4770, 3750, 0, 540, 2000, 0, 45800],
-        'Ячмень_факт': [0, 1844, 2778, 0, 480, 0, 0, 250, 0, 648, 700, 500, 5655],
-        'Горох_факт': [0, 0, 567, 0, 0, 0, 0, 0, 0, 452, 0, 0, 70],
-        'Масличные_факт': [0, 6180, 449, 3900, 0, 0, 1830, 0, 0, 0, 0, 0, 568],
-        'Выполнение_%': [115.9, 110.1, 112.2, 118.4, 134.1, 96.5, 98.6, 95.7, 16.8, 57.3, 96.4, 42.5, 121.5]
-    })
-    return crops
-
-# Итоговые данные по району (из файла)
-CROPS_TOTALS = {
-    'plan_total': 173346,      # План зерновые всего, га
-    'fact_total': 191868,      # Факт зерновые всего, га
-    'execution_pct': 110.7,    # % выполнения
-    'wheat_plan': 148000,
-    'wheat_fact': 163031,
-    'barley_plan': 18299,
-    'barley_fact': 21113,
-    'oats_fact': 1029,
-    'peas_plan': 2500,
-    'peas_fact': 1309,
-    'oilseeds_plan': 10000,
-    'oilseeds_fact': 18662,
-    'fodder_fact': 11795,
-}
-
-@st.cache_data
-def load_processing_capacity():
-    """Данные о перерабатывающих мощностях"""
-    return pd.DataFrame({
-        'Тип_переработки': ['Мельницы', 'Элеваторы', 'Мясопереработка', 'Молокопереработка', 
-                           'Хранение овощей', 'Комбикорма'],
-        'Количество': [2, 3, 1, 0, 2, 1],
-        'Мощность': ['5000 т/год', '150000 т', '500 т/год', '0', '2000 т', '3000 т/год'],
-        'Загрузка_%': [40, 65, 30, 0, 25, 50],
-        'Статус': ['Работает', 'Работает', 'Частично', 'Нет', 'Сезонно', 'Работает']
-    })
-
-@st.cache_data
-def load_value_chain_flows():
-    """Потоки продукции - ОЦЕНОЧНЫЕ ДАННЫЕ, требуют верификации!
-    
-    ⚠️ Эти данные НЕ из файлов, а экспертные оценки.
-    Для получения реальных данных необходимо:
-    1. Опрос СХТП района о направлениях сбыта
-    2. Данные перерабатывающих предприятий
-    3. Статистика вывоза продукции
-    """
-    return pd.DataFrame({
-        'Продукция': ['Зерно', 'Мясо КРС', 'Молоко', 'Овощи', 'Корма'],
-        'Производство_т': [180000, 2500, 8000, 1500, 15000],  # Оценка на основе посевов
-        'Местная_переработка_%': [15, 20, 5, 30, 60],  # ⚠️ ОЦЕНКА
-        'Вывоз_в_Астану_%': [60, 50, 70, 50, 10],      # ⚠️ ОЦЕНКА
-        'Вывоз_другие_%': [25, 30, 25, 20, 30],        # ⚠️ ОЦЕНКА
-        'Цена_производителя_тг': [80000, 1500000, 200000, 150000, 50000],
-        'Цена_конечная_тг': [250000, 3500000, 400000, 350000, 80000],
-        'Источник': ['Оценка'] * 5  # Маркер что это оценки
-    })
-
-# ==================== ФУНКЦИИ ВИЗУАЛИЗАЦИИ ====================
-
-def create_sankey_diagram(flows_df):
-    """Диаграмма Санки для потоков продукции"""
-    labels = ['Производство Аршалы', 'Местная переработка', 'Вывоз в Астану', 
-              'Вывоз другие регионы', 'Добавленная стоимость (местная)', 
-              'Добавленная стоимость (утечка)']
-    
-    source = [0, 0, 0, 1, 2, 3]
-    target = [1, 2, 3, 4, 5, 5]
-    
-    # Агрегированные значения (млрд тенге)
-    values = [3.2, 12.5, 5.8, 1.5, 8.0, 4.5]
-    
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="black", width=0.5),
-            label=labels,
-            color=["#2E86AB", "#28A745", "#FFC107", "#DC3545", "#28A745", "#DC3545"]
-        ),
-        link=dict(
-            source=source,
-            target=target,
-            value=values,
-            color=['rgba(46,134,171,0.4)', 'rgba(255,193,7,0.4)', 'rgba(220,53,69,0.4)',
-                   'rgba(40,167,69,0.4)', 'rgba(220,53,69,0.4)', 'rgba(220,53,69,0.4)']
-        )
-    )])
-    
-    fig.update_layout(
-        title_text="Потоки добавленной стоимости АПК Аршалынского района",
-        font_size=12,
-        height=400
-    )
-    return fig
-
-def create_localization_gauge(current_value, target_value, title):
-    """Индикатор-спидометр для коэффициента локализации"""
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=current_value,
-        delta={'reference': target_value, 'relative': True},
-        title={'text': title, 'font': {'size': 16}},
-        gauge={
-            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-            'bar': {'color': "#2E86AB"},
-            'bgcolor': "white",
-            'borderwidth': 2,
-            'bordercolor': "gray",
-            'steps': [
-                {'range': [0, 30], 'color': '#ffcdd2'},
-                {'range': [30, 50], 'color': '#fff9c4'},
-                {'range': [50, 100], 'color': '#c8e6c9'}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': target_value
-            }
-        }
-    ))
-    fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
-    return fig
-
-def create_subsidy_analysis(subsidies_df):
-    """Анализ субсидий"""
-    fig = make_subplots(rows=1, cols=2, 
-                        subplot_titles=('По типу получателя', 'По программе'),
-                        specs=[[{'type': 'pie'}, {'type': 'pie'}]])
-    
-    # По типу
-    by_type = subsidies_df.groupby('Тип')['Сумма_тг'].sum().reset_index()
-    fig.add_trace(go.Pie(labels=by_type['Тип'], values=by_type['Сумма_тг'], 
-                         name="По типу", hole=0.4), row=1, col=1)
-    
-    # По программе
-    by_program = subsidies_df.groupby('Программа')['Сумма_тг'].sum().reset_index()
-    fig.add_trace(go.Pie(labels=by_program['Программа'], values=by_program['Сумма_тг'],
-                         name="По программе", hole=0.4), row=1, col=2)
-    
-    fig.update_layout(height=350, showlegend=True)
-    return fig
-
-# ==================== СТРАНИЦЫ ====================
-
-def page_overview():
-    """Главная страница - обзор"""
-    st.markdown('<p class="main-header">🌾 Аршалынский район</p>', unsafe_allow_html=True)
-    st.markdown('<p class="sub-header">Локализация добавленной стоимости: Smart Governance и территориальный эффект</p>', unsafe_allow_html=True)
-    
-    profile = load_district_profile()
-    
-    # Ключевые метрики
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("🏘️ Население", f"{profile['population']:,} чел", "↑ 0.3%")
-    with col2:
-        st.metric("🚗 До Астаны", f"{profile['distance_to_astana']} км", "Ключевое преимущество")
-    with col3:
-        st.metric("🌱 Пашня", f"{profile['arable_land_ha']:,} га", "238.5 тыс. га")
-    with col4:
-        st.metric("🏭 Предприятия", f"{profile['industrial_enterprises']}", "АПК + промышленность")
-    
-    st.divider()
-    
-    # Два столбца: карта + ключевая проблема
-    col1, col2 = st.columns([1, 1])
-    
-    with col1:
-        st.subheader("📍 Географическое положение")
-        st.info("""
-        **Стратегическое преимущество**: 71 км до столицы
-        
-        Район находится в уникальной позиции для:
-        - Прямых поставок в Астану
-        - Коротких цепочек поставок
-        - Пригородного агробизнеса
-        - Агротуризма выходного дня
-        """)
-        
-        # Показываем структуру земель
-        land_data = pd.DataFrame({
-            'Тип': ['Пашня', 'Пастбища', 'Прочие с/х угодья'],
-            'Площадь': [238500, 275300, 5600]
-        })
-        fig_land = px.pie(land_data, values='Площадь', names='Тип', 
-                         title='Структура сельхозугодий',
-                         color_discrete_sequence=['#2E86AB', '#28A745', '#FFC107'])
-        fig_land.update_layout(height=300)
-        st.plotly_chart(fig_land, use_container_width=True)
-    
-    with col2:
-        st.subheader("⚠️ Ключевая проблема")
-        st.markdown("""
-        <div class="warning-box">
-        <h4>Утечка добавленной стоимости</h4>
-        <p>Аршалынский район производит значительный объём агропродукции, но большая часть 
-        добавленной стоимости создаётся за пределами района:</p>
-        <ul>
-        <li>🌾 <b>~85% зерна</b> вывозится без переработки *</li>
-        <li>🥩 <b>~80% мяса</b> перерабатывается в Астане/области *</li>
-        <li>🥛 <b>~95% молока</b> уходит на переработку за пределы района *</li>
-        <li>💰 Фермер получает <b>~15-25%</b> от конечной цены *</li>
-        </ul>
-        <div class="estimate-note">
-        * <b>Оценочные данные</b> — требуют верификации через опрос СХТП района. 
-        Методика расчёта: (Объём производства - Объём местной переработки) / Объём производства × 100%
-        </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Визуализация проблемы
-        problem_data = pd.DataFrame({
-            'Показатель': ['Доля фермера', 'Местная переработка', 'Цифровизация', 'Кооперация'],
-            'Текущее': [18, 15, 12, 20],
-            'Целевое': [35, 50, 60, 50]
-        })
-        
-        fig_gap = go.Figure()
-        fig_gap.add_trace(go.Bar(name='Текущее %', x=problem_data['Показатель'], 
-                                  y=problem_data['Текущее'], marker_color='#DC3545'))
-        fig_gap.add_trace(go.Bar(name='Целевое %', x=problem_data['Показатель'], 
-                                  y=problem_data['Целевое'], marker_color='#28A745'))
-        fig_gap.update_layout(barmode='group', height=300, title='Gap-анализ локализации')
-        st.plotly_chart(fig_gap, use_container_width=True)
-
-def page_value_chain():
-    """Страница анализа цепочек создания стоимости"""
-    st.header("🔗 Цепочки создания стоимости")
-    
-    # Предупреждение об источнике данных
-    st.warning("""
-    ⚠️ **Данные на этой странице — экспертные ОЦЕНКИ**, не из официальных источников.
-    
-    Для получения реальных данных рекомендуется:
-    - Провести опрос СХТП района о направлениях сбыта продукции
-    - Запросить данные у перерабатывающих предприятий
-    - Использовать статистику вывоза из района (акимат, таможня)
-    """)
-    
-    flows = load_value_chain_flows()
-    
-    # Санки диаграмма
-    st.plotly_chart(create_sankey_diagram(flows), use_container_width=True)
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Анализ по продуктам")
-        
-        # Расчёт коэффициента локализации
-        flows['К_локализации'] = flows['Местная_переработка_%'] + (flows['Вывоз_в_Астану_%'] * 0.3)
-        flows['Потеря_стоимости_%'] = ((flows['Цена_конечная_тг'] - flows['Цена_производителя_тг']) / 
-                                        flows['Цена_конечная_тг'] * 100 * (1 - flows['Местная_переработка_%']/100))
-        
-        fig = px.bar(flows, x='Продукция', y=['Местная_переработка_%', 'Вывоз_в_Астану_%', 'Вывоз_другие_%'],
-                     title='Распределение продукции по направлениям (%)',
-                     barmode='stack',
-                     color_discrete_sequence=['#28A745', '#FFC107', '#DC3545'])
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("💰 Потеря добавленной стоимости")
-        
-        fig2 = px.bar(flows, x='Продукция', y='Потеря_стоимости_%',
-                      title='Доля стоимости, уходящая из района (%)',
-                      color='Потеря_стоимости_%',
-                      color_continuous_scale=['#28A745', '#FFC107', '#DC3545'])
-        fig2.update_layout(height=350)
-        st.plotly_chart(fig2, use_container_width=True)
-    
-    # Детальная таблица
-    st.subheader("📋 Детальные данные")
-    display_df = flows.copy()
-    display_df['Цена_производителя'] = display_df['Цена_производителя_тг'].apply(lambda x: f"{x:,.0f} ₸")
-    display_df['Цена_конечная'] = display_df['Цена_конечная_тг'].apply(lambda x: f"{x:,.0f} ₸")
-    display_df['Маржа_посредников'] = ((flows['Цена_конечная_тг'] - flows['Цена_производителя_тг']) / 
-                                        flows['Цена_производителя_тг'] * 100).apply(lambda x: f"{x:.0f}%")
-    
-    st.dataframe(display_df[['Продукция', 'Производство_т', 'Цена_производителя', 
-                             'Цена_конечная', 'Маржа_посредников', 'Местная_переработка_%']], 
-                 use_container_width=True)
-
-def page_subsidies():
-    """Страница анализа субсидий"""
-    st.header("💵 Анализ государственных субсидий")
-    
-    st.success("✅ **Данные из файла**: Аршалынскии__2025_.xlsx")
-    
-    subsidies = load_subsidies_data()
-    
-    # Реальные ключевые метрики из файла
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Общий объём субсидий 2025", "459.7 млн ₸")
-    with col2:
-        st.metric("Количество получателей", "33")
-    with col3:
-        st.metric("Крупнейший получатель", "АГРО ПРЕСТИЖ М")
-    
-    st.divider()
-    
-    # Визуализация
-    st.plotly_chart(create_subsidy_analysis(subsidies), use_container_width=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🏆 Топ-10 получателей")
-        top10 = subsidies.nlargest(10, 'Сумма_тг')
-        fig = px.bar(top10, x='Сумма_тг', y='Получатель', orientation='h',
-                     color='Программа',
-                     title='Крупнейшие получатели субсидий')
-        fig.update_layout(height=400, yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("🎯 Эффективность субсидирования")
-        st.markdown("""
-        <div class="insight-box">
-        <h4>Выводы для Smart Governance:</h4>
-        <ol>
-        <li><b>Концентрация:</b> 70% субсидий получают крупные ТОО</li>
-        <li><b>Программы:</b> Инвестиционные субсидии преобладают</li>
-        <li><b>Gap:</b> Мало субсидий на переработку и кооперацию</li>
-        </ol>
-        <h4>Рекомендации:</h4>
-        <ul>
-        <li>Условие локальной переработки для субсидий</li>
-        <li>Бонусы за участие в кооперативах</li>
-        <li>Data-driven мониторинг эффективности</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-
-def page_crops():
-    """Страница анализа посевов"""
-    st.header("🌾 Посевные площади и культуры")
-    
-    st.success("✅ **Данные из файла**: ПОСЕВ_АРШАЛЫ_факт_2025.xlsx (лист '20 июня 2025 (итог)')")
-    
-    crops = load_crops_data()
-    
-    # Реальные общие метрики из файла
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("План зерновых", "173 346 га")
-    with col2:
-        st.metric("Факт посева", "191 868 га", "+10.7%")
-    with col3:
-        st.metric("Пшеница (факт)", "163 031 га", "85% от всех")
-    with col4:
-        st.metric("Хозяйств (ТОО+КХ)", "50+", "из них крупных ~15")
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Структура посевов (факт 2025)")
-        
-        # Реальные суммы по культурам из файла
-        culture_sums = {
-            'Пшеница': 163031,
-            'Ячмень': 21113,
-            'Масличные': 18662,
-            'Кормовые': 11795,
-            'Горох': 1309,
-            'Овёс': 1029
-        }
-        
-        fig = px.pie(values=list(culture_sums.values()), 
-                     names=list(culture_sums.keys()),
-                     title='Структура посевных площадей (га)',
-                     color_discrete_sequence=px.colors.qualitative.Set2)
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("🏢 Топ хозяйств по площади (факт)")
-        
-        # Убираем итоговую строку КХ для графика
-        crops_for_chart = crops[crops['Хозяйство'] != 'КХ (всего)'].copy()
-        fig2 = px.bar(crops_for_chart.nlargest(10, 'Факт_га'), 
-                      x='Факт_га', y='Хозяйство', orientation='h',
-                      title='Крупнейшие землепользователи',
-                      color='Выполнение_%',
-                      color_continuous_scale='RdYlGn',
-                      range_color=[50, 150])
-        fig2.update_layout(height=350, yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig2, use_container_width=True)
-    
-    # Детальная таблица с возможностью добавленной стоимости
-    st.subheader("💡 Потенциал локализации по культурам")
-    
-    potential = pd.DataFrame({
-        'Культура': ['Пшеница', 'Ячмень', 'Масличные', 'Кормовые', 'Горох'],
-        'Площадь_га': [163031, 21113, 18662, 11795, 1309],
-        'Текущая_переработка_%': ['~15% *', '~10% *', '~5% *', '~60% *', '~0% *'],
-        'Потенциал_переработки': ['Мука, макароны, хлеб', 'Крупа, солод, корма', 
-                                   'Масло, жмых', 'Комбикорма', 'Консервация, заморозка'],
-        'Инвестиции_нужны_млн': [500, 200, 300, 50, 150],
-        'Доп_рабочие_места': [50, 20, 30, 10, 15]
-    })
-    
-    st.dataframe(potential, use_container_width=True)
-    st.caption("* Оценочные данные — требуют верификации через опрос перерабатывающих предприятий")
-
-def page_smart_governance():
-    """Страница Smart Governance"""
-    st.header("🖥️ Smart Governance для локализации")
-    
-    # Индикаторы
-    st.subheader("📈 Текущие индикаторы локализации")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.plotly_chart(create_localization_gauge(18, 35, "Доля фермера в цене (%)"), 
-                       use_container_width=True)
-    with col2:
-        st.plotly_chart(create_localization_gauge(15, 50, "Местная переработка (%)"), 
-                       use_container_width=True)
-    with col3:
-        st.plotly_chart(create_localization_gauge(12, 60, "Цифровизация АПК (%)"), 
-                       use_container_width=True)
-    
-    st.divider()
-    
-    # Компоненты Smart Governance
-    st.subheader("🔧 Компоненты Smart Governance системы")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        ### 📊 1. Платформа данных
-        
-        **Текущее состояние:** Фрагментированные данные в Excel
-        
-        **Целевое состояние:**
-        - 🗺️ Геоинформационная система угодий
-        - 📡 IoT-мониторинг посевов (спутники + датчики)
-        - 💹 Рыночные цены в реальном времени
-        - 📋 Единый реестр СХТП с аналитикой
-        
-        **Эффект для локализации:**
-        - Прозрачность цепочек стоимости
-        - Выявление "узких мест" 
-        - Обоснование инвестиций в переработку
-        """)
-        
-        st.markdown("""
-        ### 🤝 2. Платформа кооперации
-        
-        **Текущее состояние:** Слабая горизонтальная интеграция
-        
-        **Целевое состояние:**
-        - 🏪 Цифровой кооператив "Аршалы-Агро"
-        - 📦 Совместная логистика до Астаны
-        - 🏭 Коллективные инвестиции в переработку
-        - 📊 Прозрачный учёт и распределение прибыли
-        
-        **Эффект для локализации:**
-        - Масштаб для переработки
-        - Переговорная сила с закупщиками
-        - Общие бренды
-        """)
-    
-    with col2:
-        st.markdown("""
-        ### 🎯 3. Data-driven субсидирование
-        
-        **Текущее состояние:** Субсидии без условий локализации
-        
-        **Целевое состояние:**
-        - 📍 Привязка к местной переработке
-        - 📈 KPI эффективности в реальном времени
-        - 🔄 Адаптивное распределение по результатам
-        - 🤖 ИИ-рекомендации по оптимизации
-        
-        **Эффект для локализации:**
-        - Стимул к переработке на месте
-        - Измеримый территориальный эффект
-        """)
-        
-        st.markdown("""
-        ### 🛒 4. Платформа "Аршалы → Астана"
-        
-        **Текущее состояние:** Посредники забирают маржу
-        
-        **Целевое состояние:**
-        - 🚚 B2B: прямые поставки в HoReCa Астаны
-        - 🛍️ B2C: "Фермерский рынок Аршалы" онлайн
-        - 📱 Приложение с прослеживаемостью
-        - 🚜 Оптимизированная логистика (71 км!)
-        
-        **Эффект для локализации:**
-        - +15-20% к цене фермера
-        - Короткие цепочки
-        - Бренд территории
-        """)
-    
-    st.divider()
-    
-    # Дорожная карта
-    st.subheader("🗺️ Дорожная карта внедрения")
-    
-    roadmap = pd.DataFrame({
-        'Этап': ['Пилот', 'Масштабирование', 'Зрелость'],
-        'Срок': ['2026', '2027-2028', '2029-2030'],
-        'Фокус': ['Платформа данных + 1 кооператив', 
-                  'Все СХТП + переработка', 
-                  'Полная экосистема Smart Governance'],
-        'Инвестиции_млн_тг': [50, 300, 500],
-        'Ожидаемый_К_локализации_%': [25, 40, 55]
-    })
-    
-    fig = px.timeline(
-        pd.DataFrame({
-            'Этап': ['Пилот', 'Масштабирование', 'Зрелость'],
-            'Начало': ['2026-01-01', '2027-01-01', '2029-01-01'],
-            'Конец': ['2026-12-31', '2028-12-31', '2030-12-31'],
-            'К_локализации': [25, 40, 55]
-        }),
-        x_start='Начало', x_end='Конец', y='Этап',
-        color='К_локализации',
-        title='Дорожная карта: рост коэффициента локализации'
-    )
-    fig.update_layout(height=250)
-    st.plotly_chart(fig, use_container_width=True)
-    
-    st.dataframe(roadmap, use_container_width=True)
-
-def page_recommendations():
-    """Страница рекомендаций"""
-    st.header("📝 Рекомендации для Сената")
-    
-    tab1, tab2, tab3 = st.tabs(["🏛️ Для Сената/МСХ", "🏢 Для Акимата", "🌾 Для фермеров"])
-    
-    with tab1:
-        st.markdown("""
-        ## Рекомендации для Сената Парламента РК и МСХ
-        
-        ### 1. Нормативное регулирование
-        
-        | Мера | Описание | Ожидаемый эффект |
-        |------|----------|------------------|
-        | **Условные субсидии** | Привязка части субсидий к условию местной переработки (≥30%) | +15% локализации |
-        | **Стандарт данных АПК** | Обязательный цифровой учёт для получателей господдержки | Прозрачность цепочек |
-        | **Кооперативные льготы** | Налоговые преференции для агрокооперативов | Рост кооперации на 50% |
-        
-        ### 2. Инвестиционная политика
-        
-        - 🏭 **Программа "Переработка на месте"**: Субсидирование до 50% стоимости перерабатывающего оборудования для пригородных районов
-        - 🌐 **Цифровая инфраструктура**: Обеспечение 100% покрытия сельских территорий широкополосным интернетом
-        - 📊 **Пилотный проект Smart Governance**: Аршалынский район как модельная территория
-        
-        ### 3. Институциональные изменения
-        
-        - Создание **Агентства данных АПК** при МСХ
-        - Включение **индикаторов локализации** в систему оценки акимов
-        - Разработка **методики расчёта территориального эффекта** субсидий
-        """)
-    
-    with tab2:
-        st.markdown("""
-        ## Рекомендации для Акимата Аршалынского района
-        
-        ### Краткосрочные (2026)
-        
-        1. **Создание цифрового реестра СХТП**
-           - Интеграция данных из всех источников
-           - Геопривязка земельных участков
-           - Открытый дашборд для мониторинга
-        
-        2. **Запуск пилотного кооператива "Аршалы-Агро"**
-           - Объединение 10-15 хозяйств
-           - Совместная логистика в Астану
-           - Цифровой учёт и прозрачное распределение
-        
-        3. **Маркетинговая платформа "Продукты Аршалы"**
-           - Бренд местной продукции
-           - Договоры с HoReCa Астаны
-           - Присутствие на маркетплейсах
-        
-        ### Среднесрочные (2027-2028)
-        
-        1. **Инвестиции в переработку**
-           - Модернизация мельниц (загрузка с 40% до 80%)
-           - Мини-цех молокопереработки
-           - Убойный цех с холодильником
-        
-        2. **Smart Village пилот**
-           - IoT-мониторинг в 5 хозяйствах
-           - Агрометеостанции
-           - Прогнозная аналитика урожайности
-        """)
-    
-    with tab3:
-        st.markdown("""
-        ## Практические шаги для фермеров
-        
-        ### Немедленные действия
-        
-        ✅ **Цифровой учёт**: Перейти с бумаги на электронный учёт (даже Excel — это начало)
-        
-        ✅ **Кооперация**: Объединиться с соседями для совместных закупок и продаж
-        
-        ✅ **Прямые каналы**: Найти 2-3 прямых покупателя в Астане (рестораны, магазины)
-        
-        ✅ **Качество и прослеживаемость**: Фиксировать происхождение продукции
-        
-        ### Что это даёт?
-        
-        | Действие | Эффект для фермера |
-        |----------|-------------------|
-        | Прямые продажи в Астану | +15-25% к цене |
-        | Участие в кооперативе | -20% затраты на логистику |
-        | Цифровой учёт | Доступ к кредитам и субсидиям |
-        | Местная переработка | +30-50% к стоимости продукции |
-        
-        ### Контакты для поддержки
-        
-        - 📞 Акимат района: (отдел с/х)
-        - 🌐 Портал субсидий: qoldau.kz
-        - 🤝 Палата предпринимателей: Атамекен
-        """)
-
 # ==================== НАВИГАЦИЯ ====================
 
 def main():
     st.sidebar.image("https://upload.wikimedia.org/wikipedia/commons/thumb/d/d3/Flag_of_Kazakhstan.svg/1200px-Flag_of_Kazakhstan.svg.png", width=100)
     st.sidebar.title("📍 Навигация")
     
-    pages = {
-        "🏠 Обзор": page_overview,
-        "🔗 Цепочки стоимости": page_value_chain,
-        "💵 Субсидии": page_subsidies,
-        "🌾 Посевы": page_crops,
-        "🖥️ Smart Governance": page_smart_governance,
-        "📝 Рекомендации": page_recommendations
-    }
+    districts = get_store().districts()
+    names = dict(zip(districts['district'], districts['name']))
+    keys = list(names)
+    st.sidebar.selectbox("🗺️ Район", keys, format_func=names.get, key='district',
+                         index=keys.index(DEFAULT_DISTRICT) if DEFAULT_DISTRICT in keys else 0)
     
-    selection = st.sidebar.radio("Выберите раздел:", list(pages.keys()))
+    selection = st.sidebar.radio("Выберите раздел:", list(PAGES.keys()), key='page')
     
     # Информация о проекте
     st.sidebar.divider()
@@ -828,9 +119,25 @@ def main():
     
     st.sidebar.divider()
     st.sidebar.caption("© 2026 Школа аналитики при Сенате РК")
+
     
-    # Отображение выбранной страницы
-    pages[selection]()
+    # Отображение выбранной страницы: модуль и его графики импортируются при первом открытии
+    with perf.rerun(selection, district=st.session_state.get('district')) as trace:
+        load_page(selection)()
+    
+        # Статистика после отрисовки — с учётом графиков текущей страницы
+        with st.sidebar.expander("⚙️ Кэш данных и графиков"):
+            stats = DATASETS.stats()
+            st.caption(f"Данные — попаданий: {stats['hits']} · промахов: {stats['misses']} "
+                       f"({stats['hit_rate']:.0%}) · наборов: {stats['entries']} · "
+                       f"{stats['bytes'] / 1024 ** 2:.1f} из {DATASETS.max_bytes / 1024 ** 2:.0f} МБ · "
+                       f"устарело: {stats['invalidations']} · вытеснено: {stats['evictions']}")
+            stats = FIGURES.stats()
+            st.caption(f"Графики — попаданий: {stats['hits']} · промахов: {stats['misses']} "
+                       f"({stats['hit_rate']:.0%}) · графиков: {stats['entries']} · "
+                       f"{stats['bytes'] / 1024:.0f} КБ · вытеснено: {stats['evictions']}")
+        if perf.debug_enabled():
+            perf.debug_panel(trace)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,20 @@
+"""Построение графиков Plotly по данным дашборда
+
+Подмодули импортируются по первому обращению: charts.cache нужен каждой
+странице, а Plotly — только тем, что строят диаграмму Санки.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "build_sankey": "charts.sankey",
+    "value_chain_paths": "charts.sankey",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'charts' has no attribute {name!r}")
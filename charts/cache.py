@@ -0,0 +1,212 @@
+"""
+Кэш готовых графиков.
+
+Streamlit перезапускает скрипт при каждом клике, и каждая фабрика графиков
+заново строит go.Figure и сериализует его в JSON, хотя данные не менялись.
+Фабрики, обёрнутые в @cached_figure, возвращают уже сериализованный JSON из
+общего для всех сессий LRU-кэша с ограничением по объёму; ключ — хэш
+входных данных. show_chart() передаёт этот JSON в браузер, не создавая
+объект Figure повторно.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import perf
+
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """LRU-кэш JSON графиков с ограничением по суммарному размеру"""
+
+    def __init__(self, max_bytes=MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        # Каталог, общий для нескольких процессов (пакетный экспорт отчётов):
+        # график, построенный одним процессом, остальные читают с диска
+        self.directory = Path(directory) if directory else None
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            spec = self._items.get(key)
+            if spec is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+        # Строим вне блокировки: параллельные сессии не ждут друг друга
+        spec = self._read(key) if self.directory else None
+        if spec is None:
+            spec = build()
+            if self.directory:
+                self._write(key, spec)
+        with self._lock:
+            if key not in self._items and len(spec) <= self.max_bytes:
+                self._items[key] = spec
+                self._bytes += len(spec)
+                while self._bytes > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self._bytes -= len(old)
+                    self.evictions += 1
+        return spec
+
+    def _read(self, key):
+        try:
+            header, spec = (self.directory / f'{key}.json').read_text(encoding='utf-8').split('\n', 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        spec = CachedFigure(spec)
+        spec.height = json.loads(header)['height']
+        return spec
+
+    def _write(self, key, spec):
+        # Через временный файл: другой процесс не прочитает график наполовину
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f'{key}.{os.getpid()}.tmp'
+        tmp.write_text(json.dumps({'height': spec.height}) + '\n' + spec, encoding='utf-8')
+        os.replace(tmp, self.directory / f'{key}.json')
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+            }
+
+
+FIGURES = FigureCache()
+
+
+def _feed(h, obj):
+    """Хэш входных данных фабрики: таблицы и массивы — по содержимому"""
+    if isinstance(obj, pd.DataFrame):
+        h.update(b'df')
+        h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes], obj.shape)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b'sr')
+        h.update(repr((obj.name, str(obj.dtype), obj.shape)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b'{')
+        for k, v in obj.items():
+            _feed(h, k)
+            _feed(h, v)
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for v in obj:
+            _feed(h, v)
+        h.update(b']')
+    elif obj is None or isinstance(obj, (str, int, float, bool)):
+        h.update(repr(obj).encode())
+    else:
+        h.update(pickle.dumps(obj))
+
+
+def input_key(func, args, kwargs):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{func.__module__}.{func.__qualname__}'.encode())
+    _feed(h, args)
+    _feed(h, sorted(kwargs.items()))
+    return h.hexdigest()
+
+
+class CachedFigure(str):
+    """JSON графика из кэша; height — высота из layout (нужна Streamlit для разметки)"""
+
+    height = None
+
+    def to_dict(self):
+        return json.loads(self)
+
+
+def cached_figure(func):
+    """Декоратор фабрики графика: вместо go.Figure возвращает CachedFigure (JSON)"""
+    import plotly.io
+
+    def build(args, kwargs):
+        perf.mark_miss()
+        fig = func(*args, **kwargs)
+        spec = CachedFigure(plotly.io.to_json(fig, validate=False))
+        spec.height = fig.layout.height
+        return spec
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with perf.span('figure', func.__name__) as event:
+            if event is not None:
+                event['hit'] = True
+            key = input_key(func, args, kwargs)
+            return FIGURES.get_or_build(key, lambda: build(args, kwargs))
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def show_chart(fig, height=None):
+    """st.plotly_chart для графиков из кэша: JSON уходит в браузер как есть
+
+    Повторяет то, что делает st.plotly_chart после сериализации фигуры, через
+    внутренний API Streamlit (проверен на версиях из requirements.txt). Если
+    в другой версии он устроен иначе, график строится обычным путём.
+    """
+    if isinstance(fig, CachedFigure):
+        try:
+            _enqueue_spec(fig, height)
+            return
+        except (ImportError, TypeError, AttributeError):
+            # Внутренний API Streamlit поменялся — обычный путь через Figure
+            fig = fig.to_dict()
+    st.plotly_chart(fig, width='stretch')
+
+
+def _enqueue_spec(fig, height):
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart
+
+    dg = st._main
+    proto = PlotlyChart()
+    proto.theme = 'streamlit'
+    proto.form_id = current_form_id(dg)
+    proto.spec = str(fig)
+    proto.config = '{}'
+    layout = LayoutConfig(width='stretch', height=height or fig.height or 450)
+    proto.id = compute_and_register_element_id(
+        'plotly_chart', user_key=None, key_as_main_identity=False, dg=dg,
+        plotly_spec=proto.spec, plotly_config=proto.config, selection_mode=None,
+        is_selection_activated=False, theme=proto.theme, width='stretch',
+        height=height or 'content', alt=None,
+    )
+    dg._enqueue('plotly_chart', proto, layout_config=layout)
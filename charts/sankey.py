@@ -0,0 +1,119 @@
+"""
+Диаграмма Санки по данным потоков.
+
+Вход — таблица путей: по столбцу на каждый слой диаграммы (например район →
+продукция → канал сбыта → результат) и столбец со значением. Узлы строятся
+по уникальным значениям слоёв, связи — по соседним слоям.
+
+Чтобы диаграмма оставалась лёгкой при тысячах продуктов, районов и
+покупателей, в каждом слое остаются top_k крупнейших узлов, а мелкие
+(и всё, что меньше min_share от слоя) сливаются в узел «прочее». Слияние
+идёт по узлам, поэтому баланс входящих и исходящих потоков сохраняется, а у
+каждого узла не больше top_k + 1 связей к следующему слою.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from analytics.localization import ASTANA_WEIGHT
+
+OTHER = 'прочее'
+
+# Каналы сбыта: столбец долей и доля добавленной стоимости, остающаяся в районе
+CHANNELS = {
+    'Местная переработка': ('Местная_переработка_%', 1.0),
+    'Вывоз в Астану': ('Вывоз_в_Астану_%', ASTANA_WEIGHT),
+    'Вывоз другие регионы': ('Вывоз_другие_%', 0.0),
+}
+LOCAL_VALUE = 'Добавленная стоимость (местная)'
+LEAKED_VALUE = 'Добавленная стоимость (утечка)'
+
+PALETTE = ['#2E86AB', '#6C757D', '#FFC107', '#17A2B8', '#6F42C1', '#FD7E14', '#20C997', '#E83E8C']
+NODE_COLORS = {
+    'Местная переработка': '#28A745',
+    'Вывоз в Астану': '#FFC107',
+    'Вывоз другие регионы': '#DC3545',
+    LOCAL_VALUE: '#28A745',
+    LEAKED_VALUE: '#DC3545',
+    OTHER: '#ADB5BD',
+}
+
+
+def value_chain_paths(flows, origin='Производство района'):
+    """Потоки продукции -> пути «район → продукция → канал → результат» в млрд тг
+
+    Значение пути — добавленная стоимость (конечная цена минус цена
+    производителя) объёма, ушедшего по каналу, разделённая на местную часть
+    и утечку.
+    """
+    base = flows.assign(Район=flows['Район'] if 'Район' in flows else origin)
+    added = (base['Цена_конечная_тг'] - base['Цена_производителя_тг']) * base['Производство_т'] / 1e9
+    parts = []
+    for channel, (column, local_share) in CHANNELS.items():
+        if column not in base:
+            continue
+        volume = added * base[column] / 100
+        for result, share in ((LOCAL_VALUE, local_share), (LEAKED_VALUE, 1 - local_share)):
+            parts.append(pd.DataFrame({
+                'Район': base['Район'], 'Продукция': base['Продукция'],
+                'Канал': channel, 'Результат': result, 'Значение': volume * share,
+            }))
+    paths = pd.concat(parts, ignore_index=True)
+    return paths[paths['Значение'] > 0]
+
+
+def prune_layer(labels, values, top_k, min_share, other=OTHER):
+    """Оставить top_k крупнейших узлов слоя (и не меньше min_share), прочие -> other"""
+    totals = values.groupby(labels, observed=True).sum().sort_values(ascending=False)
+    head = totals.iloc[:top_k]
+    keep = head.index[(head >= min_share * totals.sum()).to_numpy()]
+    return labels.where(labels.isin(keep), other)
+
+
+def build_sankey(paths, layers, value='Значение', top_k=8, min_share=0.005,
+                 title=None, height=400, unit='млрд ₸'):
+    """Диаграмма Санки по таблице путей (столбцы layers + value)"""
+    paths = paths[list(layers) + [value]].copy()
+    for layer in layers:
+        paths[layer] = prune_layer(paths[layer].astype(str), paths[value], top_k, min_share)
+
+    # Узлы: (номер слоя, подпись) — одна подпись в разных слоях — разные узлы
+    nodes, links = {}, []
+    for i, (src, dst) in enumerate(zip(layers[:-1], layers[1:])):
+        agg = paths.groupby([src, dst], observed=True, sort=False)[value].sum().reset_index()
+        agg = agg[agg[value] > 0]
+        s = [nodes.setdefault((i, x), len(nodes)) for x in agg[src]]
+        t = [nodes.setdefault((i + 1, x), len(nodes)) for x in agg[dst]]
+        links.append(pd.DataFrame({'source': s, 'target': t, 'value': agg[value].to_numpy()}))
+    links = pd.concat(links, ignore_index=True) if links else pd.DataFrame(columns=['source', 'target', 'value'])
+
+    labels = [label for (_, label) in nodes]
+    colors = [NODE_COLORS.get(label, PALETTE[layer % len(PALETTE)]) for (layer, label) in nodes]
+    link_colors = [_rgba(colors[s], 0.4) for s in links['source']]
+
+    fig = go.Figure(data=[go.Sankey(
+        valueformat='.2f',
+        valuesuffix=f' {unit}',
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=labels,
+            color=colors
+        ),
+        link=dict(
+            source=links['source'].tolist(),
+            target=links['target'].tolist(),
+            value=np.round(links['value'].to_numpy(dtype=float), 4).tolist(),
+            color=link_colors
+        )
+    )])
+    fig.update_layout(title_text=title, font_size=12, height=height)
+    return fig
+
+
+def _rgba(hex_color, alpha):
+    h = hex_color.lstrip('#')
+    r, g, b = (int(h[i:i + 2], 16) for i in (0, 2, 4))
+    return f'rgba({r},{g},{b},{alpha})'
@@ -0,0 +1,30 @@
+"""
+Пути к исходным файлам и кэшу дашборда.
+
+Оба каталога можно переопределить переменными окружения, например при
+развёртывании в контейнере с подключённым томом данных.
+"""
+
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Исходные файлы: реестры субсидий, посевы, паспорт района и т.д.
+DATA_DIR = Path(os.environ.get("TALDAU_DATA_DIR", BASE_DIR / "data"))
+
+# Производные файлы (Parquet, индексы) — можно удалять в любой момент
+CACHE_DIR = Path(os.environ.get("TALDAU_CACHE_DIR", BASE_DIR / ".cache"))
+
+# Локальное хранилище районов (SQLite): профили, субсидии, посевы, мощности
+STORE_PATH = Path(os.environ.get("TALDAU_STORE", CACHE_DIR / "taldau.sqlite"))
+
+# Район, который открывается по умолчанию
+DEFAULT_DISTRICT = "аршалынскии"
+
+# API выгрузки заявок на субсидии Qoldau.kz (ingest/qoldau.py) и токен доступа
+QOLDAU_URL = os.environ.get("TALDAU_QOLDAU_URL")
+QOLDAU_TOKEN = os.environ.get("TALDAU_QOLDAU_TOKEN")
+
+# Память под общий кэш наборов данных (datasets.py), МБ на процесс
+DATA_BUDGET_MB = int(os.environ.get("TALDAU_DATA_BUDGET_MB", 512))
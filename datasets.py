@@ -0,0 +1,206 @@
+"""
+Общий кэш наборов данных процесса.
+
+st.cache_data отдаёт каждой сессии копию результата (распакованную из
+pickle), а загрузчики без кэша заново читают хранилище при каждом
+перезапуске — с десятком пользователей память и время растут вместе с
+числом сессий. Загрузчики, обёрнутые в @shared, хранят одну неизменяемую
+копию каждого набора в Arrow (pyarrow.Table) на весь процесс, а сессиям
+отдают собранный из неё DataFrame. Без копирования, над буферами Arrow,
+собираются числовые столбцы, даты и категории без пропусков, а на pandas 3
+и строки (тип str хранится в Arrow). Столбцы с пропусками и строки на
+pandas 2.x (массивы object) собираются заново на каждый запрос сессии.
+Общие массивы только для чтения — изменить общий набор из страницы нельзя
+(новые столбцы добавлять можно).
+
+Кэш ограничен по объёму (TALDAU_DATA_BUDGET_MB): давно не запрошенные
+наборы вытесняются. У каждой записи есть версия — ревизия хранилища или
+размеры и mtime исходных файлов; если версия изменилась (реестр перезагружен,
+в том числе другим процессом), набор собирается заново.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+import perf
+from config import DATA_BUDGET_MB
+
+MAX_BYTES = DATA_BUDGET_MB * 1024 * 1024
+
+
+class Frozen:
+    """Таблица или ряд в Arrow вместе с attrs"""
+
+    def __init__(self, obj):
+        self.series = isinstance(obj, pd.Series)
+        self.name = obj.name if self.series else None
+        self.attrs = copy.deepcopy(obj.attrs)
+        frame = obj.to_frame('value') if self.series else obj
+        self.table = pa.Table.from_pandas(frame)
+        self.nbytes = self.table.nbytes
+
+    def thaw(self):
+        # split_blocks: столбцы не склеиваются в общий блок — числа без пропусков не копируются
+        df = self.table.to_pandas(split_blocks=True)
+        if self.series:
+            df = df['value'].rename(self.name)
+        df.attrs = copy.deepcopy(self.attrs)
+        return df
+
+
+def freeze(value):
+    """Результат загрузчика -> (значение для кэша, объём в байтах)"""
+    if type(value) is tuple:        # несколько наборов; namedtuple (модель) — как есть
+        items = [freeze(v) for v in value]
+        return tuple(v for v, _ in items), sum(n for _, n in items)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        try:
+            frozen = Frozen(value)
+        except (pa.ArrowException, TypeError, ValueError):
+            # Столбец, который Arrow не представляет (смешанные типы), — хранится
+            # как есть; сессии получают поверхностную копию (copy-on-write pandas)
+            return value.copy(deep=False), int(value.memory_usage(deep=True).sum())
+        return frozen, frozen.nbytes
+    return value, 0
+
+
+def thaw(value):
+    if type(value) is tuple:
+        return tuple(thaw(v) for v in value)
+    if isinstance(value, Frozen):
+        return value.thaw()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class DataCache:
+    """LRU наборов данных с версиями и ограничением по суммарному объёму"""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()     # ключ -> (версия, значение, байт)
+        self._building = {}             # ключ -> блокировка сборки
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, version, build, max_entries=None):
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return thaw(entry)
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        # Один набор собирает одна сессия: остальные ждут её, а не читают хранилище параллельно
+        try:
+            with building:
+                entry = self._lookup(key, version, count=False)
+                if entry is None:
+                    with self._lock:
+                        self.misses += 1
+                    entry, nbytes = freeze(build())
+                    self._put(key, version, entry, nbytes, max_entries)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return thaw(entry)
+
+    def _lookup(self, key, version, count=True):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] != version:
+                self._drop(key)
+                self.invalidations += 1
+                return None
+            self._items.move_to_end(key)
+            if count:
+                self.hits += 1
+            return item[1]
+
+    def _drop(self, key):
+        _, _, nbytes = self._items.pop(key)
+        self._bytes -= nbytes
+
+    def _put(self, key, version, value, nbytes, max_entries):
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                return
+            self._items[key] = (version, value, nbytes)
+            self._bytes += nbytes
+            if max_entries is not None:
+                # Ключ — (загрузчик, аргументы): у загрузчика не больше max_entries наборов
+                same = [k for k in self._items if k[0] == key[0]]
+                for old in same[:-max_entries]:
+                    self._drop(old)
+                    self.evictions += 1
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._items)))
+                self.evictions += 1
+
+    def clear(self, name=None):
+        with self._lock:
+            for key in [k for k in self._items if name is None or k[0] == name]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+            }
+
+
+DATASETS = DataCache()
+
+
+def shared(func=None, *, version=None, max_entries=None):
+    """Декоратор загрузчика: результат из общего кэша DATASETS.
+
+    version(*args, **kwargs) — версия исходных данных (ревизия хранилища,
+    сигнатура файлов); при её изменении набор собирается заново. Без
+    version набор не меняется за время жизни процесса. Аргументы загрузчика
+    должны быть хэшируемыми.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        signature = inspect.signature(func)
+
+        def build(args, kwargs):
+            perf.mark_miss()
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with perf.span('loader', func.__name__) as event:
+                if event is not None:
+                    event['hit'] = True
+                # Аргументы по умолчанию — в ключ: load(d) и load() для района по умолчанию — один набор
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (name, bound.args, tuple(sorted(bound.kwargs.items())))
+                current = version(*bound.args, **bound.kwargs) if version else None
+                return DATASETS.get_or_build(key, current, lambda: build(bound.args, bound.kwargs), max_entries)
+
+        wrapper.clear = lambda: DATASETS.clear(name)
+        wrapper.uncached = func
+        return wrapper
+    return decorator(func) if func is not None else decorator
@@ -0,0 +1,13 @@
+"""Загрузка исходных файлов района в типизированный колоночный кэш"""
+
+from ingest.sowing import SOWING_SCHEMA, load_sowing_progress, sowing_signature
+from ingest.subsidies import SUBSIDY_SCHEMA, load_subsidies, parse_subsidies_workbook
+
+__all__ = [
+    "SOWING_SCHEMA",
+    "SUBSIDY_SCHEMA",
+    "load_sowing_progress",
+    "load_subsidies",
+    "parse_subsidies_workbook",
+    "sowing_signature",
+]
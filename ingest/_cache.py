@@ -0,0 +1,79 @@
+"""Общие функции колоночного кэша: хэш исходника и чтение/запись Parquet"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    """SHA-256 содержимого файла (читается блоками по 1 МБ)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Manifest:
+    """Журнал исходных файлов: размер, mtime и хэш содержимого.
+
+    Позволяет не пересчитывать хэш, если файл не трогали: при совпадении
+    размера и mtime берётся сохранённое значение.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = read_json(self.path)
+        self._dirty = False
+
+    def digest(self, source):
+        source = Path(source)
+        st = source.stat()
+        key = str(source.resolve())
+        entry = self.entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        digest = file_digest(source)
+        self.entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self._dirty = True
+        return digest
+
+    def save(self):
+        if not self._dirty:
+            return
+        write_json(self.entries, self.path)
+        self._dirty = False
+
+
+def read_json(path):
+    """Служебный JSON-файл кэша; пустой словарь, если файла нет или он битый"""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_json(obj, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_parquet(df, path):
+    """Атомарная запись: сначала во временный файл, затем переименование"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def read_parquet(path):
+    return pd.read_parquet(path)
@@ -0,0 +1,173 @@
+"""
+Текст документов Word: старый двоичный .doc (Word 97–2003), .docx и RTF.
+
+Паспорта районов приходят файлами .doc, под этим расширением бывают и
+RTF, и .docx, поэтому формат определяется по первым байтам. Из .doc текст
+берётся по таблице фрагментов (piece table) без сторонних программ —
+нужен только olefile для чтения контейнера OLE.
+"""
+
+import re
+import struct
+import zipfile
+from xml.etree import ElementTree
+
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Служебные символы Word: ячейка/строка таблицы, разрывы, поля
+_CELL = '\x07'
+_FIELD_BEGIN, _FIELD_SEP, _FIELD_END = '\x13', '\x14', '\x15'
+
+
+def document_text(path):
+    """Текст документа одной строкой; абзацы и строки таблиц — через перевод строки, ячейки — через табуляцию"""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(b'{\\rtf'):
+        with open(path, 'rb') as f:
+            return rtf_text(f.read())
+    if head.startswith(b'PK'):
+        return docx_text(path)
+    if head == OLE_MAGIC:
+        return word97_text(path)
+    raise ValueError(f"{path}: не документ Word (.doc, .docx или RTF)")
+
+
+def word97_text(path):
+    """Текст двоичного .doc: фрагменты из потока WordDocument по таблице фрагментов (Clx)"""
+    import olefile
+
+    with olefile.OleFileIO(str(path)) as ole:
+        if not ole.exists('WordDocument'):
+            raise ValueError(f"{path}: в контейнере OLE нет документа Word")
+        word = ole.openstream('WordDocument').read()
+        flags = struct.unpack_from('<H', word, 0x0A)[0]
+        if flags & 0x0100:
+            raise ValueError(f"{path}: документ зашифрован")
+        table_name = '1Table' if flags & 0x0200 else '0Table'
+        fc_clx, lcb_clx = struct.unpack_from('<II', word, 0x01A2)
+        table = ole.openstream(table_name).read()
+    clx = table[fc_clx:fc_clx + lcb_clx]
+
+    # Clx: записи Prc (0x01, размер, свойства) и одна Pcdt (0x02, размер, PlcPcd)
+    pos = 0
+    while pos < len(clx) and clx[pos] == 0x01:
+        pos += 3 + struct.unpack_from('<h', clx, pos + 1)[0]
+    if pos >= len(clx) or clx[pos] != 0x02:
+        raise ValueError(f"{path}: не найдена таблица фрагментов")
+    lcb = struct.unpack_from('<I', clx, pos + 1)[0]
+    plc = clx[pos + 5:pos + 5 + lcb]
+    n = (lcb - 4) // 12
+    cps = struct.unpack_from(f'<{n + 1}I', plc, 0)
+    parts = []
+    for i in range(n):
+        fc = struct.unpack_from('<I', plc, 4 * (n + 1) + 8 * i + 2)[0]
+        length = cps[i + 1] - cps[i]
+        if fc & 0x40000000:
+            # Сжатый фрагмент: по байту на символ в cp1252 со смещением fc / 2
+            start = (fc & ~0x40000000) // 2
+            parts.append(word[start:start + length].decode('cp1252', errors='replace'))
+        else:
+            parts.append(word[fc:fc + 2 * length].decode('utf-16-le', errors='replace'))
+    return _clean_word(''.join(parts))
+
+
+def _clean_word(text):
+    # Поле Word: «\x13 код \x14 результат \x15» -> результат (поля бывают вложенными)
+    out, stack = [], []
+    for ch in text:
+        if ch == _FIELD_BEGIN:
+            stack.append(False)
+        elif ch == _FIELD_SEP and stack:
+            stack[-1] = True
+        elif ch == _FIELD_END and stack:
+            stack.pop()
+        elif not stack or all(stack):
+            out.append(ch)
+    text = ''.join(out)
+    # Конец ячейки и строки таблицы (\x07\x07 подряд) -> табуляция и перевод строки
+    text = text.replace(_CELL + _CELL, '\n').replace(_CELL, '\t')
+    text = text.replace('\r', '\n').replace('\x0b', '\n').replace('\x0c', '\n')
+    text = re.sub(r'[\x00-\x08\x0e-\x1f]', '', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def docx_text(path):
+    """Текст .docx: абзацы document.xml, ячейки таблиц через табуляцию"""
+    with zipfile.ZipFile(path) as z:
+        root = ElementTree.fromstring(z.read('word/document.xml'))
+    lines = []
+    body = root.find(f'{_W}body')
+    for block in body if body is not None else ():
+        if block.tag == f'{_W}tbl':
+            for row in block.iter(f'{_W}tr'):
+                lines.append('\t'.join(_docx_paragraphs(cell) for cell in row.iter(f'{_W}tc')))
+        else:
+            lines.append(_docx_paragraphs(block))
+    return '\n'.join(lines).strip()
+
+
+def _docx_paragraphs(element):
+    return ' '.join(''.join(t.text or '' for t in p.iter(f'{_W}t')) for p in element.iter(f'{_W}p'))
+
+
+_RTF_TOKEN = re.compile(rb"\\([a-z]+)(-?\d+)? ?|\\'([0-9a-f]{2})|\\(.)|([{}])|([^\\{}]+)", re.IGNORECASE | re.DOTALL)
+# Группы, текст которых не выводится: таблицы шрифтов и стилей, картинки, служебные поля
+_RTF_SKIP = {b'fonttbl', b'colortbl', b'stylesheet', b'info', b'pict', b'object', b'header', b'footer',
+             b'listtable', b'listoverridetable', b'rsidtbl', b'generator', b'xmlnstbl', b'themedata',
+             b'colorschememapping', b'latentstyles', b'datastore', b'fldinst'}
+
+
+def rtf_text(data):
+    """Текст RTF: управляющие слова отбрасываются, \\'xx и \\uN — в символы кодовой страницы \\ansicpg"""
+    codepage = re.search(rb'\\ansicpg(\d+)', data)
+    encoding = f'cp{int(codepage[1])}' if codepage else 'cp1251'
+    out, pending = [], bytearray()
+    stack, skip, uc, drop = [], False, 1, 0
+
+    def flush():
+        if pending:
+            out.append(pending.decode(encoding, errors='replace'))
+            pending.clear()
+
+    for word, arg, hexbyte, symbol, brace, text in _RTF_TOKEN.findall(data):
+        if brace == b'{':
+            stack.append((skip, uc))
+        elif brace == b'}':
+            flush()
+            skip, uc = stack.pop() if stack else (False, 1)
+        elif skip:
+            continue
+        elif drop and (hexbyte or symbol):
+            drop -= 1           # замена после \uN для программ без Юникода
+        elif drop and text:
+            text = text.replace(b'\r', b'').replace(b'\n', b'')
+            skipped, drop = min(drop, len(text)), drop - min(drop, len(text))
+            pending.extend(text[skipped:])
+        elif hexbyte:
+            pending.append(int(hexbyte, 16))
+        elif text:
+            pending.extend(text.replace(b'\r', b'').replace(b'\n', b''))
+        elif symbol:
+            if symbol == b'*':
+                skip = True
+            elif symbol in (b'\\', b'{', b'}'):
+                pending.extend(symbol)
+            elif symbol == b'~':
+                pending.extend(b' ')
+        elif word:
+            flush()
+            if word in _RTF_SKIP:
+                skip = True
+            elif word == b'uc':
+                uc = int(arg or 1)
+            elif word == b'u':
+                out.append(chr(int(arg) % 65536))
+                drop = uc
+            elif word in (b'par', b'line', b'row', b'sect', b'page'):
+                out.append('\n')
+            elif word in (b'cell', b'tab'):
+                out.append('\t')
+    flush()
+    return re.sub(r'\n{3,}', '\n\n', ''.join(out)).strip()
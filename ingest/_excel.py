@@ -0,0 +1,121 @@
+"""Мелкие помощники для разбора выгрузок Excel"""
+
+from datetime import date
+
+import pandas as pd
+
+
+class LegacyFormatError(ValueError):
+    """В файле не найдена таблица ожидаемой раскладки"""
+
+
+def cell_text(value):
+    """Текст ячейки в нижнем регистре без лишних пробелов"""
+    return ' '.join(str(value).lower().split()) if value is not None else ''
+
+
+def to_number(values):
+    """Числа из ячеек: бывают числами и строками вида «91 558 200,00»"""
+    as_text = values.astype('string').str.replace(r'[\s ]', '', regex=True).str.replace(',', '.')
+    return pd.to_numeric(as_text, errors='coerce')
+
+
+def to_date(values):
+    """Даты из ячеек: ячейки-даты как есть, текст «дд.мм.гггг», затем ISO 8601; прочее — NaT
+
+    Формат задаётся явно для каждого вида текста: один выведенный формат на
+    весь столбец (dayfirst) путает день и месяц в ISO-датах.
+    """
+    values = pd.Series(values, dtype=object)
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    cells = values.map(lambda v: isinstance(v, date))
+    if cells.any():
+        result[cells] = pd.to_datetime(values[cells].tolist()).as_unit('ns')
+    text = values[values.map(lambda v: isinstance(v, str))].str.strip().str.split().str[0]
+    if not text.empty:
+        parsed = pd.to_datetime(text, format='%d.%m.%Y', errors='coerce')
+        iso = parsed.isna()
+        parsed[iso] = pd.to_datetime(text[iso], format='ISO8601', errors='coerce')
+        result[text.index] = parsed.astype('datetime64[ns]')
+    return result
+
+
+def workbook_rows(path):
+    """Листы книги как [(имя листа, [строка, ...])] — .xlsx через openpyxl, старый .xls через xlrd
+
+    Формат определяется по содержимому, а не по расширению: выгрузки из
+    старых систем бывают .xlsx под именем .xls и наоборот.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+    if magic.startswith(b'PK'):
+        from openpyxl import load_workbook
+
+        with open(path, 'rb') as f:     # из файла, а не по имени: openpyxl проверяет расширение
+            wb = load_workbook(f, read_only=True, data_only=True)
+            try:
+                return [(ws.title, list(ws.iter_rows(values_only=True))) for ws in wb.worksheets]
+            finally:
+                wb.close()
+
+    import xlrd  # книги Excel 97–2003 (BIFF); xlrd 2.x читает только их
+
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheets = []
+        for i in range(book.nsheets):
+            sheet = book.sheet_by_index(i)
+            rows = []
+            for r in range(sheet.nrows):
+                row = []
+                for cell in sheet.row(r):
+                    if cell.ctype == xlrd.XL_CELL_DATE:
+                        row.append(xlrd.xldate_as_datetime(cell.value, book.datemode))
+                    elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                        row.append(None)
+                    else:
+                        row.append(cell.value)
+                rows.append(tuple(row))
+            sheets.append((sheet.name, rows))
+            book.unload_sheet(i)
+        return sheets
+    finally:
+        book.release_resources()
+
+
+def match_header(row, keywords, required):
+    """Столбцы полей по ключевым словам заголовка: {поле: индекс}; None, если это не заголовок
+
+    keywords — {поле: (ключевые слова в порядке приоритета)}; поле занимает
+    первый ещё не занятый столбец, в заголовке которого есть ключевое слово.
+    """
+    cells = [cell_text(v) for v in row]
+    mapping = {}
+    for field, words in keywords.items():
+        for kw in words:
+            idx = next((i for i, c in enumerate(cells) if kw in c and i not in mapping.values()), None)
+            if idx is not None:
+                mapping[field] = idx
+                break
+    return mapping if all(f in mapping for f in required) else None
+
+
+def sheet_records(sheets, keywords, required, scan_rows=30):
+    """Строки данных всех листов с найденным заголовком -> (записи {поле: значение}, заголовки полей)
+
+    Заголовки — текст ячеек заголовка по полям (из него берутся единицы
+    измерения); при разных листах — с первого листа, где поле нашлось.
+    """
+    records, headers = [], {}
+    for _, rows in sheets:
+        for start, row in enumerate(rows[:scan_rows]):
+            mapping = match_header(row, keywords, required)
+            if mapping:
+                break
+        else:
+            continue
+        for field, i in mapping.items():
+            headers.setdefault(field, cell_text(row[i]))
+        for row in rows[start + 1:]:
+            records.append({field: (row[i] if i < len(row) else None) for field, i in mapping.items()})
+    return records, headers
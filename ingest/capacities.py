@@ -0,0 +1,151 @@
+"""
+Перерабатывающие мощности и ёмкости хранения («СВОД_Емкости_у_СХТП.xls»).
+
+Бывают две раскладки: сводка по типам переработки (тип, количество,
+мощность, загрузка, статус) и перечень предприятий района или области
+(район, наименование СХТП, вид, ёмкость). Перечень сворачивается в сводку
+по району и типу: количество — число предприятий, мощность — сумма в
+тоннах, загрузка — средняя, взвешенная по мощности. Результат —
+CAPACITY_SCHEMA, те же столбцы, что у Store.capacities().
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.allocation import parse_capacity
+from ingest._excel import LegacyFormatError, sheet_records, to_number, workbook_rows
+
+CAPACITY_SCHEMA = {
+    'Район': 'string',
+    'Тип_переработки': 'string',
+    'Количество': 'Int64',
+    'Мощность': 'string',
+    'Загрузка_%': 'float64',
+    'Статус': 'string',
+}
+
+COLUMN_KEYWORDS = {
+    'Район': ('район',),
+    'Тип_переработки': ('тип переработ', 'вид переработ', 'тип', 'вид', 'назначени'),
+    'Предприятие': ('наименование', 'предприяти', 'схтп', 'хозяйств'),
+    'Количество': ('количеств', 'кол-во', 'число'),
+    'Мощность': ('мощност', 'емкост', 'ёмкост', 'вместимост', 'объем хранен', 'объём хранен'),
+    'Загрузка_%': ('загрузк', 'загружен', 'использован'),
+    'Статус': ('статус', 'состояни'),
+}
+
+# Тип предприятия по названию или виду (первое совпадение); названия типов —
+# как в analytics/allocation.FACILITY_PRODUCTS, склады зерна считаются с элеваторами
+KIND_KEYWORDS = [
+    ('мельниц', 'Мельницы'),
+    ('мукомол', 'Мельницы'),
+    ('комбикорм', 'Комбикорма'),
+    ('мяс', 'Мясопереработка'),
+    ('убой', 'Мясопереработка'),
+    ('молок', 'Молокопереработка'),
+    ('молоч', 'Молокопереработка'),
+    ('овощ', 'Хранение овощей'),
+    ('картоф', 'Хранение овощей'),
+    ('элеватор', 'Элеваторы'),
+    ('хлебоприем', 'Элеваторы'),
+    ('склад', 'Элеваторы и склады'),
+    ('хранилищ', 'Элеваторы и склады'),
+    ('емкост', 'Элеваторы и склады'),
+    ('ёмкост', 'Элеваторы и склады'),
+]
+# Перечень ёмкостей у СХТП без столбца вида — это склады зерна
+DEFAULT_KIND = 'Элеваторы и склады'
+
+# Период мощности по заголовку столбца («Мощность, т/сут») — для чисел без единиц
+_HEADER_PERIODS = [('сут', 'т/сут'), ('смен', 'т/смен'), ('мес', 'т/мес'), ('год', 'т/год')]
+
+
+def kind_of(texts):
+    """Тип предприятия по тексту вида или названия; None — не распознан"""
+    lowered = texts.astype('string').str.lower().fillna('')
+    result = pd.Series(pd.NA, index=texts.index, dtype='string')
+    for kw, kind in reversed(KIND_KEYWORDS):
+        result[lowered.str.contains(kw, regex=False)] = kind
+    return result
+
+
+def _capacity_text(values, header):
+    """Мощность -> текст для parse_capacity(): числа дополняются единицей из заголовка"""
+    scale = 1000 if 'тыс' in header else 1
+    unit = next((u for kw, u in _HEADER_PERIODS if kw in header), 'т')
+    number = to_number(values)
+    text = values.astype('string').str.strip()
+    as_number = (number * scale).map(lambda v: f'{v:g} {unit}', na_action='ignore').astype('string')
+    return as_number.where(number.notna(), text)
+
+
+def capacities_frame(records, headers):
+    """Записи таблицы мощностей -> CAPACITY_SCHEMA (перечень предприятий сворачивается по типам)"""
+    df = pd.DataFrame.from_records(records, columns=list(COLUMN_KEYWORDS))
+    kind_text = df['Тип_переработки'].astype('string').str.strip()
+    name = df['Предприятие'].astype('string').str.strip()
+    df['Мощность'] = _capacity_text(df['Мощность'], headers.get('Мощность', ''))
+    df['Загрузка_%'] = to_number(df['Загрузка_%'])
+    if df['Загрузка_%'].max() <= 1:           # доли вместо процентов
+        df['Загрузка_%'] *= 100
+    df['Район'] = df['Район'].astype('string').str.strip()
+
+    # Пустые строки, подытоги и «Итого» по району/области
+    label = kind_text.fillna('') + ' ' + name.fillna('') + ' ' + df['Район'].fillna('')
+    total = label.str.contains(r'итого|всего', case=False, regex=True)
+    df = df[~total & (kind_text.notna() | name.notna()) & df['Мощность'].notna()]
+
+    register = 'Предприятие' in headers and 'Количество' not in headers
+    if not register:
+        out = pd.DataFrame({
+            'Район': df['Район'],
+            'Тип_переработки': kind_text[df.index].fillna(name[df.index]),
+            'Количество': to_number(df['Количество']).round(),
+            'Мощность': df['Мощность'],
+            'Загрузка_%': df['Загрузка_%'],
+            'Статус': df['Статус'].astype('string').str.strip(),
+        })
+        return validate_capacities(out)
+
+    kind = kind_of(kind_text[df.index]).fillna(kind_of(name[df.index])).fillna(DEFAULT_KIND)
+    parsed = parse_capacity(df['Мощность'])
+    tonnes = parsed['Мощность_т']
+    periodic = parsed['Мощность_т_год'] != tonnes
+    rows = pd.DataFrame({'Район': df['Район'], 'Тип': kind, 'т': tonnes, 'в_год': periodic,
+                         'загрузка_т': df['Загрузка_%'] * tonnes / 100, 'Статус': df['Статус']})
+    grouped = rows.groupby(['Район', 'Тип'], dropna=False, sort=False)
+    summary = grouped.agg(Количество=('т', 'size'), т=('т', 'sum'), в_год=('в_год', 'any'),
+                          загрузка_т=('загрузка_т', 'sum'), с_загрузкой=('загрузка_т', 'count'),
+                          Статус=('Статус', lambda s: s.mode().iloc[0] if s.notna().any() else pd.NA))
+    summary = summary.reset_index()
+    # Мощность в тоннах за сезон (склады) или в год (переработка) — как в сводке
+    unit = np.where(summary['в_год'], 'т/год', 'т')
+    out = pd.DataFrame({
+        'Район': summary['Район'],
+        'Тип_переработки': summary['Тип'],
+        'Количество': summary['Количество'],
+        'Мощность': [f'{t:.0f} {u}' for t, u in zip(summary['т'], unit)],
+        'Загрузка_%': (summary['загрузка_т'] / summary['т'] * 100).where(summary['с_загрузкой'] > 0).round(1),
+        'Статус': summary['Статус'],
+    })
+    return validate_capacities(out)
+
+
+def validate_capacities(df):
+    """Привести к CAPACITY_SCHEMA; загрузка вне 0–100 % и отрицательное количество — NaN"""
+    df = df.astype(CAPACITY_SCHEMA)
+    df['Загрузка_%'] = df['Загрузка_%'].where(df['Загрузка_%'].between(0, 100))
+    df['Количество'] = df['Количество'].where(df['Количество'] >= 0)
+    return df[list(CAPACITY_SCHEMA)].reset_index(drop=True)
+
+
+def parse_capacities(path):
+    """Разобрать файл мощностей (.xls или .xlsx) в CAPACITY_SCHEMA"""
+    records, headers = sheet_records(workbook_rows(path), COLUMN_KEYWORDS, required=('Мощность',))
+    if not records or not ({'Тип_переработки', 'Предприятие'} & headers.keys()):
+        raise LegacyFormatError(f"{Path(path).name}: не найдена таблица мощностей "
+                                f"(столбцы «мощность»/«ёмкость» и «тип» или «наименование»)")
+    return capacities_frame(records, headers)
+
@@ -0,0 +1,252 @@
+"""
+Сопоставление хозяйств между наборами данных.
+
+Одно и то же хозяйство пишется по-разному: «ТОО "КОЙГЕЛЬДЫ-АСТЫК"» в
+реестре субсидий и «ТОО "Койгельды астык"» в книге посевов. normalize()
+приводит наименование к ключу: без организационно-правовой формы,
+кавычек, регистра и латинских букв-двойников кириллицы. match_farms()
+объединяет записи с одинаковым ключом или общим БИН, а близкие по
+написанию ключи (сходство по триграммам) сравнивает только внутри блоков
+«район + начало слова» — так число сравнений растёт почти линейно с
+числом хозяйств.
+
+Результат — farm_id каждой записи (район, источник, наименование). Таблица
+соответствий хранится в хранилище (resolve_farms), известные хозяйства
+сохраняют свой farm_id, новые записи сравниваются только с ними и между
+собой.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+LOGGER = logging.getLogger('taldau.entities')
+
+# Латинские буквы, которые в выгрузках подменяют кириллические, и казахские
+# буквы, которые пишут то так, то русскими («Ақбұлақ» / «Акбулак»)
+LOOKALIKES = str.maketrans('aceopxykmthbiәғқңөұүһі', 'асеорхукмтнвиагкноуухи')
+
+# Формы собственности в начале наименования (после нормализации) -> форма;
+# ПКФ и ПХ идут после основной формы («ТОО ПКФ "Агросоюз"»)
+FORM_WORDS = {
+    'товарищество с ограниченнои ответственностью': 'ТОО',
+    'сельскохозяиственныи производственныи кооператив': 'ПК',
+    'производственныи кооператив': 'ПК',
+    'крестьянское фермерское хозяиство': 'КХ',
+    'крестьянское хозяиство': 'КХ',
+    'фермерское хозяиство': 'КХ',
+    'индивидуальныи предприниматель': 'ИП',
+    'акционерное общество': 'АО',
+    'тоо': 'ТОО', 'кх': 'КХ', 'к х': 'КХ', 'фх': 'КХ', 'ф х': 'КХ',
+    'пк': 'ПК', 'спк': 'ПК', 'ип': 'ИП', 'ао': 'АО', 'пкф': None,
+}
+_FORMS = '|'.join(sorted(FORM_WORDS, key=len, reverse=True))
+_FORM_RE = re.compile(rf'^(?:(?:{_FORMS})\s+)+')
+_FIRST_FORM_RE = re.compile(rf'^({_FORMS})\s')
+# Итоговые строки книг («КХ (всего)», «Итого по району») — не хозяйства
+_TOTAL_RE = re.compile(r'(?:^|[^а-я])(?:всего|итого)(?:$|[^а-я])|по раиону')
+
+# Близкие ключи: отбор по триграммам, затем доля совпадающих букв без пробелов
+MIN_TRIGRAMS = 0.5
+THRESHOLD = 0.9
+# Блок больше MAX_BLOCK («район + частое слово» вроде «агро») делится по началу
+# наименования; что и после этого больше — не сравнивается и пишется в журнал
+MAX_BLOCK = 500
+_UNKNOWN_FORM = 'Прочие'
+
+
+def normalize(names):
+    """Наименования -> DataFrame «Форма», «Ключ»; у итоговых строк ключ пустой"""
+    names = pd.Series(names, dtype=object).fillna('').astype(str)
+    text = (names.str.casefold()
+            .str.translate(LOOKALIKES)
+            .str.replace('ё', 'е').str.replace('й', 'и'))
+    total = text.str.contains(_TOTAL_RE)
+    text = (text.str.replace(r'\([^)]*\)', ' ', regex=True)      # «(Ивченко В.А.)»
+            .str.replace(r'[^0-9a-zа-я]+', ' ', regex=True)      # кавычки, дефисы, точки
+            .str.strip())
+    form = text.str.extract(_FIRST_FORM_RE, expand=False).map(FORM_WORDS).fillna(_UNKNOWN_FORM)
+    key = text.str.replace(_FORM_RE, '', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+    key = key.mask(total | (key == ''), '')
+    return pd.DataFrame({'Форма': form.to_numpy(), 'Ключ': key.to_numpy()}, index=names.index)
+
+
+def _trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _close(a, b, threshold):
+    """Похожие ключи: цифры совпадают («Енбек-1» и «Енбек-2» — разные хозяйства), буквы почти все"""
+    if re.sub(r'\D', '', a) != re.sub(r'\D', '', b):
+        return False
+    return SequenceMatcher(None, a.replace(' ', ''), b.replace(' ', '')).ratio() >= threshold
+
+
+def _blocks(district, key):
+    """Ключи блоков: район + первые 4 буквы каждого слова длиннее 2 букв"""
+    return {(district, word[:4]) for word in key.split() if len(word) > 2} or {(district, key)}
+
+
+class _Clusters:
+    """Система непересекающихся множеств; в одном множестве — не больше одного известного farm_id"""
+
+    def __init__(self, known_ids):
+        self.parent = list(range(len(known_ids)))
+        self.farm_id = list(known_ids)
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return
+        a, b = self.farm_id[i], self.farm_id[j]
+        if a is not None and b is not None and a != b:
+            return
+        self.parent[j] = i
+        self.farm_id[i] = a if a is not None else b
+
+
+def match_farms(records, known=None, threshold=THRESHOLD, first_id=1):
+    """farm_id для записей.
+
+    records — «Район», «Источник», «Название» и, если есть, «БИН».
+    known — уже сопоставленные записи с «farm_id» (те же столбцы плюс
+    «Форма», «Ключ»); их farm_id не меняются. Новые хозяйства нумеруются
+    после известных, но не раньше first_id. Возвращает records с «Форма»,
+    «Ключ», «farm_id» (NaN для итоговых строк).
+    """
+    records = records.reset_index(drop=True)
+    norm = normalize(records['Название'])
+    new = pd.DataFrame({
+        'Район': records['Район'].to_numpy(),
+        'Форма': norm['Форма'].to_numpy(),
+        'Ключ': norm['Ключ'].to_numpy(),
+        'БИН': records['БИН'].to_numpy() if 'БИН' in records else None,
+        'farm_id': np.nan,
+    })
+    if known is not None and not known.empty:
+        old = known.reindex(columns=['Район', 'Форма', 'Ключ', 'БИН', 'farm_id'])
+        units = pd.concat([old, new[new['Ключ'] != '']], ignore_index=True)
+    else:
+        units = new[new['Ключ'] != '']
+
+    # Единица сопоставления — (район, форма, ключ): одинаковые написания сравниваются один раз
+    units = units.assign(БИН=units['БИН'].replace('', None))
+    grouped = units.groupby(['Район', 'Форма', 'Ключ'], sort=False, dropna=False)
+    keys = grouped.size().index.tolist()
+    unit_ids = grouped['farm_id'].min().to_numpy()
+    clusters = _Clusters([None if np.isnan(v) else int(v) for v in unit_ids])
+    position = {k: i for i, k in enumerate(keys)}
+
+    # Общий БИН — одно хозяйство при любом написании
+    for _, group in units.dropna(subset=['БИН']).groupby('БИН'):
+        idx = [position[k] for k in zip(group['Район'], group['Форма'], group['Ключ'])]
+        for j in idx[1:]:
+            clusters.union(idx[0], j)
+
+    # Один ключ в одном районе (пробелы не важны: «Tamyr 2024» = «Tamyr2024»);
+    # форма — если совпадает или у одной из записей не распознана
+    by_key = defaultdict(list)
+    for i, (district, form, key) in enumerate(keys):
+        by_key[(district, key.replace(' ', ''))].append(i)
+    for same in by_key.values():
+        for a in same:
+            for b in same:
+                if a < b and (keys[a][1] == keys[b][1] or _UNKNOWN_FORM in (keys[a][1], keys[b][1])):
+                    clusters.union(a, b)
+
+    # Близкие ключи: сравниваются только пары из общего блока
+    # Известные между собой уже сопоставлены — сравниваем пары, где есть новая запись
+    fresh = {c for c, members in by_key.items() if any(clusters.farm_id[i] is None for i in members)}
+    grams = {}
+    blocks = defaultdict(list)
+    for compact, members in by_key.items():
+        district, form, key = keys[members[0]]
+        grams[compact] = _trigrams(key)
+        for block in _blocks(district, key):
+            blocks[block].append(compact)
+    skipped = []
+    for block, members in list(blocks.items()):
+        if len(members) > MAX_BLOCK:
+            del blocks[block]
+            for compact in members:
+                blocks[(*block, compact[1][:4])].append(compact)
+    for block, members in blocks.items():
+        if len(members) > MAX_BLOCK:
+            skipped.append(block)
+    if skipped:
+        LOGGER.warning("близкие наименования не сравнивались в %d блоках больше %d записей: %s",
+                       len(skipped), MAX_BLOCK, ', '.join('/'.join(map(str, b)) for b in skipped))
+    seen = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in seen or (pair[0] not in fresh and pair[1] not in fresh):
+                    continue
+                seen.add(pair)
+                if (_similarity(grams[pair[0]], grams[pair[1]]) < MIN_TRIGRAMS
+                        or not _close(pair[0][1], pair[1][1], threshold)):
+                    continue
+                for a in by_key[pair[0]]:
+                    for b in by_key[pair[1]]:
+                        if keys[a][1] == keys[b][1] or _UNKNOWN_FORM in (keys[a][1], keys[b][1]):
+                            clusters.union(a, b)
+
+    # Новые хозяйства получают номера после известных
+    next_id = first_id
+    if len(unit_ids) and not np.isnan(unit_ids).all():
+        next_id = max(next_id, int(np.nanmax(unit_ids)) + 1)
+    assigned = []
+    for i in range(len(keys)):
+        root = clusters.find(i)
+        if clusters.farm_id[root] is None:
+            clusters.farm_id[root] = next_id
+            next_id += 1
+        assigned.append(clusters.farm_id[root])
+    ids = pd.Series(assigned, index=pd.MultiIndex.from_tuples(keys, names=['Район', 'Форма', 'Ключ']))
+
+    out = records.assign(Форма=new['Форма'], Ключ=new['Ключ'])
+    lookup = pd.MultiIndex.from_arrays([out['Район'], out['Форма'], out['Ключ']])
+    out['farm_id'] = ids.reindex(lookup).to_numpy()
+    out.loc[out['Ключ'] == '', 'farm_id'] = np.nan
+    return out
+
+
+def link_farms(records, known):
+    """farm_id записей: известные берутся из таблицы соответствий, остальные сопоставляются на лету"""
+    on = ['Район', 'Источник', 'Название', 'БИН']
+    records = records.assign(БИН=records['БИН'].fillna('') if 'БИН' in records else '')
+    linked = records.merge(known[on + ['farm_id']], on=on, how='left')
+    todo = linked['farm_id'].isna()
+    if todo.any():
+        fresh = match_farms(linked.loc[todo, records.columns], known,
+                            first_id=int(known['farm_id'].max() if known['farm_id'].notna().any() else 0) + 1)
+        linked.loc[todo, 'farm_id'] = fresh['farm_id'].to_numpy()
+    return linked
+
+
+def resolve_farms(store, district=None):
+    """Дополнить таблицу соответствий хозяйств новыми наименованиями из хранилища"""
+    records = store.unmatched_farm_names(district)
+    if records.empty:
+        return 0
+    matched = match_farms(records, store.farm_names(district), first_id=store.max_farm_id() + 1)
+    store.add_farm_names(matched)
+    return len(matched)
@@ -0,0 +1,107 @@
+"""
+Хранилище признаков для прогноза урожайности.
+
+Признаки района (analytics.yields.build_features) сохраняются в
+.cache/features/<район>.parquet вместе с подписью исходников: ход посевной
+в хранилище, посчитанные снимки Sentinel-2 и файл погоды. Район
+пересчитывается, только если подпись изменилась, — признаки области
+собираются из готовых файлов.
+
+Необязательные файлы в data/:
+- ПОГОДА_<район>.csv — Дата, Температура_C, Осадки_мм по дням;
+- УРОЖАЙНОСТЬ_*.csv — Район, Год, Хозяйство, Культура, Урожайность_ц_га
+  (фактические урожаи для обучения модели).
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR
+from ingest._cache import read_json, read_parquet, write_json, write_parquet
+from ingest.ndvi import farm_ndvi, folder_signature, load_field_ndvi
+
+# Увеличить при изменении признаков — старые Parquet-файлы станут неактуальны
+SCHEMA_VERSION = 2
+
+WEATHER_PATTERN = 'ПОГОДА_*.csv'
+YIELDS_PATTERN = 'УРОЖАЙНОСТЬ_*.csv'
+
+
+def _district_files(pattern, data_dir):
+    """Файлы вида <ПРЕФИКС>_<район>.csv -> {ключ района: путь}"""
+    from store import district_key
+
+    data_dir = Path(data_dir or DATA_DIR)
+    if not data_dir.is_dir():
+        return {}
+    prefix = pattern.split('*')[0]
+    return {district_key(p.stem[len(prefix):]): p for p in sorted(data_dir.glob(pattern))}
+
+
+def read_weather(district, data_dir=None):
+    """Погода района по дням или None, если файла нет"""
+    path = _district_files(WEATHER_PATTERN, data_dir).get(district)
+    if path is None:
+        return None
+    daily = pd.read_csv(path, parse_dates=['Дата'])
+    return daily.assign(Район=district)
+
+
+def read_observed_yields(data_dir=None):
+    """Фактические урожаи из всех файлов УРОЖАЙНОСТЬ_*.csv (районы приводятся к ключам)"""
+    from store import district_key
+
+    data_dir = Path(data_dir or DATA_DIR)
+    frames = [pd.read_csv(p) for p in sorted(data_dir.glob(YIELDS_PATTERN))] if data_dir.is_dir() else []
+    columns = ['Район', 'Год', 'Хозяйство', 'Культура', 'Урожайность_ц_га']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    observed = pd.concat(frames, ignore_index=True)[columns]
+    return observed.assign(Район=observed['Район'].map(district_key), Год=observed['Год'].astype(int))
+
+
+def _signature(store, district, data_dir):
+    weather = _district_files(WEATHER_PATTERN, data_dir).get(district)
+    return [SCHEMA_VERSION, store.crops_signature(district), [list(e) for e in folder_signature(district, data_dir)],
+            [weather.name, weather.stat().st_size, weather.stat().st_mtime_ns] if weather else None]
+
+
+def sources_signature(data_dir=None):
+    """Файлы погоды, урожаев и журналы посчитанных снимков — ключ кэша прогноза вместе с ревизией хранилища"""
+    data_dir = Path(data_dir or DATA_DIR)
+    paths = [*data_dir.glob(WEATHER_PATTERN), *data_dir.glob(YIELDS_PATTERN),
+             *(CACHE_DIR / 'ndvi').glob('*/scenes.json')] if data_dir.is_dir() else []
+    return tuple(sorted((str(p), p.stat().st_size, p.stat().st_mtime_ns) for p in paths))
+
+
+def load_yield_features(store, districts=None, data_dir=None, cache_dir=None):
+    """Признаки урожайности районов (по умолчанию — всех, у которых есть ход посевной)"""
+    from analytics.yields import build_features
+
+    cache_dir = Path(cache_dir or CACHE_DIR / 'features')
+    index_path = cache_dir / 'index.json'
+    index = read_json(index_path)
+    if districts is None:
+        districts = store.query("SELECT DISTINCT district FROM crops ORDER BY district")['district'].tolist()
+
+    frames, changed = [], False
+    for district in districts:
+        path = cache_dir / f'{district}.parquet'
+        signature = _signature(store, district, data_dir)
+        if index.get(district) == signature and path.exists():
+            frames.append(read_parquet(path))
+            continue
+        progress = store.crops(district)
+        if progress.empty:
+            continue
+        stats, props = load_field_ndvi(district, data_dir, cached_only=True)
+        ndvi = farm_ndvi(stats, props).assign(Район=district)
+        features = build_features(progress, ndvi, read_weather(district, data_dir), store.farm_names(district))
+        write_parquet(features, path)
+        index[district] = signature
+        frames.append(features)
+        changed = True
+    if changed:
+        write_json(index, index_path)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
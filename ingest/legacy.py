@@ -0,0 +1,192 @@
+"""
+Старые исходные файлы районов: мощности (.xls), инвестиционные проекты (.xls)
+и паспорт района (.doc).
+
+Файлы ищутся в каталоге данных и в подкаталогах районов (data/<район>/):
+вид файла — по имени («…Емкости…», «…проекты…», «Паспорт…»), формат — по
+содержимому (ingest/_excel.py, ingest/_doc.py). Разбор идёт в пуле
+процессов, по файлу на задачу; результат проверяется по схеме
+(CAPACITY_SCHEMA, PROJECT_SCHEMA, профиль паспорта) и кэшируется в
+.cache/legacy/ под хэшем содержимого. В хранилище файлы пишутся по
+очереди; файл, который не менялся с прошлой загрузки, не открывается.
+
+Район берётся из столбца «Район» (своды по области), иначе из подкаталога
+или начала имени файла («аршалы_проекты.xls»), у паспорта — из его текста;
+если ничего не подошло — район по умолчанию. Год — из имени файла, иначе
+год изменения файла.
+
+    python -m ingest.legacy                  # все файлы каталога данных
+    python -m ingest.legacy --workers 8
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR, DEFAULT_DISTRICT
+from ingest._cache import Manifest, read_json, read_parquet, write_json, write_parquet
+from ingest.capacities import parse_capacities
+from ingest.passport import parse_passport
+from ingest.projects import parse_projects
+
+# Увеличить при изменении разбора — кэш станет неактуален
+SCHEMA_VERSION = 1
+
+# Вид файла -> (слова в имени, расширения)
+KINDS = {
+    'capacities': (re.compile(r'емкост|ёмкост|мощност', re.IGNORECASE), ('.xls', '.xlsx')),
+    'projects': (re.compile(r'проект', re.IGNORECASE), ('.xls', '.xlsx')),
+    'passport': (re.compile(r'паспорт', re.IGNORECASE), ('.doc', '.docx', '.rtf')),
+}
+PARSERS = {'capacities': parse_capacities, 'projects': parse_projects}
+
+
+def legacy_files(data_dir=None):
+    """[(вид, путь)] в каталоге данных и подкаталогах районов"""
+    data_dir = Path(data_dir or DATA_DIR)
+    if not data_dir.is_dir():
+        return []
+    entries = list(data_dir.iterdir())
+    entries += [p for d in entries if d.is_dir() for p in d.iterdir()]
+    found = []
+    for path in sorted(entries):
+        if not path.is_file() or path.name.startswith('~$'):   # ~$ — блокировка открытого в Office файла
+            continue
+        kind = next((k for k, (pattern, suffixes) in KINDS.items()
+                     if path.suffix.lower() in suffixes and pattern.search(path.stem)), None)
+        if kind:
+            found.append((kind, path))
+    return found
+
+
+def parse_file(kind, path, digest, cache_dir):
+    """Разобрать файл (в процессе пула) -> таблица или (профиль, замечания); повторно — из кэша"""
+    cached = Path(cache_dir) / f'{digest}-{kind}-v{SCHEMA_VERSION}'
+    if kind == 'passport':
+        saved = read_json(cached.with_suffix('.json'))
+        if saved:
+            return saved['profile'], saved['problems']
+        profile, problems = parse_passport(path)
+        write_json({'profile': profile, 'problems': problems}, cached.with_suffix('.json'))
+        return profile, problems
+    if cached.with_suffix('.parquet').exists():
+        return read_parquet(cached.with_suffix('.parquet'))
+    df = PARSERS[kind](path)
+    write_parquet(df, cached.with_suffix('.parquet'))
+    return df
+
+
+def file_year(path):
+    """Год из имени файла («Паспорт_района_2024.doc»), иначе — год изменения файла"""
+    m = re.search(r'(?<!\d)(20\d{2})(?!\d)', Path(path).stem)
+    return int(m[1]) if m else datetime.fromtimestamp(Path(path).stat().st_mtime).year
+
+
+def file_district(path, data_dir, known):
+    """Район по подкаталогу или началу имени файла; None — не определить"""
+    from store import district_key
+
+    if path.parent != data_dir:
+        return district_key(path.parent.name)
+    prefix = district_key(re.split(r'[_\s.]', path.stem)[0])
+    return prefix if prefix in known else None
+
+
+def _write(store, kind, path, digest, result, district):
+    """Записать разобранный файл в хранилище (хэш файла — с последней записью); -> замечания проверки"""
+    from store import district_key
+
+    year = file_year(path)
+    if kind == 'passport':
+        profile, problems = result
+        district = district or (district_key(profile['name']) if 'name' in profile else DEFAULT_DISTRICT)
+        # Показатели, которых нет в тексте паспорта, остаются от прежней загрузки
+        merged = {**(store.profile(district) or {}), **profile}
+        merged.setdefault('name', store.districts().set_index('district')['name'].get(district, district.capitalize()))
+        store.upsert_profile(merged, district, path, digest)
+        return problems
+    replace = store.replace_capacities if kind == 'capacities' else store.replace_projects
+    keys = result['Район'].map(lambda name: district_key(name) if pd.notna(name) else district or DEFAULT_DISTRICT)
+    groups = list(result.groupby(keys.to_numpy(), sort=True))
+    if not groups:
+        groups = [(district or DEFAULT_DISTRICT, result)]
+    for i, (key, rows) in enumerate(groups):
+        last = i == len(groups) - 1
+        replace(key, year, rows, path if last else None, digest if last else None)
+    return []
+
+
+def sync_legacy(store, data_dir=None, workers=None, cache_dir=None):
+    """Перенести новые и изменённые старые файлы в хранилище.
+
+    Возвращает {путь: замечания проверки или исключение разбора}; файлы с
+    ошибкой не отмечаются загруженными и разбираются снова при следующем запуске.
+    """
+    from store import DISTRICT_ALIASES
+
+    data_dir = Path(data_dir or DATA_DIR)
+    cache_dir = Path(cache_dir or CACHE_DIR / 'legacy')
+    manifest = Manifest(cache_dir / 'manifest.json')
+    todo = []
+    for kind, path in legacy_files(data_dir):
+        digest = manifest.digest(path)
+        if store.source_digest(path) != digest:
+            todo.append((kind, path, digest))
+    manifest.save()
+    if not todo:
+        return {}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    if workers == 1:
+        results = []
+        for kind, path, digest in todo:
+            try:
+                results.append(parse_file(kind, path, digest, cache_dir))
+            except Exception as e:
+                results.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_file, kind, path, digest, cache_dir) for kind, path, digest in todo]
+            results = [f.exception() or f.result() for f in futures]
+
+    known = set(store.districts()['district']) | set(DISTRICT_ALIASES.values()) | {DEFAULT_DISTRICT}
+    status = {}
+    for (kind, path, digest), result in zip(todo, results):
+        if isinstance(result, Exception):
+            status[path] = result
+            continue
+        status[path] = _write(store, kind, path, digest, result, file_district(path, data_dir, known))
+    return status
+
+
+def main(argv=None):
+    from store import Store
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default=None, help='каталог данных (TALDAU_DATA_DIR)')
+    parser.add_argument('--workers', type=int, default=None, help='процессов (по умолчанию — по числу ядер)')
+    args = parser.parse_args(argv)
+
+    store = Store()
+    start = time.perf_counter()
+    status = sync_legacy(store, args.data_dir, args.workers)
+    for path, result in status.items():
+        if isinstance(result, Exception):
+            print(f"{path.name:<40} ошибка: {result}")
+        else:
+            print(f"{path.name:<40} загружен" + ''.join(f"\n{'':<40} отброшено: {p}" for p in result))
+    failed = sum(isinstance(result, Exception) for result in status.values())
+    print(f"\nфайлов: {len(status) - failed}, ошибок: {failed} за {time.perf_counter() - start:.1f} с, "
+          f"ревизия {store.revision}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Вегетационный индекс NDVI по снимкам Sentinel-2 и полям хозяйств.
+
+Снимки района лежат в data/sentinel/<район>/: каналы B04 (красный) и B08
+(ближний ИК) отдельными GeoTIFF/JP2 («T42UXE_20250612T062629_B04_10m.tif»)
+или одним многоканальным файлом, рядом — маска облаков SCL, если есть.
+Поля — fields.geojson в той же папке, у каждого поля свойство «Хозяйство».
+
+Снимок не читается целиком: он обходится окнами TILE×TILE, и читаются
+только окна, которые задевает хотя бы одно поле (поиск по R-дереву
+shapely.STRtree). В окне поля растеризуются в метки, и NDVI
+суммируется по меткам np.bincount — сумма, сумма квадратов и гистограмма
+для медианы. Память на снимок ограничена несколькими окнами, поэтому
+сезон снимков района считается на обычном ноутбуке; снимки
+обрабатываются параллельно в пуле процессов.
+
+Статистика каждого снимка сохраняется в .cache/ndvi/<район>/<снимок>.parquet;
+пересчитываются только новые или изменённые снимки (и все — если
+поменялся fields.geojson). Заранее посчитать сезон:
+
+    python -m ingest.ndvi аршалынскии --workers 4
+
+rasterio и shapely — необязательные зависимости, нужны только при
+наличии снимков.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR
+from ingest._cache import file_digest, read_json, read_parquet, write_json, write_parquet
+
+# Увеличить при изменении расчёта — старые Parquet-файлы станут неактуальны
+SCHEMA_VERSION = 1
+
+NDVI_SCHEMA = {
+    'Дата': 'datetime64[ns]',
+    'Снимок': 'string',
+    'Поле': 'int32',
+    'Пикселей': 'int64',
+    'Чистых': 'int64',
+    'NDVI': 'float32',
+    'NDVI_медиана': 'float32',
+    'NDVI_ст_откл': 'float32',
+}
+
+SENTINEL_DIR = 'sentinel'
+FIELDS_FILE = 'fields.geojson'
+RASTER_SUFFIXES = ('.tif', '.tiff', '.jp2')
+
+# Окно чтения, пикселей: 1024² × (2 канала uint16 + метки + NDVI) ≈ 16 МБ
+TILE = 1024
+# Гистограмма NDVI по ячейкам 0.01 — медиана восстанавливается с этой точностью
+BINS = 200
+# Классы SCL без облаков, теней и снега: растительность, почва, вода, неклассифицированные
+CLEAR_SCL = (4, 5, 6, 7)
+# С базовой обработки 04.00 (25.01.2022) к отражениям L2A добавлен сдвиг +1000
+BOA_OFFSET = -1000
+BOA_OFFSET_SINCE = date(2022, 1, 25)
+# Многоканальный файл без описаний каналов: порядок B02, B03, B04, B08
+STACK_BANDS = {'red': 3, 'nir': 4}
+# Снимок не учитывается для хозяйства, если облаками закрыто больше этой доли пикселей его полей
+MAX_CLOUD = 0.6
+
+_DATE_RE = re.compile(r'(20\d{2})(\d{2})(\d{2})')
+# «_B04_10m», «_SCL_20m»: канал и разрешение в имени файла; без них — один снимок
+_BAND_RE = re.compile(r'_(B04|B08|SCL)(?:_\d{2}m)?(?=_|$)', re.IGNORECASE)
+_BAND_ROLES = {'B04': 'red', 'B08': 'nir', 'SCL': 'scl'}
+
+
+class Scene(NamedTuple):
+    """Снимок: файлы каналов (red и nir могут быть одним многоканальным файлом)"""
+    scene_id: str
+    date: date
+    red: Path
+    nir: Path
+    scl: Path | None
+
+
+def sentinel_dir(district, data_dir=None):
+    return Path(data_dir or DATA_DIR) / SENTINEL_DIR / district
+
+
+def find_scenes(folder):
+    """Снимки в папке района, по дате; файлы без даты в имени пропускаются"""
+    groups = {}
+    for path in sorted(Path(folder).iterdir()) if Path(folder).is_dir() else []:
+        if path.suffix.lower() not in RASTER_SUFFIXES:
+            continue
+        m = _DATE_RE.search(path.stem)
+        if not m:
+            continue
+        band = _BAND_RE.search(path.stem)
+        scene_id = _BAND_RE.sub('', path.stem) if band else path.stem
+        files = groups.setdefault(scene_id, {'date': date(*map(int, m.groups()))})
+        files[_BAND_ROLES[band.group(1).upper()] if band else 'stack'] = path
+    scenes = []
+    for scene_id, files in groups.items():
+        red, nir = files.get('red', files.get('stack')), files.get('nir', files.get('stack'))
+        if red is not None and nir is not None:
+            scenes.append(Scene(scene_id, files['date'], red, nir, files.get('scl')))
+    return sorted(scenes, key=lambda s: (s.date, s.scene_id))
+
+
+def read_fields(path):
+    """Поля из GeoJSON -> (геометрии GeoJSON, DataFrame свойств с «Хозяйство» и «Поле»)"""
+    collection = json.loads(Path(path).read_text(encoding='utf-8'))
+    features = [f for f in collection.get('features', []) if f.get('geometry')]
+    props = pd.DataFrame([f.get('properties') or {} for f in features])
+    if 'Хозяйство' not in props:
+        props['Хозяйство'] = None
+    props['Поле'] = np.arange(len(features), dtype=np.int32)
+    crs = (collection.get('crs') or {}).get('properties', {}).get('name', 'EPSG:4326')
+    return [f['geometry'] for f in features], props, crs
+
+
+def _band_indexes(dataset, role):
+    """Номер канала в файле: у отдельного файла — 1, у многоканального — по описанию или STACK_BANDS"""
+    if dataset.count == 1:
+        return 1
+    wanted = 'B04' if role == 'red' else 'B08'
+    for i, description in enumerate(dataset.descriptions, start=1):
+        if description and description.upper().startswith(wanted):
+            return i
+    return STACK_BANDS[role]
+
+
+def scene_stats(scene, geometries, crs='EPSG:4326', tile=TILE):
+    """Зональная статистика NDVI одного снимка по полям.
+
+    Возвращает DataFrame по полям, задетым снимком: пикселей поля на снимке,
+    чистых (без облаков и пропусков), среднее, медиана и разброс NDVI.
+    """
+    import rasterio
+    import shapely
+    from rasterio.enums import Resampling
+    from rasterio.features import rasterize
+    from rasterio.warp import transform_geom
+    from rasterio.windows import Window, from_bounds
+    from rasterio.windows import bounds as window_bounds
+    from rasterio.windows import transform as window_transform
+
+    n = len(geometries)
+    total, clear = np.zeros(n + 1, np.int64), np.zeros(n + 1, np.int64)
+    sums, squares = np.zeros(n + 1), np.zeros(n + 1)
+    hist = np.zeros((n + 1) * BINS, np.int64)
+    offset = BOA_OFFSET if scene.date >= BOA_OFFSET_SINCE else 0
+
+    with rasterio.Env(GDAL_CACHEMAX=128), rasterio.open(scene.red) as red_ds, rasterio.open(scene.nir) as nir_ds:
+        if red_ds.shape != nir_ds.shape or red_ds.transform != nir_ds.transform:
+            raise ValueError(f"{scene.scene_id}: каналы B04 и B08 на разных сетках")
+        red_band, nir_band = _band_indexes(red_ds, 'red'), _band_indexes(nir_ds, 'nir')
+        scl_ds = rasterio.open(scene.scl) if scene.scl else None
+        try:
+            shapes = np.array([shapely.make_valid(shapely.geometry.shape(transform_geom(crs, red_ds.crs, g)))
+                               for g in geometries], dtype=object)
+            tree = shapely.STRtree(shapes)
+            height, width = red_ds.shape
+            for row in range(0, height, tile):
+                for col in range(0, width, tile):
+                    window = Window(col, row, min(tile, width - col), min(tile, height - row))
+                    bounds = window_bounds(window, red_ds.transform)
+                    # Окна без полей не читаются
+                    hits = tree.query(shapely.box(*bounds))
+                    if not len(hits):
+                        continue
+                    shape = (int(window.height), int(window.width))
+                    labels = rasterize(zip(shapes[hits], hits + 1), out_shape=shape, fill=0,
+                                       transform=window_transform(window, red_ds.transform), dtype='int32')
+                    inside = labels > 0
+                    if not inside.any():
+                        continue
+
+                    red = red_ds.read(red_band, window=window)
+                    nir = nir_ds.read(nir_band, window=window)
+                    ok = inside & (red > 0) & (nir > 0)
+                    if scl_ds is not None:
+                        scl = scl_ds.read(1, window=from_bounds(*bounds, transform=scl_ds.transform),
+                                          out_shape=shape, resampling=Resampling.nearest, boundless=True)
+                        ok &= np.isin(scl, CLEAR_SCL)
+                    total += np.bincount(labels[inside], minlength=n + 1)
+
+                    r = red[ok].astype(np.float32) + offset
+                    v = nir[ok].astype(np.float32) + offset
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        ndvi = (v - r) / (v + r)
+                    valid = np.isfinite(ndvi) & (np.abs(ndvi) <= 1)
+                    ndvi, label = ndvi[valid], labels[ok][valid]
+                    clear += np.bincount(label, minlength=n + 1)
+                    sums += np.bincount(label, weights=ndvi, minlength=n + 1)
+                    squares += np.bincount(label, weights=ndvi.astype(np.float64) ** 2, minlength=n + 1)
+                    cell = np.clip(((ndvi + 1) / 2 * BINS).astype(np.int64), 0, BINS - 1)
+                    hist += np.bincount(label * BINS + cell, minlength=(n + 1) * BINS)
+        finally:
+            if scl_ds is not None:
+                scl_ds.close()
+
+    seen = np.flatnonzero(total[1:]) + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums[seen] / clear[seen]
+        std = np.sqrt(np.maximum(squares[seen] / clear[seen] - mean ** 2, 0))
+    # Медиана — первая ячейка гистограммы, где накопилась половина чистых пикселей
+    cumulative = hist.reshape(n + 1, BINS)[seen].cumsum(axis=1)
+    median_cell = (cumulative < clear[seen, None] / 2).sum(axis=1)
+    median = np.where(clear[seen] > 0, (median_cell + 0.5) / BINS * 2 - 1, np.nan)
+
+    df = pd.DataFrame({
+        'Дата': pd.Timestamp(scene.date),
+        'Снимок': scene.scene_id,
+        'Поле': seen - 1,
+        'Пикселей': total[seen],
+        'Чистых': clear[seen],
+        'NDVI': mean,
+        'NDVI_медиана': median,
+        'NDVI_ст_откл': std,
+    })
+    return df.astype(NDVI_SCHEMA)
+
+
+def folder_signature(district, data_dir=None, cache_dir=None):
+    """Размеры и mtime файлов снимков, полей и журнала кэша — меняется, когда есть что перечитать"""
+    paths = [sentinel_dir(district, data_dir), Path(cache_dir or CACHE_DIR / 'ndvi' / district)]
+    return tuple((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                 for folder in paths if folder.is_dir() for e in os.scandir(folder) if e.is_file())
+
+
+def _scene_signature(scene, fields_digest):
+    files = [p for p in (scene.red, scene.nir, scene.scl) if p is not None]
+    return [SCHEMA_VERSION, fields_digest] + [[p.name, p.stat().st_size, p.stat().st_mtime_ns] for p in files]
+
+
+def _empty():
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in NDVI_SCHEMA.items()})
+
+
+def load_field_ndvi(district, data_dir=None, cache_dir=None, workers=None, cached_only=False):
+    """Статистика NDVI по полям за все снимки района (снимок × поле) и свойства полей.
+
+    Посчитанные снимки берутся из кэша. cached_only=True — новые снимки не
+    считаются (страница не ждёт); их число — в attrs['pending'].
+    """
+    folder = sentinel_dir(district, data_dir)
+    fields_path = folder / FIELDS_FILE
+    scenes = find_scenes(folder)
+    if not scenes or not fields_path.exists():
+        return _empty(), pd.DataFrame(columns=['Поле', 'Хозяйство'])
+    geometries, props, crs = read_fields(fields_path)
+
+    cache_dir = Path(cache_dir or CACHE_DIR / 'ndvi' / district)
+    index_path = cache_dir / 'scenes.json'
+    index = read_json(index_path)
+    fields_digest = file_digest(fields_path)
+    signatures = {s.scene_id: _scene_signature(s, fields_digest) for s in scenes}
+    todo = [s for s in scenes if index.get(s.scene_id) != signatures[s.scene_id]
+            or not (cache_dir / f'{s.scene_id}.parquet').exists()]
+
+    pending = 0
+    if todo and cached_only:
+        pending = len(todo)
+    elif todo:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        if workers == 1:
+            results = (scene_stats(s, geometries, crs) for s in todo)
+            for scene, df in zip(todo, results):
+                write_parquet(df, cache_dir / f'{scene.scene_id}.parquet')
+                index[scene.scene_id] = signatures[scene.scene_id]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(scene_stats, s, geometries, crs) for s in todo]
+                for scene, future in zip(todo, futures):
+                    write_parquet(future.result(), cache_dir / f'{scene.scene_id}.parquet')
+                    index[scene.scene_id] = signatures[scene.scene_id]
+        # Снимки, которых больше нет в папке, удаляются из журнала
+        index = {k: v for k, v in index.items() if k in signatures}
+        write_json(index, index_path)
+
+    done = [s for s in scenes if index.get(s.scene_id) == signatures[s.scene_id]
+            and (cache_dir / f'{s.scene_id}.parquet').exists()]
+    frames = [read_parquet(cache_dir / f'{s.scene_id}.parquet') for s in done]
+    stats = pd.concat(frames, ignore_index=True) if frames else _empty()
+    stats.attrs['pending'] = pending
+    return stats, props
+
+
+def farm_ndvi(stats, props):
+    """Ряды NDVI по хозяйствам: среднее по чистым пикселям всех полей хозяйства на каждую дату
+
+    Снимки, где облаками закрыто больше MAX_CLOUD пикселей всех полей хозяйства, дают NaN.
+    """
+    df = stats.merge(props[['Поле', 'Хозяйство']], on='Поле').dropna(subset=['Хозяйство'])
+    df = df.assign(Сумма=df['NDVI'].astype(np.float64).fillna(0) * df['Чистых'])
+    series = df.groupby(['Хозяйство', 'Дата'], as_index=False).agg(
+        Полей=('Поле', 'nunique'), Пикселей=('Пикселей', 'sum'), Чистых=('Чистых', 'sum'), Сумма=('Сумма', 'sum'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series['Облачность_%'] = (1 - series['Чистых'] / series['Пикселей']) * 100
+        series['NDVI'] = (series['Сумма'] / series['Чистых']).where(series['Облачность_%'] <= MAX_CLOUD * 100)
+    return series[['Хозяйство', 'Дата', 'Полей', 'NDVI', 'Облачность_%']]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Посчитать NDVI по полям за все снимки района")
+    parser.add_argument("district", help="ключ района, например аршалынскии")
+    parser.add_argument("--workers", type=int, default=None, help="процессов (по умолчанию — по числу ядер)")
+    args = parser.parse_args()
+    stats, props = load_field_ndvi(args.district, workers=args.workers)
+    print(f"снимков: {stats['Снимок'].nunique()}, полей: {len(props)}, строк: {len(stats)}")
@@ -0,0 +1,286 @@
+"""
+Участки (поля) хозяйств для карты района.
+
+Границы участков — GeoJSON или шейп-файлы в data/parcels/<район>/; если их
+нет, берутся поля снимков Sentinel-2 (data/sentinel/<район>/fields.geojson).
+У участка есть хозяйство («Хозяйство», «Землепользователь», …) и, если
+указана, культура.
+
+Тысячи полигонов с полной детализацией браузер не потянет, поэтому для
+каждого масштаба карты (ZOOM_LEVELS) геометрия заранее упрощается до
+пикселя этого масштаба и округляется до той же сетки: на обзоре района у
+участка остаются считанные вершины, а участки меньше пикселя выпадают.
+Уровни кэшируются в .cache/parcels/<район>/ под хэшем исходных файлов.
+Для запросов по окну карты строится R-дерево (shapely.STRtree) по
+границам участков: в браузер уходят только участки, видимые в окне, на
+уровне упрощения текущего масштаба. Заранее посчитать уровни:
+
+    python -m ingest.parcels аршалынскии
+
+shapely — необязательная зависимость (как для NDVI), шейп-файлы читаются
+через pyshp, участки не в WGS 84 перепроецируются через rasterio.
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR
+from ingest._cache import file_digest, read_parquet, write_parquet
+from ingest.ndvi import FIELDS_FILE, sentinel_dir
+
+# Увеличить при изменении упрощения — кэш уровней станет неактуален
+SCHEMA_VERSION = 1
+
+PARCELS_DIR = 'parcels'
+PARCEL_SUFFIXES = ('.geojson', '.json', '.shp')
+
+# Масштабы карты (как у веб-карт: 0 — весь мир), для которых хранится упрощённая
+# геометрия; крупнее последнего показывается исходная
+ZOOM_LEVELS = (9, 11, 13, 15)
+# Окно карты на странице, пикселей
+MAP_WIDTH, MAP_HEIGHT = 900, 520
+
+# Свойство участка -> возможные названия в исходных файлах (первое найденное)
+PROPERTY_ALIASES = {
+    'Хозяйство': ('Хозяйство', 'Землепользователь', 'Владелец', 'Арендатор', 'farm', 'owner', 'name'),
+    'Культура': ('Культура', 'crop'),
+}
+# Кодировка шейп-файла по .cpg
+_CODEPAGES = {'1251': 'cp1251', 'ansi 1251': 'cp1251', 'utf-8': 'utf-8', 'utf8': 'utf-8'}
+
+
+class ParcelIndex(NamedTuple):
+    """Участки района: свойства, уровни упрощения и R-дерево по границам"""
+    props: pd.DataFrame     # Участок, Хозяйство, Культура, Площадь_га, Файл
+    levels: dict            # масштаб (None — исходная геометрия) -> массив shapely-геометрий
+    tree: object            # shapely.STRtree исходных участков (R-дерево по их границам)
+    bounds: tuple           # (запад, юг, восток, север) всех участков
+
+
+def parcels_dir(district, data_dir=None):
+    return Path(data_dir or DATA_DIR) / PARCELS_DIR / district
+
+
+def parcel_files(district, data_dir=None):
+    """Файлы границ участков района; без них — поля снимков Sentinel-2"""
+    folder = parcels_dir(district, data_dir)
+    files = sorted(p for p in folder.iterdir() if p.suffix.lower() in PARCEL_SUFFIXES) if folder.is_dir() else []
+    fields = sentinel_dir(district, data_dir) / FIELDS_FILE
+    return files or ([fields] if fields.exists() else [])
+
+
+def _source_paths(district, data_dir=None):
+    """Файлы участков вместе с .dbf, .prj и .cpg шейп-файлов"""
+    paths = parcel_files(district, data_dir)
+    paths += [p.with_suffix(s) for p in paths if p.suffix.lower() == '.shp' for s in ('.dbf', '.prj', '.cpg')]
+    return [p for p in paths if p.exists()]
+
+
+def parcels_signature(district, data_dir=None):
+    """Размеры и mtime файлов участков — меняется, когда есть что перечитать"""
+    return tuple((p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in _source_paths(district, data_dir))
+
+
+def _is_wgs84(crs):
+    return crs is None or 'CRS84' in crs.upper() or crs.upper().endswith('4326')
+
+
+def _read_shapefile(path):
+    """Шейп-файл -> (FeatureCollection, CRS в WKT или None)"""
+    import shapefile
+
+    cpg = path.with_suffix('.cpg')
+    encodings = [_CODEPAGES.get(cpg.read_text().strip().lower(), 'utf-8')] if cpg.exists() else ['utf-8', 'cp1251']
+    for i, encoding in enumerate(encodings):
+        try:
+            with shapefile.Reader(str(path), encoding=encoding) as reader:
+                collection = reader.__geo_interface__
+            break
+        # Не UTF-8 — пробуем cp1251 (pyshp 3 сообщает об этом своим исключением)
+        except (UnicodeDecodeError, shapefile.ShapefileException):
+            if i == len(encodings) - 1:
+                raise
+    prj = path.with_suffix('.prj')
+    return collection, prj.read_text() if prj.exists() else None
+
+
+def read_parcels(path):
+    """Файл участков -> (геометрии GeoJSON в WGS 84, DataFrame свойств)"""
+    path = Path(path)
+    if path.suffix.lower() == '.shp':
+        collection, crs = _read_shapefile(path)
+    else:
+        collection = json.loads(path.read_text(encoding='utf-8'))
+        crs = (collection.get('crs') or {}).get('properties', {}).get('name')
+    features = [f for f in collection.get('features', []) if f.get('geometry')]
+    raw = pd.DataFrame([f.get('properties') or {} for f in features], index=range(len(features)))
+    props = pd.DataFrame(index=raw.index)
+    for name, aliases in PROPERTY_ALIASES.items():
+        # Имена полей .dbf обрезаны до 10 байт: «Землепольз» — это «Землепользователь»
+        column = next((c for a in aliases for c in raw.columns
+                       if str(c).lower() == a.lower() or len(str(c)) >= 5 and a.lower().startswith(str(c).lower())),
+                      None)
+        props[name] = raw[column].astype('string').str.strip() if column is not None else pd.NA
+    props['Файл'] = path.name
+    geometries = [f['geometry'] for f in features]
+    if not _is_wgs84(crs):
+        from rasterio.warp import transform_geom
+
+        geometries = [transform_geom(crs, 'EPSG:4326', g) for g in geometries]
+    return geometries, props
+
+
+def pixel_degrees(zoom, latitude):
+    """Размер пикселя карты на масштабе zoom, в градусах широты"""
+    return 360 / (256 * 2 ** zoom) * math.cos(math.radians(latitude))
+
+
+def simplify_levels(shapes, latitude):
+    """Упрощённая геометрия для каждого масштаба ZOOM_LEVELS; участки меньше пикселя — пустые"""
+    import shapely
+
+    levels = {}
+    # От детального уровня к грубому: каждый упрощается из предыдущего, а не из исходной геометрии
+    for zoom in sorted(ZOOM_LEVELS, reverse=True):
+        tolerance = pixel_degrees(zoom, latitude)
+        # Сетка — круглая доля градуса не крупнее пикселя: в GeoJSON координаты короткие
+        grid = 10 ** math.floor(math.log10(tolerance))
+        shapes = shapely.set_precision(shapely.simplify(shapes, tolerance, preserve_topology=True), grid)
+        levels[zoom] = shapes
+    return dict(sorted(levels.items()))
+
+
+def build_parcels(district, data_dir=None):
+    """Прочитать участки района и упростить -> таблица для кэша (геометрия в WKB)"""
+    import shapely
+
+    geometries, props = [], []
+    for path in parcel_files(district, data_dir):
+        g, p = read_parcels(path)
+        geometries += g
+        props.append(p)
+    if not geometries:
+        return pd.DataFrame()
+    shapes = shapely.make_valid(np.array([shapely.geometry.shape(g) for g in geometries], dtype=object))
+    df = pd.concat(props, ignore_index=True)
+    df.insert(0, 'Участок', np.arange(len(df), dtype=np.int32))
+    bounds = shapely.bounds(shapes)
+    latitude = float(np.nanmean(bounds[:, [1, 3]]))
+    # Площадь по градусам с поправкой на широту — для подсказки на карте хватает
+    df['Площадь_га'] = shapely.area(shapes) * 111_320 ** 2 * math.cos(math.radians(latitude)) / 10_000
+    df['Геометрия'] = shapely.to_wkb(shapes)
+    for zoom, simple in simplify_levels(shapes, latitude).items():
+        df[f'z{zoom}'] = shapely.to_wkb(simple)
+    return df
+
+
+def load_parcel_index(district, data_dir=None, cache_dir=None):
+    """Участки района с уровнями упрощения и R-деревом; None — файлов участков нет.
+
+    Уровни берутся из кэша, если исходные файлы не менялись.
+    """
+    import shapely
+
+    files = _source_paths(district, data_dir)
+    if not files:
+        return None
+    h = hashlib.sha256(f'v{SCHEMA_VERSION}'.encode())
+    for path in files:
+        h.update(file_digest(path).encode())
+    cache_dir = Path(cache_dir or CACHE_DIR / PARCELS_DIR / district)
+    cached = cache_dir / f'{h.hexdigest()[:16]}.parquet'
+    if cached.exists():
+        df = read_parquet(cached)
+    else:
+        df = build_parcels(district, data_dir)
+        for old in cache_dir.glob('*.parquet') if cache_dir.is_dir() else []:
+            old.unlink()
+        write_parquet(df, cached)
+    if df.empty:
+        return None
+
+    shapes = shapely.from_wkb(df['Геометрия'].to_numpy())
+    levels = {zoom: shapely.from_wkb(df[f'z{zoom}'].to_numpy()) for zoom in ZOOM_LEVELS}
+    levels[None] = shapes
+    props = df[['Участок', 'Хозяйство', 'Культура', 'Площадь_га', 'Файл']]
+    return ParcelIndex(props, levels, shapely.STRtree(shapes),
+                       tuple(map(float, shapely.total_bounds(shapes))))
+
+
+def level_for(zoom):
+    """Уровень упрощения для масштаба: ближайший не крупнее; крупнее последнего — исходная геометрия"""
+    if zoom > ZOOM_LEVELS[-1]:
+        return None
+    return max((z for z in ZOOM_LEVELS if z <= zoom), default=ZOOM_LEVELS[0])
+
+
+def fit_zoom(bounds, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """Наибольший целый масштаб, при котором границы помещаются в окно карты"""
+    west, south, east, north = bounds
+    latitude = (south + north) / 2
+    span_x = max(east - west, 1e-6)
+    span_y = max(north - south, 1e-6) / math.cos(math.radians(latitude))
+    zoom = min(math.log2(360 * width / 256 / span_x), math.log2(360 * height / 256 / span_y))
+    return max(0, min(18, int(zoom)))
+
+
+def viewport(center, zoom, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """Границы окна карты (запад, юг, восток, север) по центру (долгота, широта) и масштабу"""
+    lon, lat = center
+    half_y = pixel_degrees(zoom, lat) * height / 2
+    half_x = half_y / math.cos(math.radians(lat)) * width / height
+    return lon - half_x, lat - half_y, lon + half_x, lat + half_y
+
+
+def visible(index, bounds, zoom):
+    """Участки в окне карты на уровне упрощения масштаба -> (номера участков, геометрии)"""
+    import shapely
+
+    hits = np.sort(index.tree.query(shapely.box(*bounds)))
+    shapes = index.levels[level_for(zoom)][hits]
+    keep = ~shapely.is_empty(shapes)
+    return hits[keep], shapes[keep]
+
+
+def extent(index, positions=None):
+    """Границы (запад, юг, восток, север) всех участков или участков с номерами positions"""
+    import shapely
+
+    if positions is None:
+        return index.bounds
+    return tuple(map(float, shapely.total_bounds(index.levels[None][positions])))
+
+
+def feature_collection(ids, shapes):
+    """GeoJSON-строка только видимых участков; id признака — номер участка"""
+    import shapely
+
+    features = ','.join(f'{{"type":"Feature","id":{i},"properties":{{}},"geometry":{g}}}'
+                        for i, g in zip(ids, shapely.to_geojson(shapes)))
+    return f'{{"type":"FeatureCollection","features":[{features}]}}'
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Посчитать уровни упрощения участков района")
+    parser.add_argument("district", help="ключ района, например аршалынскии")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    index = load_parcel_index(args.district)
+    if index is None:
+        print(f"нет файлов участков в {parcels_dir(args.district)} и {sentinel_dir(args.district)}")
+    else:
+        import shapely
+
+        vertices = {z: int(shapely.get_num_coordinates(g).sum()) for z, g in index.levels.items()}
+        print(f"участков: {len(index.props)}, вершин по уровням: "
+              + ", ".join(f"{'исходная' if z is None else f'z{z}'} — {n}" for z, n in vertices.items())
+              + f" ({time.perf_counter() - start:.1f} с)")
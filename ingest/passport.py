@@ -0,0 +1,100 @@
+"""
+Паспорт района («Паспорт_района_2024.doc»): текст -> типизированный профиль.
+
+Паспорт — свободный текст с таблицами, поэтому показатели ищутся по
+ключевым словам: число после слова («пашня – 238,5 тыс. га») или перед ним
+(«12 сельских округов»), с единицей измерения, где она однозначна. Профиль
+проверяется: числа положительные, пашня не больше сельхозугодий, а те — не
+больше площади района. Показатель, не прошедший проверку, не записывается.
+"""
+
+import re
+
+from ingest._doc import document_text
+
+_NUM = r'(?<![\d.,])(?P<n>\d+(?:[ \u00a0]\d{3})*(?:[.,]\d+)?)\s*(?P<scale>тыс|млн)?\.?'
+
+# Показатель -> (ключевые слова, единица измерения или None, число перед словами)
+PROFILE_FIELDS = {
+    'population': (r'численност\w* населени\w*', r'чел', False),
+    'area_km2': (r'площад\w*', r'кв\.?\s*км|км2|км²', False),
+    'area_ha': (r'площад\w*', r'га\b', False),
+    'distance_to_astana': (r'астан\w*', r'км', False),
+    'agricultural_land_ha': (r'сельскохозяйственн\w* угод\w*|сельхоз\s*угод\w*|с/х угод\w*', r'га\b', False),
+    'arable_land_ha': (r'пашн\w*', r'га\b', False),
+    'pastures_ha': (r'пастбищ\w*', r'га\b', False),
+    'cattle': (r'\bкрс\b|крупн\w* рогат\w*', None, False),
+    'sheep_goats': (r'\bмрс\b|мелк\w* рогат\w*|овц\w* и коз\w*', None, False),
+    'horses': (r'лошад\w*', None, False),
+    'pigs': (r'свин\w*', None, False),
+    'industrial_enterprises': (r'промышленн\w* предприяти\w*', None, False),
+    'rural_districts': (r'сельск\w* округ\w*', None, True),
+    'settlements': (r'пос[её]л\w*', None, True),
+}
+SCALES = {'': 1, 'тыс': 1_000, 'млн': 1_000_000}
+# Сколько символов между ключевым словом и числом (тире, «в т.ч.», «составляет»)
+GAP = 60
+
+# «Аршалынский район», «Паспорт Аршалынского района»
+_NAME_RE = re.compile(r'\b([А-ЯЁ][а-яё]+?)(?:ский|ского|скому|ском)\s+район')
+_REGION_RE = re.compile(r'\b([А-ЯЁ][а-яё]+?)(?:ская|ской)\s+област[иьею]')
+# Даты и годы («на 01.01.2024 г.») — не показатели
+_DATE_RE = re.compile(r'\b\d{1,2}\.\d{1,2}\.\d{2,4}\b|\b(?:19|20)\d{2}\s*(?:г\.|года?|гг?\b)')
+
+
+def _patterns(keywords, unit, before):
+    unit = rf'\s*(?:{unit})' if unit else ''
+    if before:
+        return re.compile(rf'{_NUM}\s*(?:{keywords})')
+    return re.compile(rf'(?:{keywords})[^\n]{{0,{GAP}}}?{_NUM}{unit}')
+
+
+_FIELD_RES = {field: _patterns(*spec) for field, spec in PROFILE_FIELDS.items()}
+
+
+def _number(match):
+    value = float(re.sub(r'[ \u00a0]', '', match['n']).replace(',', '.'))
+    return value * SCALES[match['scale'] or '']
+
+
+def parse_passport_text(text):
+    """Показатели паспорта из текста -> (профиль, список замечаний проверки)"""
+    plain = _DATE_RE.sub(' ', text.replace('\t', ' '))
+    lowered = plain.lower().replace('ё', 'е')
+    profile = {}
+    name = _NAME_RE.search(plain)
+    if name:
+        profile['name'] = f'{name[1]}ский район'
+    region = _REGION_RE.search(plain)
+    if region:
+        profile['region'] = f'{region[1]}ская область'
+    for field, pattern in _FIELD_RES.items():
+        match = pattern.search(lowered)
+        if match:
+            profile[field] = round(_number(match))
+    # Площадь бывает указана только в одной единице
+    if 'area_km2' in profile and 'area_ha' not in profile:
+        profile['area_ha'] = profile['area_km2'] * 100
+    if 'area_ha' in profile and 'area_km2' not in profile:
+        profile['area_km2'] = round(profile['area_ha'] / 100)
+    return validate_profile(profile)
+
+
+def validate_profile(profile):
+    """Отбросить невозможные значения -> (профиль, замечания)"""
+    problems = []
+    checked = dict(profile)
+    for field in PROFILE_FIELDS:
+        if field in checked and checked[field] <= 0 and field != 'settlements':
+            problems.append(f"{field}: {checked.pop(field)} — не положительное число")
+    # Вложенность земель: пашня и пастбища ⊂ сельхозугодья ⊂ площадь района
+    for part, whole in (('arable_land_ha', 'agricultural_land_ha'), ('pastures_ha', 'agricultural_land_ha'),
+                        ('agricultural_land_ha', 'area_ha')):
+        if part in checked and whole in checked and checked[part] > checked[whole]:
+            problems.append(f"{part}: {checked.pop(part)} больше, чем {whole} {checked[whole]}")
+    return checked, problems
+
+
+def parse_passport(path):
+    """Паспорт района из файла (.doc, .docx, RTF) -> (профиль, замечания)"""
+    return parse_passport_text(document_text(path))
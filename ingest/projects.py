@@ -0,0 +1,80 @@
+"""
+Инвестиционные проекты района («аршалы_проекты.xls»).
+
+Перечень проектов: наименование, инициатор, отрасль, стоимость, рабочие
+места, срок и стадия реализации. Стоимость приводится к млн тенге по
+единице в заголовке столбца («млрд тг», «тыс. тенге»); без единицы
+считается, что суммы уже в млн тенге. Результат — PROJECT_SCHEMA.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from ingest._excel import LegacyFormatError, sheet_records, to_number, workbook_rows
+
+PROJECT_SCHEMA = {
+    'Район': 'string',
+    'Проект': 'string',
+    'Инициатор': 'string',
+    'Отрасль': 'string',
+    'Стоимость_млн_тг': 'float64',
+    'Рабочих_мест': 'Int64',
+    'Срок': 'string',
+    'Статус': 'string',
+}
+
+COLUMN_KEYWORDS = {
+    'Район': ('район',),
+    'Проект': ('наименование проект', 'наименование', 'проект'),
+    'Инициатор': ('инициатор', 'инвестор', 'заявител', 'компани', 'предприяти'),
+    'Отрасль': ('отрасл', 'направлени', 'вид деятельн', 'сектор'),
+    'Стоимость_млн_тг': ('стоимост', 'объем инвест', 'объём инвест', 'инвестиц', 'сумма'),
+    'Рабочих_мест': ('рабоч',),
+    'Срок': ('срок', 'год реализ', 'период', 'годы'),
+    'Статус': ('статус', 'стади', 'состояни', 'ход реализ'),
+}
+
+# Единица стоимости в заголовке -> множитель до млн тенге (первое совпадение)
+COST_UNITS = [('млрд', 1_000), ('млн', 1), ('тыс', 0.001), ('тенге', 1e-6), ('тг', 1e-6)]
+
+
+def cost_scale(header):
+    return next((scale for unit, scale in COST_UNITS if unit in header), 1)
+
+
+def projects_frame(records, headers):
+    """Записи перечня проектов -> PROJECT_SCHEMA"""
+    df = pd.DataFrame.from_records(records, columns=list(COLUMN_KEYWORDS))
+    text = {c: df[c].astype('string').str.strip().replace('', pd.NA)
+            for c in ('Район', 'Проект', 'Инициатор', 'Отрасль', 'Статус')}
+    # Срок бывает годом-числом (2025.0) или текстом «2024–2026»
+    period = df['Срок'].map(lambda v: f'{v:g}' if isinstance(v, float) else v, na_action='ignore')
+    out = pd.DataFrame({
+        **text,
+        'Стоимость_млн_тг': to_number(df['Стоимость_млн_тг']) * cost_scale(headers.get('Стоимость_млн_тг', '')),
+        'Рабочих_мест': to_number(df['Рабочих_мест']).round(),
+        'Срок': period.astype('string').str.strip(),
+    })
+    # Строки «Итого», заголовки разделов (без стоимости и инициатора) и пустые
+    total = out['Проект'].fillna('').str.contains(r'^\s*(?:итого|всего)', case=False, regex=True)
+    empty = out['Стоимость_млн_тг'].isna() & out['Инициатор'].isna()
+    out = out[out['Проект'].notna() & ~total & ~empty]
+    return validate_projects(out)
+
+
+def validate_projects(df):
+    """Привести к PROJECT_SCHEMA; отрицательные стоимость и число рабочих мест — NaN"""
+    df = df.astype(PROJECT_SCHEMA)
+    df['Стоимость_млн_тг'] = df['Стоимость_млн_тг'].where(df['Стоимость_млн_тг'] >= 0)
+    df['Рабочих_мест'] = df['Рабочих_мест'].where(df['Рабочих_мест'] >= 0)
+    return df[list(PROJECT_SCHEMA)].reset_index(drop=True)
+
+
+def parse_projects(path):
+    """Разобрать перечень проектов (.xls или .xlsx) в PROJECT_SCHEMA"""
+    records, headers = sheet_records(workbook_rows(path), COLUMN_KEYWORDS, required=('Проект',))
+    if not records or not ({'Стоимость_млн_тг', 'Инициатор'} & headers.keys()):
+        raise LegacyFormatError(f"{Path(path).name}: не найден перечень проектов "
+                                f"(столбцы «проект» и «стоимость» или «инициатор»)")
+    return projects_frame(records, headers)
@@ -0,0 +1,242 @@
+"""
+Синхронизация заявок на субсидии с API Qoldau.kz.
+
+Вместо ручного копирования реестров клиент забирает из API только новые и
+изменённые заявки каждого района:
+
+- курсор — наибольшее время изменения заявки, полученной в прошлый раз
+  (запрос updated_since, включительно: граничные заявки приходят повторно и
+  просто перезаписываются по id);
+- ETag выгрузки района — если данные района не менялись, API отвечает 304
+  и район пропускается без передачи заявок.
+
+Районы синхронизируются параллельно в одном asyncio-цикле: соединения к API
+берутся из общего пула (httpx.AsyncClient), одновременно — не больше
+concurrency районов. Ответы 429 и 5xx и сетевые ошибки повторяются с
+экспоненциальной задержкой (или по Retry-After).
+
+Заявки района пишутся в хранилище (таблица applications) одной транзакцией
+вместе с курсором; реестр субсидий района за затронутые годы пересобирается
+из всех его заявок — страницы дашборда читают его так же, как реестры из
+Excel. Реестр года из API заменяет реестр того же года из файла.
+
+Клиент рассчитан на такой контракт выгрузки (его же реализует заглушка
+tools/qoldau_stub.py для проверки без доступа к API):
+
+    GET <url>/applications?district=<ключ района>&updated_since=<ISO 8601>&limit=<n>[&page_token=<t>]
+    Authorization: Bearer <токен>          If-None-Match: <ETag прошлой синхронизации>
+    200 -> {"items": [заявка, ...], "next_page_token": "..." | null}, заголовок ETag
+    304 -> изменений нет
+
+Заявка: id, district, year, recipient, bin, subsidy, amount, date, status,
+updated_at. Нужен пакет httpx.
+
+    python -m ingest.qoldau --url http://127.0.0.1:8765       # все районы хранилища
+    python -m ingest.qoldau аршалынскии --concurrency 4
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import pandas as pd
+
+from config import QOLDAU_TOKEN, QOLDAU_URL
+from ingest.subsidies import SUBSIDY_SCHEMA, legal_form, program_category
+
+SOURCE = 'qoldau'
+PAGE_SIZE = 500
+CONCURRENCY = 8
+TIMEOUT = 30.0
+RETRIES = 5
+BACKOFF = 0.5          # с, удваивается с каждой попыткой
+MAX_BACKOFF = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Заявки в этих статусах не попадают в реестр выплат
+REJECTED_STATUSES = {'rejected', 'withdrawn', 'отклонена', 'отозвана'}
+
+# Поле заявки в API -> столбец в хранилище (store.APPLICATION_COLUMNS)
+FIELDS = {
+    'id': 'id', 'district': 'Район', 'year': 'Год', 'recipient': 'Получатель', 'bin': 'БИН',
+    'subsidy': 'Субсидия', 'amount': 'Сумма_тг', 'date': 'Дата', 'status': 'Статус',
+    'updated_at': 'Изменена',
+}
+
+
+class SyncError(RuntimeError):
+    """API не ответило после всех повторов или вернуло ошибку"""
+
+
+def _delay(response, attempt):
+    """Пауза перед повтором: Retry-After от сервера или экспоненциальная с разбросом"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), MAX_BACKOFF)
+        except ValueError:
+            pass
+    return min(BACKOFF * 2 ** attempt, MAX_BACKOFF) * random.uniform(0.5, 1.0)
+
+
+async def _get(client, path, params, headers=None):
+    """GET с повторами при 429/5xx и сетевых ошибках"""
+    import httpx
+
+    for attempt in range(RETRIES + 1):
+        response = error = None
+        try:
+            response = await client.get(path, params=params, headers=headers)
+        except httpx.TransportError as e:
+            error = e
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                if response.status_code >= 400:
+                    raise SyncError(f"{path}: HTTP {response.status_code}")
+                return response
+        if attempt == RETRIES:
+            raise SyncError(f"{path}: {error or f'HTTP {response.status_code}'} после {RETRIES} повторов")
+        await asyncio.sleep(_delay(response, attempt))
+
+
+async def fetch_changes(client, district, cursor=None, etag=None, page_size=PAGE_SIZE):
+    """Новые и изменённые заявки района -> (заявки, ETag); None вместо заявок — изменений нет (304)"""
+    params = {'district': district, 'limit': page_size}
+    if cursor:
+        params['updated_since'] = cursor
+    headers = {'If-None-Match': etag} if etag else None
+    items, new_etag = [], None
+    while True:
+        response = await _get(client, '/applications', params, headers)
+        if response.status_code == 304:
+            return None, etag
+        new_etag = new_etag or response.headers.get('ETag')
+        page = response.json()
+        items.extend(page.get('items', []))
+        if not page.get('next_page_token'):
+            return items, new_etag
+        params = {**params, 'page_token': page['next_page_token']}
+        headers = None
+
+
+def applications_frame(items):
+    """Заявки из ответа API -> таблица столбцов хранилища"""
+    from store import district_key
+
+    df = pd.DataFrame.from_records(items, columns=list(FIELDS)).rename(columns=FIELDS)
+    return df.assign(
+        id=df['id'].astype(str),
+        Район=df['Район'].map({name: district_key(name) for name in df['Район'].unique()}),
+        Год=pd.to_numeric(df['Год']).astype('int64'),
+        БИН=df['БИН'].fillna('').astype(str).str.replace(r'\D', '', regex=True),
+        Сумма_тг=pd.to_numeric(df['Сумма_тг'], errors='coerce'),
+    )
+
+
+def registry_from_applications(apps, district):
+    """Реестр субсидий по годам из всех заявок района (та же схема, что у реестров из Excel)"""
+    paid = apps[~apps['Статус'].fillna('').str.lower().isin(REJECTED_STATUSES) & apps['Сумма_тг'].notna()]
+    recipients = paid['Получатель'].astype('string').str.strip()
+    df = pd.DataFrame({
+        'Район': district,
+        'Год': paid['Год'],
+        'Получатель': recipients,
+        'БИН': paid['БИН'].astype('string'),
+        'Тип': legal_form(recipients),
+        'Программа': program_category(paid['Субсидия'].astype('string')),
+        'Субсидия': paid['Субсидия'],
+        'Сумма_тг': paid['Сумма_тг'],
+        'Дата': pd.to_datetime(paid['Дата'], errors='coerce'),
+        'Источник': SOURCE,
+    }).astype(SUBSIDY_SCHEMA)
+    return {int(year): rows.reset_index(drop=True) for year, rows in df.groupby('Год', observed=True)}
+
+
+async def sync_district(client, store, district, state, semaphore, page_size=PAGE_SIZE):
+    """Синхронизировать один район; возвращает число новых и изменённых заявок"""
+    cursor, etag = state.get(district, (None, None))
+    async with semaphore:
+        items, new_etag = await fetch_changes(client, district, cursor, etag, page_size)
+    if items is None:
+        return 0
+    if not items:
+        await asyncio.to_thread(store.save_sync_state, SOURCE, district, cursor, new_etag)
+        return 0
+
+    changed = applications_frame(items)
+    changed = changed[changed['Район'] == district].drop_duplicates('id', keep='last')
+    years = sorted(changed['Год'].unique().tolist())
+    existing = await asyncio.to_thread(store.applications, district, years)
+    apps = pd.concat([existing[~existing['id'].isin(changed['id'])], changed], ignore_index=True)
+    by_year = registry_from_applications(apps, district)
+    # Год, в котором не осталось выплат (все заявки отклонены), — пустой реестр вместо прежнего
+    empty = pd.DataFrame({k: pd.Series(dtype=v) for k, v in SUBSIDY_SCHEMA.items()})
+    registry = {year: by_year.get(year, empty) for year in years}
+    new_cursor = max(changed['Изменена'].dropna(), default=cursor)
+    await asyncio.to_thread(store.apply_applications, district, changed, registry,
+                            SOURCE, district, new_cursor, new_etag)
+    return len(changed)
+
+
+async def sync(store, districts=None, url=None, token=None, concurrency=CONCURRENCY, page_size=PAGE_SIZE,
+               transport=None):
+    """Синхронизировать районы (по умолчанию — все районы хранилища).
+
+    Возвращает {район: число новых и изменённых заявок или исключение}.
+    transport — для подмены сетевого слоя httpx (например, httpx.MockTransport).
+    """
+    import httpx
+
+    url = url or QOLDAU_URL
+    if not url:
+        raise SyncError("Не задан адрес API: --url или TALDAU_QOLDAU_URL")
+    token = token or QOLDAU_TOKEN
+    districts = districts or store.districts()['district'].tolist()
+    state = store.sync_state(SOURCE)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {'Authorization': f'Bearer {token}'} if token else None
+    async with httpx.AsyncClient(base_url=url.rstrip('/'), headers=headers, limits=limits,
+                                 timeout=TIMEOUT, transport=transport) as client:
+        results = await asyncio.gather(
+            *(sync_district(client, store, d, state, semaphore, page_size) for d in districts),
+            return_exceptions=True)
+    return dict(zip(districts, results))
+
+
+def main(argv=None):
+    from ingest.entities import resolve_farms
+    from store import Store
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('districts', nargs='*', help='ключи районов (по умолчанию — все районы хранилища)')
+    parser.add_argument('--url', default=QOLDAU_URL, help='адрес API (TALDAU_QOLDAU_URL)')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='районов одновременно')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='заявок в одном ответе')
+    args = parser.parse_args(argv)
+
+    store = Store()
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(sync(store, args.districts, args.url, concurrency=args.concurrency,
+                                   page_size=args.page_size))
+    except SyncError as e:
+        sys.exit(str(e))
+    failed = 0
+    for district, result in results.items():
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"{district:<24} ошибка: {result}")
+        else:
+            print(f"{district:<24} {'изменений нет' if not result else f'заявок: {result}'}")
+    changed = sum(r for r in results.values() if not isinstance(r, Exception))
+    if changed:
+        # Новые получатели — в таблицу соответствий хозяйств, как после загрузки файлов
+        resolve_farms(store)
+    print(f"\nзаявок: {changed}, ошибок: {failed} за {time.perf_counter() - start:.1f} с, ревизия {store.revision}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
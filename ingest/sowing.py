@@ -0,0 +1,224 @@
+"""
+Ход посевной по дням (книга «ПОСЕВ_АРШАЛЫ_факт_2025.xlsx»).
+
+В книге по листу на каждую отчётную дату («5 мая», «20 июня 2025 (итог)»).
+Все датированные листы читаются потоково (openpyxl, read_only) в одну
+длинную таблицу SOWING_SCHEMA: хозяйство, культура, дата, план, факт.
+
+Разобранные листы сохраняются в .cache/sowing/<имя книги>.parquet вместе
+со списком листов. При следующем запуске открываются только новые листы
+и последний по дате (его могли дозаполнить); если книгу не меняли, она
+не открывается вовсе.
+"""
+
+import re
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR
+from ingest._cache import read_json, read_parquet, write_json, write_parquet
+from ingest._excel import cell_text, to_number
+
+SCHEMA_VERSION = 1
+
+SOWING_SCHEMA = {
+    'Хозяйство': 'string',
+    'Культура': 'category',
+    'Дата': 'datetime64[ns]',
+    'План_га': 'float64',
+    'Факт_га': 'float64',
+    'Лист': 'string',
+}
+
+SOWING_FILE = 'ПОСЕВ_АРШАЛЫ_факт_2025.xlsx'
+
+MONTHS = {
+    'январ': 1, 'феврал': 2, 'март': 3, 'апрел': 4, 'мая': 5, 'май': 5, 'июн': 6,
+    'июл': 7, 'август': 8, 'сентябр': 9, 'октябр': 10, 'ноябр': 11, 'декабр': 12,
+}
+_TEXT_DATE_RE = re.compile(r'(\d{1,2})\s+([а-яё]+)\s*(\d{4})?')
+_NUM_DATE_RE = re.compile(r'(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?')
+
+# Ключевые слова культур в заголовках (первое совпадение)
+CROP_KEYWORDS = [
+    ('пшениц', 'Пшеница'),
+    ('ячмен', 'Ячмень'),
+    ('овес', 'Овёс'),
+    ('овёс', 'Овёс'),
+    ('горох', 'Горох'),
+    ('маслич', 'Масличные'),
+    ('подсолн', 'Масличные'),
+    ('рапс', 'Масличные'),
+    ('кормов', 'Кормовые'),
+    ('зернов', 'Зерновые'),
+]
+FARM_KEYWORDS = ('хозяйств', 'наименование', 'схтп')
+TOTAL_LABEL = 'Всего'
+
+HEADER_SCAN_ROWS = 15
+
+
+def sheet_date(name, default_year):
+    """Дата отчёта по имени листа; None для недатированных листов"""
+    text = cell_text(name)
+    m = _TEXT_DATE_RE.search(text)
+    if m:
+        month = next((n for stem, n in MONTHS.items() if m[2].startswith(stem)), None)
+        if month:
+            return date(int(m[3] or default_year), month, int(m[1]))
+    m = _NUM_DATE_RE.search(text)
+    if m and 1 <= int(m[2]) <= 12:
+        year = int(m[3]) if m[3] else default_year
+        return date(year + 2000 if year < 100 else year, int(m[2]), int(m[1]))
+    return None
+
+
+def _column_roles(top, sub):
+    """Роли столбцов заголовка: {индекс: (культура, 'План_га' | 'Факт_га')}"""
+    roles = {}
+    crop_above = None
+    for i, head in enumerate(top):
+        head = cell_text(head)
+        # Объединённые ячейки культуры тянутся вправо над «план/факт»
+        if head:
+            crop_above = next((c for kw, c in CROP_KEYWORDS if kw in head), None)
+        label = f"{head} {cell_text(sub[i]) if i < len(sub) else ''}"
+        crop = next((c for kw, c in CROP_KEYWORDS if kw in label), None) or (crop_above if not head else None)
+        if '%' in label or 'выполн' in label:
+            continue
+        if 'план' in label:
+            measure = 'План_га'
+        elif 'факт' in label or 'посеян' in label or crop:
+            measure = 'Факт_га'
+        else:
+            continue
+        roles[i] = (crop or TOTAL_LABEL, measure)
+    return roles
+
+
+def parse_sowing_sheet(ws):
+    """Один лист в длинном формате (без столбцов «Дата» и «Лист»)"""
+    rows = ws.iter_rows(values_only=True)
+    header = []
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        header.append(row)
+        farm_col = next((i for i, v in enumerate(row) if any(k in cell_text(v) for k in FARM_KEYWORDS)), None)
+        if farm_col is not None:
+            break
+    else:
+        return None
+
+    top = header[-1]
+    sub = next(rows, ())
+    has_sub = any(cell_text(v) in ('план', 'факт') for v in sub)
+    roles = _column_roles(top, sub if has_sub else ())
+    if not roles:
+        return None
+    data_rows = rows if has_sub else _chain_first(sub, rows)
+
+    farms, values = [], []
+    for row in data_rows:
+        name = row[farm_col] if farm_col < len(row) else None
+        if name is None or not str(name).strip():
+            continue
+        farms.append(str(name).strip())
+        values.append([row[i] if i < len(row) else None for i in roles])
+
+    wide = pd.DataFrame(values, columns=pd.MultiIndex.from_tuples(list(roles.values())))
+    wide = wide.apply(to_number)
+    # Один показатель культуры может встречаться в нескольких столбцах
+    wide = wide.T.groupby(level=[0, 1]).sum(min_count=1).T
+    wide.index = pd.Index(farms, name='Хозяйство')
+
+    long = wide.stack(level=0, future_stack=True).rename_axis(['Хозяйство', 'Культура']).reset_index()
+    for col in ('План_га', 'Факт_га'):
+        if col not in long:
+            long[col] = float('nan')
+    long = long.dropna(subset=['План_га', 'Факт_га'], how='all')
+    # Итоговые строки по району (строку «КХ (всего)» оставляем как хозяйство)
+    total = long['Хозяйство'].str.contains(r'^(?:итого|всего)|по району', case=False, regex=True)
+    return long[~total]
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def _parse_sheets(path, names, dates):
+    from openpyxl import load_workbook  # импорт ~0.2 с — только когда книгу читают
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        frames = []
+        for name in names:
+            part = parse_sowing_sheet(wb[name])
+            if part is None or part.empty:
+                continue
+            part['Дата'] = pd.Timestamp(dates[name])
+            part['Лист'] = name
+            frames.append(part)
+    finally:
+        wb.close()
+    return frames
+
+
+def _empty():
+    return pd.DataFrame({k: pd.Series(dtype=v) for k, v in SOWING_SCHEMA.items()})
+
+
+def load_sowing_progress(path=None, cache_dir=None):
+    """Все датированные листы книги одной таблицей; разбираются только новые листы"""
+    path = Path(path or DATA_DIR / SOWING_FILE)
+    if not path.exists():
+        return _empty()
+    cache_dir = Path(cache_dir or CACHE_DIR / 'sowing')
+    state_path = cache_dir / f'{path.stem}.json'
+    table_path = cache_dir / f'{path.stem}.parquet'
+
+    st = path.stat()
+    state = read_json(state_path)
+    fresh = state.get('schema') == SCHEMA_VERSION and table_path.exists()
+    if fresh and state['size'] == st.st_size and state['mtime_ns'] == st.st_mtime_ns:
+        return read_parquet(table_path)
+
+    from openpyxl import load_workbook
+
+    year = int(m[0]) if (m := re.search(r'\d{4}', path.stem)) else date.today().year
+    wb = load_workbook(path, read_only=True)
+    try:
+        names = wb.sheetnames
+    finally:
+        wb.close()
+    dates = {n: d for n in names if (d := sheet_date(n, year))}
+
+    done = set(state.get('sheets', [])) if fresh else set()
+    todo = [n for n in dates if n not in done]
+    if done:
+        # Последний отчёт могли дозаполнить после прошлого запуска
+        latest = max((n for n in dates if n in done), key=dates.get, default=None)
+        if latest:
+            todo.append(latest)
+
+    old = read_parquet(table_path) if done else _empty()
+    old = old[old['Лист'].isin(set(dates) - set(todo))]
+    frames = [old] + _parse_sheets(path, todo, dates)
+    table = pd.concat([f for f in frames if not f.empty] or [_empty()], ignore_index=True)
+    table = table[list(SOWING_SCHEMA)].astype(SOWING_SCHEMA)
+    table = table.sort_values(['Дата', 'Хозяйство', 'Культура'], ignore_index=True)
+
+    write_parquet(table, table_path)
+    write_json({'schema': SCHEMA_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                'sheets': sorted(dates)}, state_path)
+    return table
+
+
+def sowing_signature(path=None):
+    """Размер и mtime книги — версия для кэша наборов (datasets.shared), чтобы он сбрасывался при её изменении"""
+    path = Path(path or DATA_DIR / SOWING_FILE)
+    if not path.exists():
+        return None
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
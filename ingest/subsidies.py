@@ -0,0 +1,178 @@
+"""
+Реестры субсидий (выгрузки вида «Аршалынскии__2025_.xlsx»).
+
+Книга разбирается один раз через openpyxl в режиме read_only, приводится
+к типизированной схеме SUBSIDY_SCHEMA и сохраняется в Parquet под именем
+<sha256 содержимого>.parquet. Повторные запуски читают Parquet за
+миллисекунды; если книгу не меняли, она вообще не открывается. Район, год
+и источник берутся из имени файла при каждом чтении: переименованная
+книга или копия под именем другого района не наследуют их из кэша.
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from config import CACHE_DIR, DATA_DIR
+from ingest._cache import Manifest, read_parquet, write_parquet
+from ingest._excel import match_header, to_date, to_number
+
+# Увеличить при изменении разбора — старые Parquet-файлы станут неактуальны
+SCHEMA_VERSION = 2
+
+SUBSIDY_SCHEMA = {
+    'Район': 'string',
+    'Год': 'Int16',
+    'Получатель': 'string',
+    'БИН': 'string',
+    'Тип': 'category',
+    'Программа': 'category',
+    'Субсидия': 'string',
+    'Сумма_тг': 'float64',
+    'Дата': 'datetime64[ns]',
+    'Источник': 'string',
+}
+
+# «Аршалынскии__2025_.xlsx» -> район «Аршалынскии», год 2025
+FILE_PATTERN = re.compile(r'^(?P<district>.+?)__(?P<year>\d{4})_?\.xlsx$', re.IGNORECASE)
+
+# Ключевые слова в заголовках столбцов (в порядке приоритета)
+COLUMN_KEYWORDS = {
+    'Получатель': ('получател', 'заявител', 'наименование схтп', 'наименование хозяйства'),
+    'БИН': ('бин', 'иин'),
+    'Субсидия': ('направлени', 'программ', 'вид субсид', 'наименование субсид'),
+    'Сумма_тг': ('сумма к выплате', 'выплачен', 'перечислен', 'сумма'),
+    'Дата': ('дата',),
+}
+
+LEGAL_FORMS = {
+    'ТОО': 'ТОО', 'КХ': 'КХ', 'К/Х': 'КХ', 'ФХ': 'КХ', 'Ф/Х': 'КХ',
+    'ПК': 'ПК', 'СПК': 'ПК', 'ИП': 'ИП', 'АО': 'АО',
+}
+_LEGAL_FORM_RE = re.compile(
+    r'^\s*(' + '|'.join(sorted(map(re.escape, LEGAL_FORMS), key=len, reverse=True)) + r')(?![\w/])',
+    re.IGNORECASE,
+)
+
+PROGRAM_KEYWORDS = [
+    ('инвест', 'Инвестиции'),
+    ('семен', 'Семеноводство'),
+    ('пестицид', 'Пестициды'),
+    ('гербицид', 'Пестициды'),
+    ('удобрен', 'Удобрения'),
+    ('племен', 'Животноводство'),
+    ('животн', 'Животноводство'),
+    ('вознагражд', 'Ставка вознаграждения'),
+]
+
+HEADER_SCAN_ROWS = 30
+
+
+def _iter_sheet_rows(ws):
+    """Строки данных листа как словари {поле: значение}"""
+    rows = ws.iter_rows(values_only=True)
+    mapping = None
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        mapping = match_header(row, COLUMN_KEYWORDS, required=('Получатель', 'Сумма_тг'))
+        if mapping:
+            break
+    if not mapping:
+        return
+    for row in rows:
+        yield {field: (row[i] if i < len(row) else None) for field, i in mapping.items()}
+
+
+def legal_form(names):
+    """Организационно-правовая форма по префиксу наименования"""
+    found = names.str.extract(_LEGAL_FORM_RE, expand=False).str.upper()
+    return found.map(LEGAL_FORMS).fillna('Прочие')
+
+
+def program_category(texts):
+    """Укрупнённая программа по тексту направления субсидирования"""
+    lowered = texts.fillna('').str.lower()
+    result = pd.Series('Прочие', index=texts.index, dtype=object)
+    for kw, category in reversed(PROGRAM_KEYWORDS):
+        result[lowered.str.contains(kw, regex=False)] = category
+    return result
+
+
+def _with_file_columns(df, path, district=None, year=None):
+    """Район, год (по умолчанию — из имени файла) и источник — имя файла"""
+    path = Path(path)
+    if district is None or year is None:
+        m = FILE_PATTERN.match(path.name)
+        if m:
+            district = district or m['district']
+            year = year or int(m['year'])
+    df = df.assign(Район=district, Год=year if year is not None else pd.NA, Источник=path.name)
+    return df.astype({k: SUBSIDY_SCHEMA[k] for k in ('Район', 'Год', 'Источник')})
+
+
+def parse_subsidies_workbook(path, district=None, year=None):
+    """Разобрать одну книгу реестра в DataFrame по схеме SUBSIDY_SCHEMA"""
+    from openpyxl import load_workbook  # импорт ~0.2 с — только когда книгу читают
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        records = [r for ws in wb.worksheets for r in _iter_sheet_rows(ws)]
+    finally:
+        wb.close()
+
+    df = pd.DataFrame.from_records(records, columns=list(COLUMN_KEYWORDS))
+    df['Получатель'] = df['Получатель'].astype('string').str.strip()
+    df['Сумма_тг'] = to_number(df['Сумма_тг'])
+
+    # Пустые строки, подытоги и строка «ИТОГО» (дублирует сумму реестра)
+    names = df['Получатель'].fillna('')
+    total_row = names.str.contains(r'итого|всего', case=False, regex=True)
+    df = df[(names != '') & ~total_row & df['Сумма_тг'].notna()].copy()
+
+    df = _with_file_columns(df, path, district, year)
+    df['БИН'] = df['БИН'].astype('string').str.replace(r'\D', '', regex=True)
+    df['Тип'] = legal_form(df['Получатель'])
+    df['Программа'] = program_category(df['Субсидия'].astype('string'))
+    df['Дата'] = to_date(df['Дата'])
+    return df[list(SUBSIDY_SCHEMA)].astype(SUBSIDY_SCHEMA).reset_index(drop=True)
+
+
+def cached_subsidies_workbook(path, manifest=None, cache_dir=None):
+    """Реестр из Parquet-кэша; книга разбирается, только если её содержимое новое"""
+    cache_dir = Path(cache_dir or CACHE_DIR / 'subsidies')
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest(cache_dir / 'manifest.json')
+
+    digest = manifest.digest(path)
+    cached = cache_dir / f'{digest}-v{SCHEMA_VERSION}.parquet'
+    if cached.exists():
+        df = _with_file_columns(read_parquet(cached), path)
+    else:
+        df = parse_subsidies_workbook(path)
+        write_parquet(df, cached)
+
+    if own_manifest:
+        manifest.save()
+    return df
+
+
+def subsidy_files(data_dir=None):
+    """Все реестры субсидий в каталоге данных"""
+    data_dir = Path(data_dir or DATA_DIR)
+    if not data_dir.is_dir():
+        return []
+    return sorted(p for p in data_dir.iterdir() if FILE_PATTERN.match(p.name))
+
+
+def load_subsidies(data_dir=None, cache_dir=None):
+    """Все реестры района/районов за все годы одним DataFrame"""
+    cache_dir = Path(cache_dir or CACHE_DIR / 'subsidies')
+    manifest = Manifest(cache_dir / 'manifest.json')
+    frames = [cached_subsidies_workbook(p, manifest, cache_dir) for p in subsidy_files(data_dir)]
+    manifest.save()
+    if not frames:
+        return pd.DataFrame({k: pd.Series(dtype=v) for k, v in SUBSIDY_SCHEMA.items()})
+    df = pd.concat(frames, ignore_index=True)
+    # После concat категории с разными наборами значений превращаются в object
+    return df.astype({k: v for k, v in SUBSIDY_SCHEMA.items() if v == 'category'})
@@ -0,0 +1,512 @@
+"""
+Загрузчики данных дашборда.
+
+Общие для всех страниц: хранилище районов, выбранный район, субсидии,
+посевы, мощности и оценочные потоки цепочки стоимости. Модуль не
+импортирует Plotly — графики строятся в модулях страниц (views/).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analytics import (
+    localization_table,
+    parse_capacity,
+    production_from_crops,
+    simulate,
+    subsidy_concentration,
+)
+from analytics.rollup import ALL, cells, combine, last_year, subsidy_rollup
+from analytics.subsidy_filter import subsidy_index
+from analytics.yields import build_features, fit, predict
+from config import DEFAULT_DISTRICT
+import datasets
+from ingest.entities import link_farms
+from ingest.features import load_yield_features, read_observed_yields, sources_signature
+from ingest.ndvi import farm_ndvi, folder_signature, load_field_ndvi
+from ingest.parcels import load_parcel_index, parcels_signature
+from ingest.subsidies import legal_form
+import perf
+from store import Store, data_signature, sync_from_files
+
+# Паспорт Аршалынского района — начальное наполнение хранилища, пока файл паспорта не загружен
+ARSHALY_PROFILE = {
+    "name": "Аршалынский район",
+    "region": "Акмолинская область",
+    "area_km2": 5800,
+    "area_ha": 584786,
+    "population": 33363,
+    "distance_to_astana": 71,
+    "agricultural_land_ha": 519400,
+    "arable_land_ha": 238500,
+    "pastures_ha": 275300,
+    "cattle": 16695,
+    "sheep_goats": 154784,
+    "horses": 9517,
+    "pigs": 4300,
+    "industrial_enterprises": 28,
+    "rural_districts": 12,
+    "settlements": 1,
+}
+
+# Перерабатывающие мощности Аршалынского района — пока не загружен свод мощностей
+ARSHALY_CAPACITY = pd.DataFrame({
+    'Тип_переработки': ['Мельницы', 'Элеваторы', 'Мясопереработка', 'Молокопереработка', 
+                       'Хранение овощей', 'Комбикорма'],
+    'Количество': [2, 3, 1, 0, 2, 1],
+    'Мощность': ['5000 т/год', '150000 т', '500 т/год', '0', '2000 т', '3000 т/год'],
+    'Загрузка_%': [40, 65, 30, 0, 25, 50],
+    'Статус': ['Работает', 'Работает', 'Частично', 'Нет', 'Сезонно', 'Работает']
+})
+
+# Каталог данных проверяется не чаще раза в SYNC_INTERVAL_S секунд
+SYNC_INTERVAL_S = 5
+_sync = {'signature': None, 'checked': 0.0, 'lock': threading.Lock()}
+
+@st.cache_resource
+def _open_store():
+    return Store()
+
+def get_store():
+    """Хранилище районов (SQLite) — одно на процесс, общее для всех сессий
+
+    Новые и изменённые файлы в каталоге данных переносятся в хранилище без
+    перезапуска дашборда: ревизия хранилища меняется, и общий кэш наборов
+    (datasets.py) отдаёт страницам уже новые данные.
+    """
+    store = _open_store()
+    now = time.monotonic()
+    if now - _sync['checked'] < SYNC_INTERVAL_S:
+        return store
+    with _sync['lock']:
+        if now - _sync['checked'] >= SYNC_INTERVAL_S:
+            signature = data_signature()
+            if signature != _sync['signature']:
+                sync_from_files(store)
+                _sync['signature'] = signature
+                if store.profile(DEFAULT_DISTRICT) is None:
+                    store.upsert_profile(ARSHALY_PROFILE, DEFAULT_DISTRICT)
+                if not store.years('capacities', DEFAULT_DISTRICT):
+                    store.replace_capacities(DEFAULT_DISTRICT, 2025, ARSHALY_CAPACITY)
+            _sync['checked'] = time.monotonic()
+    return store
+
+def current_district():
+    """Ключ района, выбранного в боковой панели"""
+    return st.session_state.get('district', DEFAULT_DISTRICT)
+
+def _revision(*args):
+    """Версия наборов из хранилища: ревизия меняется при любой записи, в том числе из другого процесса"""
+    return get_store().revision
+
+# Загрузчики ниже — запросы к индексу (район, год) хранилища. Таблицы хранятся
+# в общем кэше процесса (datasets.py) под ревизией хранилища: одна копия на все
+# сессии, а после обновления хранилища — сразу новые данные.
+
+@perf.traced('loader')
+def load_district_profile(district=DEFAULT_DISTRICT):
+    """Базовые данные района из паспорта (Паспорт_района_<год>.doc, ingest/passport.py)"""
+    store = get_store()
+    profile = store.profile(district)
+    if profile is None:
+        # Паспорт района ещё не загружен — известно только название
+        names = store.districts().set_index('district')['name']
+        profile = {"name": names.get(district, district)}
+    return profile
+
+@datasets.shared(version=_revision)
+def _registry(district):
+    return get_store().subsidies(district)
+
+@perf.traced('loader')
+def load_subsidies_data(district=DEFAULT_DISTRICT):
+    """Данные по субсидиям - РЕАЛЬНЫЕ из реестров <Район>__<год>_.xlsx
+
+    Реестры попадают в хранилище через колоночный кэш (ingest/subsidies.py).
+    Если для Аршалынского района файлов нет, возвращается выборка
+    топ-получателей 2025.
+    """
+    registry = _registry(district)
+    if not registry.empty or district != DEFAULT_DISTRICT:
+        return registry
+
+    # Реальные данные из файла (топ получателей)
+    subsidies_2025 = pd.DataFrame({
+        'Получатель': [
+            'ТОО "АГРО ПРЕСТИЖ М"', 
+            'КХ "Арай"', 
+            'ТОО "КОЙГЕЛЬДЫ-АСТЫК"',
+            'ПК "ИЖЕВСКИЙ"',
+            'ТОО "РАХАТ"',
+            'КХ "Айтпай" (Ивченко В.А.)',
+            'ТОО "BersuatAgroPro"',
+            'К/Х "АСЕТ"',
+            'ИП "СУРАЕВ Ю.В."',
+            'ИП "Искакова Н.Ж."'
+        ],
+        'Сумма_тг': [
+            91558200, 41670000, 41670000, 32277900, 20655000,
+            7374000, 3579677, 7593600, 3900000, 2910000
+        ],
+        'Тип': ['ТОО', 'КХ', 'ТОО', 'ПК', 'ТОО', 'КХ', 'ТОО', 'КХ', 'ИП', 'ИП'],
+        'Программа': [
+            'Инвестиции', 'Семеноводство', 'Семеноводство', 'Инвестиции', 'Инвестиции',
+            'Инвестиции', 'Инвестиции', 'Семеноводство', 'Инвестиции', 'Пестициды'
+        ]
+    })
+    subsidies_2025['Год'] = 2025
+    return subsidies_2025
+
+# Итоги реестра 2025 из файла (без строки ИТОГО, которая дублирует) — общая
+# ячейка куба, пока вместо реестра выборка топ-получателей
+SAMPLE_SUBSIDY_TOTAL = {'Год': 2025, 'Получателей': 33, 'Сумма_тг': 459720381}
+
+# Итоговый лист книги посевов «20 июня 2025 (итог)» — ячейки куба, пока книга не загружена
+SAMPLE_CROP_CELLS = pd.DataFrame({
+    'Культура': [ALL, 'Пшеница', 'Ячмень', 'Масличные', 'Кормовые', 'Горох', 'Овёс'],
+    'План_га': [173346, 148000, 18299, 10000, np.nan, 2500, np.nan],
+    'Факт_га': [191868, 163031, 21113, 18662, 11795, 1309, 1029],
+}).assign(Год=2025, Тип=ALL, Программа=ALL)
+
+@datasets.shared(version=_revision)
+def load_rollup(district=DEFAULT_DISTRICT):
+    """Куб итогов района по годам, типам получателей, программам и культурам (analytics/rollup.py)
+
+    Считается в хранилище при загрузке реестров и книг посевов. Для
+    Аршалынского района без файлов — ячейки по выборкам и итоговым строкам файлов.
+    """
+    cube = get_store().rollup(district)
+    if district != DEFAULT_DISTRICT:
+        return cube
+    samples = [cube]
+    if last_year(cube, 'Сумма_тг') is None:
+        sample = subsidy_rollup(load_subsidies_data(district)).assign(Год=SAMPLE_SUBSIDY_TOTAL['Год'])
+        total = (sample['Тип'] == ALL) & (sample['Программа'] == ALL)
+        sample['Выплат'] = sample['Выплат'].where(~total)
+        for measure in ('Получателей', 'Сумма_тг'):
+            sample.loc[total, measure] = SAMPLE_SUBSIDY_TOTAL[measure]
+        samples.append(sample.assign(Район=district))
+    if last_year(cube, 'Факт_га') is None:
+        samples.append(SAMPLE_CROP_CELLS.assign(Район=district))
+    return combine(*samples) if len(samples) > 1 else cube
+
+@perf.traced('loader')
+def load_subsidies_totals(district=DEFAULT_DISTRICT):
+    """Итоги за последний год реестра из куба; None — реестров нет"""
+    cube = load_rollup(district)
+    year = last_year(cube, 'Сумма_тг')
+    if year is None:
+        return None
+    total = cells(cube, Год=year).iloc[0]
+    top = load_top_recipients(district, year, 1)['Получатель']
+    top = top.iloc[0] if not top.empty else '—'
+    store = get_store()
+    return {
+        'year': year,
+        'total': float(total['Сумма_тг']),
+        'recipients_count': int(total['Получателей']),
+        'top_recipient': top.split('"')[1] if top.count('"') >= 2 else top,
+        'by_type': cells(cube, ['Тип'], Год=year).set_index('Тип')['Сумма_тг'].to_dict(),
+        'source': store.subsidy_source(district, year) or f"Аршалынскии__{year}_.xlsx",
+    }
+
+@datasets.shared(version=_revision)
+def load_top_recipients(district=DEFAULT_DISTRICT, year=2025, n=10):
+    """Крупнейшие получатели за год с разбивкой по программам — из итогов по получателям хранилища"""
+    store = get_store()
+    if year in store.years('subsidies', district):
+        return store.top_recipients(district, year, n)
+    sample = load_subsidies_data(district)
+    return (sample.groupby(['Получатель', 'Программа'], observed=True)['Сумма_тг']
+            .sum().reset_index().nlargest(n, 'Сумма_тг'))
+
+@datasets.shared(version=_revision)
+def load_concentration(district=DEFAULT_DISTRICT, year=2025):
+    """Концентрация субсидий за год — готовые агрегаты хранилища; для выборки топ-10 считается на месте"""
+    store = get_store()
+    if year in store.years('subsidies', district):
+        return store.concentration(district, year)
+    return subsidy_concentration(load_subsidies_data(district))
+
+@datasets.shared(version=_revision)
+def load_subsidy_index(district=DEFAULT_DISTRICT):
+    """Реестр всех лет, отсортированный для фильтров страницы (analytics/subsidy_filter.py).
+
+    Индекс — namedtuple массивов только для чтения: в общем кэше хранится как
+    есть, и фрагмент фильтров получает его без сборки DataFrame.
+    """
+    return subsidy_index(load_subsidies_data(district))
+
+@datasets.shared(version=_revision)
+def load_crops_data(district=DEFAULT_DISTRICT):
+    """Данные по посевам - РЕАЛЬНЫЕ из ПОСЕВ_АРШАЛЫ_факт_2025.xlsx"""
+    progress = load_sowing_data(district)
+    if not progress.empty:
+        return summarize_crops(progress)
+    if district != DEFAULT_DISTRICT:
+        return pd.DataFrame()
+
+    # Данные из файла: итоговый лист "20 июня 2025 (итог)"
+    crops = pd.DataFrame({
+        'Хозяйство': ['ТОО "Енбек-1"', 'ТОО "Tamyr2024"', 'ПК "Ижевский"', 'ТОО "ТНС-Агро"',
+                      'ТОО "Сарыоба астык"', 'ТОО "Акбулак Агро"', 'ТОО ПКФ "Агросоюз"',
+                      'ТОО "Николаевское"', 'ТОО "ПХ Аршалы"', 'ТОО "Адал-ниет"',
+                      'ТОО "Койгельды астык"', 'ТОО "Ольгинское"', 'КХ (всего)'],
+        'План_га': [16892, 12968, 10295, 7522, 5700, 6500, 4838, 4180, 3866, 2861, 2800, 2000, 44036],
+        'Факт_га': [19578, 14283, 11554, 8905, 7641, 6270, 4770, 4000, 650, 1640, 2700, 850, 53495],
+        'Пшеница_факт': [19578, 12439, 7931, 8905, 7161, 6270, 4770, 3750, 0, 540, 2000, 0, 45800],
+        'Ячмень_факт': [0, 1844, 2778, 0, 480, 0, 0, 250, 0, 648, 700, 500, 5655],
+        'Горох_факт': [0, 0, 567, 0, 0, 0, 0, 0, 0, 452, 0, 0, 70],
+        'Масличные_факт': [0, 6180, 449, 3900, 0, 0, 1830, 0, 0, 0, 0, 0, 568],
+        'Выполнение_%': [115.9, 110.1, 112.2, 118.4, 134.1, 96.5, 98.6, 95.7, 16.8, 57.3, 96.4, 42.5, 121.5]
+    })
+    return crops
+
+@datasets.shared(version=_revision)
+def load_farm_index(district=DEFAULT_DISTRICT):
+    """Хозяйства для фильтров страницы посевов: без итоговой строки КХ, по убыванию факта, с формой хозяйства"""
+    crops = load_crops_data(district)
+    if crops.empty:
+        return crops
+    farms = crops[crops['Хозяйство'] != 'КХ (всего)']
+    farms = farms.assign(Тип=legal_form(farms['Хозяйство']))
+    return farms.sort_values('Факт_га', ascending=False, kind='stable', ignore_index=True)
+
+@datasets.shared(version=_revision)
+def load_sowing_data(district=DEFAULT_DISTRICT):
+    """Ход посевной за последний год по всем датированным листам книги ПОСЕВ_<район>_факт_<год>.xlsx"""
+    store = get_store()
+    years = store.years('crops', district)
+    if not years:
+        return store.crops(district)
+    return store.crops(district, years[-1])
+
+def summarize_crops(progress):
+    """Сводка по хозяйствам на последнюю отчётную дату — как итоговый лист книги"""
+    last = progress[progress['Дата'] == progress['Дата'].max()]
+    wide = last.pivot_table(index='Хозяйство', columns='Культура', values=['План_га', 'Факт_га'],
+                            aggfunc='sum', observed=True)
+    cultures = [c for c in wide['Факт_га'].columns if c not in ('Всего', 'Зерновые')]
+    total = next((c for c in ('Зерновые', 'Всего') if c in wide['Факт_га'].columns), None)
+    summary = pd.DataFrame(index=wide.index)
+    for col in ('План_га', 'Факт_га'):
+        summary[col] = wide[col][total] if total else wide[col][cultures].sum(axis=1)
+    for c in cultures:
+        summary[f'{c}_факт'] = wide['Факт_га'][c].fillna(0)
+    summary['Выполнение_%'] = (summary['Факт_га'] / summary['План_га'] * 100).round(1)
+    return summary.fillna({'План_га': 0, 'Факт_га': 0}).reset_index()
+
+@datasets.shared(version=lambda district: folder_signature(district), max_entries=16)
+def _farm_vegetation(district):
+    stats, props = load_field_ndvi(district, cached_only=True)
+    series = farm_ndvi(stats, props)
+    series.attrs['pending'] = stats.attrs.get('pending', 0)
+    return series
+
+@datasets.shared(version=lambda district: (_revision(), folder_signature(district)))
+def load_vegetation(district=DEFAULT_DISTRICT):
+    """NDVI хозяйств по снимкам Sentinel-2 рядом с фактом посева (ingest/ndvi.py)
+
+    Возвращает (сводка по хозяйствам книги посевов, ряды NDVI по датам).
+    Снимки считаются заранее (python -m ingest.ndvi <район>); ещё не
+    посчитанные — в attrs['pending'] сводки. Хозяйства полей и книги
+    соединяются по farm_id, как в load_farm_support().
+    """
+    series = _farm_vegetation(district)
+    pending = series.attrs.get('pending', 0)
+    crops = load_crops_data(district)
+    if series.empty or crops.empty:
+        summary = pd.DataFrame()
+        summary.attrs['pending'] = pending
+        return summary, series
+    records = pd.concat([
+        pd.DataFrame({'Источник': 'crops', 'Название': crops['Хозяйство']}),
+        pd.DataFrame({'Источник': 'fields', 'Название': series['Хозяйство'].unique()}),
+    ]).drop_duplicates().assign(Район=district, БИН='')
+    ids = link_farms(records, get_store().farm_names(district)).set_index(['Источник', 'Название'])['farm_id']
+    sown = ids.loc['crops']
+    by_id = sown.reset_index().dropna().drop_duplicates('farm_id').set_index('farm_id')['Название']
+    series = series.assign(Хозяйство=ids.loc['fields'].reindex(series['Хозяйство']).map(by_id).to_numpy())
+    series = series.dropna(subset=['Хозяйство'])
+
+    observed = series.dropna(subset=['NDVI']).sort_values('Дата')
+    last = observed.groupby('Хозяйство').tail(2).groupby('Хозяйство').agg(
+        Дата=('Дата', 'last'), NDVI=('NDVI', 'last'), Предыдущий=('NDVI', 'first'), Снимков=('NDVI', 'size'))
+    last['Изменение'] = (last['NDVI'] - last['Предыдущий']).where(last['Снимков'] > 1)
+    summary = crops[['Хозяйство', 'Факт_га']].join(last[['Дата', 'NDVI', 'Изменение']], on='Хозяйство')
+    summary = summary.dropna(subset=['NDVI']).sort_values('Факт_га', ascending=False, ignore_index=True)
+    summary.attrs['pending'] = pending
+    return summary, series
+
+@datasets.shared(version=lambda district: (_revision(), parcels_signature(district)), max_entries=16)
+def load_parcels(district=DEFAULT_DISTRICT):
+    """Участки хозяйств для карты (ingest/parcels.py); None — файлов участков нет
+
+    К свойствам участка добавляются культура (из файла участков, иначе
+    основная культура хозяйства по книге посевов), выполнение плана посева и
+    субсидии на гектар хозяйства. Хозяйства участков и книги соединяются по
+    farm_id, как в load_vegetation(). Индекс — namedtuple с R-деревом: в общем
+    кэше хранится как есть.
+    """
+    parcels = load_parcel_index(district)
+    if parcels is None:
+        return None
+    props = parcels.props.assign(**{'Выполнение_%': np.nan, 'Субсидии_на_га_тг': np.nan})
+    crops = load_crops_data(district)
+    crops = crops[crops['Хозяйство'] != 'КХ (всего)'] if not crops.empty else crops
+    if crops.empty or props['Хозяйство'].isna().all():
+        return parcels._replace(props=props)
+    records = pd.concat([
+        pd.DataFrame({'Источник': 'crops', 'Название': crops['Хозяйство']}),
+        pd.DataFrame({'Источник': 'parcels', 'Название': props['Хозяйство'].dropna().unique()}),
+    ]).drop_duplicates().assign(Район=district, БИН='')
+    ids = link_farms(records, get_store().farm_names(district)).set_index(['Источник', 'Название'])['farm_id']
+    by_id = ids.loc['crops'].reset_index().dropna().drop_duplicates('farm_id').set_index('farm_id')['Название']
+    farm = props['Хозяйство'].map(ids.loc['parcels']).map(by_id)
+
+    sown = crops.set_index('Хозяйство')
+    cultures = sown[[c for c in sown if c.endswith('_факт')]]
+    main_crop = cultures.idxmax(axis=1).str.removesuffix('_факт').where(cultures.sum(axis=1) > 0)
+    support = load_farm_support(district)
+    per_ha = support.set_index('Хозяйство')['Субсидии_на_га_тг'] if not support.empty else pd.Series(dtype=float)
+    props = props.assign(**{
+        'Культура': props['Культура'].fillna(farm.map(main_crop)),
+        'Выполнение_%': farm.map(sown['Выполнение_%']),
+        'Субсидии_на_га_тг': farm.map(per_ha),
+    })
+    return parcels._replace(props=props)
+
+def _forecast_version(*args):
+    return _revision(), sources_signature()
+
+@datasets.shared(version=_forecast_version)
+def _regional_forecast():
+    """Прогноз для всех хозяйств всех районов: признаки из хранилища признаков, одна модель на область"""
+    features = load_yield_features(get_store())
+    model = fit(features, read_observed_yields())
+    return (predict(model, features) if not features.empty else pd.DataFrame()), model
+
+@datasets.shared(version=_forecast_version)
+def load_yield_forecast(district=DEFAULT_DISTRICT):
+    """Прогноз урожайности и валового сбора по хозяйствам и культурам района за последний год
+
+    Возвращает (прогноз, модель). Для выборки-заглушки без книги посевов
+    признаки строятся по сводке хозяйств (только площади).
+    """
+    forecast, model = _regional_forecast()
+    if not forecast.empty and (forecast['Район'] == district).any():
+        forecast = forecast[forecast['Район'] == district]
+        return forecast[forecast['Год'] == forecast['Год'].max()].reset_index(drop=True), model
+    crops = load_crops_data(district)
+    # Год сводки — последний год с фактом посева в кубе (у выборки-заглушки — год её листа)
+    year = last_year(load_rollup(district), 'Факт_га')
+    if crops.empty or year is None:
+        return pd.DataFrame(), model
+    progress = (crops[['Хозяйство'] + [c for c in crops if c.endswith('_факт')]]
+                .melt(id_vars='Хозяйство', var_name='Культура', value_name='Факт_га')
+                .assign(Культура=lambda d: d['Культура'].str.removesuffix('_факт'),
+                        Район=district, Год=year, Дата=pd.Timestamp(year, 6, 20), План_га=np.nan))
+    return predict(model, build_features(progress)), model
+
+@datasets.shared(version=_revision)
+def load_farm_support(district=DEFAULT_DISTRICT):
+    """Субсидии на гектар посева по хозяйствам: реестр и книга посевов соединены по farm_id
+
+    Наименования берутся из таблицы соответствий хранилища; те, которых в
+    ней нет (выборки-заглушки), сопоставляются на лету.
+    """
+    crops = load_crops_data(district)
+    subsidies = load_subsidies_data(district)
+    if crops.empty or subsidies.empty:
+        return pd.DataFrame()
+    progress = load_sowing_data(district)
+    year = progress['Дата'].max().year if not progress.empty else subsidies['Год'].max()
+    paid = subsidies[subsidies['Год'] == (year if (subsidies['Год'] == year).any() else subsidies['Год'].max())]
+
+    records = pd.concat([
+        pd.DataFrame({'Источник': 'crops', 'Название': crops['Хозяйство'], 'БИН': ''}),
+        pd.DataFrame({'Источник': 'subsidies', 'Название': paid['Получатель'],
+                      'БИН': paid['БИН'].fillna('') if 'БИН' in paid else ''}),
+    ]).drop_duplicates().assign(Район=district)
+    ids = link_farms(records, get_store().farm_names(district)).set_index(['Источник', 'Название', 'БИН'])['farm_id']
+
+    sown = crops.assign(farm_id=ids.loc['crops'].droplevel('БИН').reindex(crops['Хозяйство']).to_numpy())
+    paid_bin = paid['БИН'].fillna('') if 'БИН' in paid else pd.Series('', index=paid.index)
+    paid = paid.assign(farm_id=ids.loc['subsidies'].reindex(
+        pd.MultiIndex.from_arrays([paid['Получатель'], paid_bin])).to_numpy())
+
+    support = (sown.dropna(subset=['farm_id']).groupby('farm_id')
+               .agg(Хозяйство=('Хозяйство', 'first'), Посев_га=('Факт_га', 'sum')))
+    support['Субсидии_тг'] = paid.groupby('farm_id')['Сумма_тг'].sum().reindex(support.index).fillna(0)
+    support['Субсидии_на_га_тг'] = support['Субсидии_тг'] / support['Посев_га'].where(support['Посев_га'] > 0)
+    support = support.reset_index().sort_values('Посев_га', ascending=False, ignore_index=True)
+    support.attrs['year'] = int(paid['Год'].iloc[0])
+    support.attrs['paid_total'] = float(paid['Сумма_тг'].sum())
+    return support
+
+@datasets.shared(version=_revision)
+def load_processing_capacity(district=DEFAULT_DISTRICT):
+    """Данные о перерабатывающих мощностях; «Мощность» разобрана в тонны (analytics/allocation.py)"""
+    store = get_store()
+    years = store.years('capacities', district)
+    capacities = store.capacities(district, years[-1] if years else None)
+    return capacities.join(parse_capacity(capacities['Мощность']))
+
+@datasets.shared(version=_revision)
+def load_investment_projects(district=DEFAULT_DISTRICT):
+    """Инвестиционные проекты района за последний год перечня (<район>_проекты.xls, ingest/projects.py)"""
+    store = get_store()
+    years = store.years('projects', district)
+    return store.projects(district, years[-1] if years else None)
+
+@datasets.shared
+def load_value_chain_flows():
+    """Потоки продукции - ОЦЕНОЧНЫЕ ДАННЫЕ, требуют верификации!
+    
+    ⚠️ Эти данные НЕ из файлов, а экспертные оценки.
+    Для получения реальных данных необходимо:
+    1. Опрос СХТП района о направлениях сбыта
+    2. Данные перерабатывающих предприятий
+    3. Статистика вывоза продукции
+    """
+    return pd.DataFrame({
+        'Продукция': ['Зерно', 'Мясо КРС', 'Молоко', 'Овощи', 'Корма'],
+        'Производство_т': [180000, 2500, 8000, 1500, 15000],  # Оценка на основе посевов
+        'Местная_переработка_%': [15, 20, 5, 30, 60],  # ⚠️ ОЦЕНКА
+        'Вывоз_в_Астану_%': [60, 50, 70, 50, 10],      # ⚠️ ОЦЕНКА
+        'Вывоз_другие_%': [25, 30, 25, 20, 30],        # ⚠️ ОЦЕНКА
+        'Цена_производителя_тг': [80000, 1500000, 200000, 150000, 50000],
+        'Цена_конечная_тг': [250000, 3500000, 400000, 350000, 80000],
+        'Источник': ['Оценка'] * 5  # Маркер что это оценки
+    })
+
+@datasets.shared
+def load_localization():
+    """Потоки продукции с показателями локализации (analytics/localization.py)"""
+    return localization_table(load_value_chain_flows())
+
+@datasets.shared(version=_revision)
+def load_capacity_flows(district=DEFAULT_DISTRICT):
+    """Потоки для распределения по мощностям: производство зерна и кормов — по посевам района
+
+    Остальная продукция и доли направлений — оценки load_value_chain_flows().
+    """
+    flows = load_value_chain_flows()
+    crops = load_crops_data(district)
+    if crops.empty:
+        return flows
+    sown = production_from_crops(crops)
+    return flows.assign(Производство_т=flows['Продукция'].map(sown).fillna(flows['Производство_т']))
+
+@datasets.shared(max_entries=32)
+def load_simulation(share_spread, price_spread, n_draws):
+    """Монте-Карло по оценочным потокам (analytics/montecarlo.py)
+
+    Результат кэшируется для каждого набора параметров: возврат ползунка к
+    уже просчитанному значению не запускает симуляцию заново.
+    """
+    return simulate(load_value_chain_flows(), n_draws, share_spread, price_spread)
@@ -0,0 +1,239 @@
+"""
+Замеры отрисовки дашборда.
+
+Каждый перезапуск скрипта (rerun) записывает трассу: время страницы
+(page_*), загрузчиков (loaders.py; у кэшируемых — попадание или промах
+общего кэша наборов datasets.shared), фабрик графиков (@cached_figure;
+попадание — из FIGURES) и объём сообщений, ушедших в браузер, по каждому
+элементу (plotly_chart, dataframe и т.д.). Объём считается по сериализованному protobuf в момент
+отправки, поэтому таблицы и графики не сериализуются повторно.
+
+Трасса перезапуска пишется одной JSON-строкой в журнал taldau.perf (файл
+из TALDAU_PERF_LOG, «-» — stderr) и показывается в боковой панели, если
+задано TALDAU_DEBUG=1 или в адресе страницы есть ?debug=1.
+
+Фрагменты (@perf.fragment) перезапускаются отдельно от страницы — такой
+перезапуск пишется своей трассой.
+
+Вне перезапуска Streamlit (инструменты в tools/, импорт из консоли)
+обёртки только вызывают исходную функцию.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+LOGGER = logging.getLogger('taldau.perf')
+PERF_LOG = os.environ.get('TALDAU_PERF_LOG')
+DEBUG_PANEL = os.environ.get('TALDAU_DEBUG') == '1'
+
+# Трасса текущего перезапуска: у каждой сессии Streamlit свой поток скрипта
+_TRACE = contextvars.ContextVar('perf_trace', default=None)
+
+KIND_LABELS = {'page': 'страница', 'fragment': 'фрагмент', 'loader': 'загрузчик', 'figure': 'график',
+               'element': 'элемент'}
+
+
+def _setup_log():
+    if not PERF_LOG or LOGGER.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if PERF_LOG == '-' else logging.FileHandler(PERF_LOG, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    LOGGER.addHandler(handler)
+    LOGGER.setLevel(logging.INFO)
+    LOGGER.propagate = False
+
+
+_setup_log()
+
+
+class Trace:
+    """События одного перезапуска: вложенные замеры и отправленные элементы"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = []
+        self._stack = []
+
+    def open(self, kind, name):
+        event = {'kind': kind, 'name': name, 'depth': len(self._stack),
+                 'start_ms': (time.perf_counter() - self.start) * 1000, 'ms': None, 'hit': None, 'bytes': 0}
+        self.events.append(event)
+        self._stack.append(event)
+        return event
+
+    def close(self, event):
+        event['ms'] = (time.perf_counter() - self.start) * 1000 - event['start_ms']
+        # Замер мог остаться открытым из-за исключения во вложенном — снимаем до своего
+        while self._stack and self._stack.pop() is not event:
+            pass
+
+    def miss(self):
+        """Промах кэша: вызвана исходная функция открытого замера"""
+        if self._stack:
+            self._stack[-1]['hit'] = False
+
+    def element(self, name, size):
+        """Элемент, ушедший в браузер; объём засчитывается и всем открытым замерам"""
+        for event in self._stack:
+            event['bytes'] += size
+        self.events.append({'kind': 'element', 'name': name, 'depth': len(self._stack),
+                            'start_ms': (time.perf_counter() - self.start) * 1000, 'ms': None,
+                            'hit': None, 'bytes': size})
+
+    def total_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+
+@contextmanager
+def span(kind, name):
+    """Замер блока в трассе текущего перезапуска (без трассы — ничего не делает)"""
+    trace = _TRACE.get()
+    if trace is None:
+        yield None
+        return
+    event = trace.open(kind, name)
+    try:
+        yield event
+    finally:
+        trace.close(event)
+
+
+def mark_miss():
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.miss()
+
+
+def traced(kind, name=None):
+    """Декоратор: каждый вызов функции — замер вида kind"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _TRACE.get() is None:
+                return func(*args, **kwargs)
+            with span(kind, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _hook_enqueue(trace):
+    """Перехват отправки сообщений сессии — размер каждого нового элемента.
+
+    Внутренний API Streamlit: если его нет, трасса остаётся без объёмов.
+    Возвращает функцию, снимающую перехват.
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return lambda: None
+    ctx = get_script_run_ctx()
+    if ctx is None or not hasattr(ctx, 'enqueue'):
+        return lambda: None
+    original = ctx.enqueue
+
+    def enqueue(msg):
+        if msg.WhichOneof('type') == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            trace.element(msg.delta.new_element.WhichOneof('type'), msg.ByteSize())
+        return original(msg)
+
+    ctx.enqueue = enqueue
+    return lambda: vars(ctx).pop('enqueue', None)
+
+
+@contextmanager
+def rerun(page, **context):
+    """Трасса одного перезапуска: замеры внутри блока, в конце — строка журнала.
+
+    Трасса остаётся в session_state['perf_trace'] до следующего перезапуска.
+    """
+    trace = Trace()
+    token = _TRACE.set(trace)
+    unhook = _hook_enqueue(trace)
+    try:
+        yield trace
+    finally:
+        unhook()
+        _TRACE.reset(token)
+        st.session_state['perf_trace'] = trace
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(json.dumps(record(trace, page, **context), ensure_ascii=False))
+
+
+def fragment(func):
+    """st.fragment с замером: виджет внутри фрагмента перезапускает только его.
+
+    При полном перезапуске фрагмент — замер в трассе страницы; при
+    перезапуске одного фрагмента — своя трасса (page — имя фрагмента).
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def body(*args, **kwargs):
+        if _TRACE.get() is not None:
+            with span('fragment', name):
+                return func(*args, **kwargs)
+        with rerun(name, fragment=True):
+            return func(*args, **kwargs)
+
+    return st.fragment(body)
+
+
+def record(trace, page, **context):
+    """Запись журнала: итоги перезапуска и все события"""
+    return {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'page': page,
+        **context,
+        'total_ms': round(trace.total_ms(), 1),
+        'bytes': sum(e['bytes'] for e in trace.events if e['kind'] == 'element'),
+        'events': [{k: round(v, 1) if isinstance(v, float) else v for k, v in e.items() if v is not None}
+                   for e in trace.events],
+    }
+
+
+def breakdown(trace):
+    """События трассы таблицей — для панели отладки"""
+    events = pd.DataFrame(trace.events, columns=['kind', 'name', 'depth', 'start_ms', 'ms', 'hit', 'bytes'])
+    hit = events['hit'].map({True: 'попадание', False: 'промах'})
+    return pd.DataFrame({
+        'Что': ['  ' * d + n for d, n in zip(events['depth'], events['name'])],
+        'Вид': events['kind'].map(KIND_LABELS),
+        'Начало_мс': events['start_ms'],
+        'Время_мс': events['ms'],
+        'Кэш': hit,
+        'Объём_КБ': events['bytes'] / 1024,
+    })
+
+
+def debug_enabled():
+    return DEBUG_PANEL or st.query_params.get('debug') == '1'
+
+
+def debug_panel(trace):
+    """Разбивка перезапуска по замерам в боковой панели"""
+    events = trace.events
+    loaders = [e for e in events if e['kind'] == 'loader']
+    misses = sum(e['hit'] is False for e in loaders)
+    figures = [e for e in events if e['kind'] == 'figure']
+    sent = sum(e['bytes'] for e in events if e['kind'] == 'element')
+    with st.sidebar.expander("⏱️ Отрисовка"):
+        st.caption(f"Перезапуск: {trace.total_ms():.0f} мс · ответ: {sent / 1024:.0f} КБ · "
+                   f"загрузчиков: {len(loaders)} (промахов кэша: {misses}) · "
+                   f"графиков: {len(figures)} (построено: {sum(e['hit'] is False for e in figures)})")
+        st.dataframe(breakdown(trace), hide_index=True, width='stretch', column_config={
+            'Начало_мс': st.column_config.NumberColumn(format='%.0f'),
+            'Время_мс': st.column_config.NumberColumn(format='%.1f'),
+            'Объём_КБ': st.column_config.NumberColumn(format='%.1f'),
+        })
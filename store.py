@@ -0,0 +1,770 @@
+"""
+Локальное хранилище районов (SQLite).
+
+Профили, субсидии, посевы и перерабатывающие мощности всех районов лежат в
+одном файле и индексированы по (район, год). Страницы запрашивают только
+строки выбранного района, поэтому переключение между районами не зависит от
+того, сколько районов загружено.
+
+Наполнение — sync_from_files(): реестры, книги посевов, мощности, проекты и
+паспорта из каталога данных переносятся в хранилище, неизменившиеся файлы
+(по хэшу) пропускаются.
+
+    python store.py            # обновить хранилище из каталога данных
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.concentration import subsidy_concentration
+from analytics.rollup import CROP_MEASURES, SUBSIDY_MEASURES, crop_rollup, subsidy_rollup
+from config import CACHE_DIR, DATA_DIR, STORE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS districts (
+    district TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    region TEXT,
+    profile TEXT
+);
+CREATE INDEX IF NOT EXISTS districts_region ON districts (region);
+CREATE TABLE IF NOT EXISTS subsidies (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    recipient TEXT,
+    bin TEXT,
+    type TEXT,
+    program TEXT,
+    subsidy TEXT,
+    amount REAL,
+    date TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS subsidies_district_year ON subsidies (district, year);
+-- Итоги реестра по получателю и программе: обновляются вместе с реестром
+-- района за год, реестр получателей на странице читает только их
+CREATE TABLE IF NOT EXISTS recipient_totals (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    recipient TEXT,
+    bin TEXT,
+    type TEXT,
+    program TEXT,
+    payments INTEGER,
+    amount REAL,
+    last_date TEXT
+);
+CREATE INDEX IF NOT EXISTS recipient_totals_district_year ON recipient_totals (district, year);
+-- Концентрация субсидий района за год по разрезам (analytics/concentration.py)
+CREATE TABLE IF NOT EXISTS concentration (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    dimension TEXT,
+    value TEXT,
+    recipients INTEGER,
+    amount REAL,
+    share_pct REAL,
+    hhi REAL,
+    gini REAL,
+    top1_pct REAL,
+    top5_pct REAL,
+    top10_pct REAL,
+    lorenz TEXT
+);
+CREATE INDEX IF NOT EXISTS concentration_district_year ON concentration (district, year);
+CREATE TABLE IF NOT EXISTS crops (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    farm TEXT,
+    crop TEXT,
+    date TEXT,
+    plan_ha REAL,
+    fact_ha REAL,
+    sheet TEXT
+);
+CREATE INDEX IF NOT EXISTS crops_district_year ON crops (district, year);
+-- Агрегатный куб (analytics/rollup.py): итоги реестров и книг посевов по типу
+-- получателя, программе и культуре, '*' — итог по измерению. Пересчитывается
+-- вместе с реестром или книгой района за год
+CREATE TABLE IF NOT EXISTS rollup (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    program TEXT NOT NULL,
+    crop TEXT NOT NULL,
+    payments INTEGER,
+    recipients INTEGER,
+    amount REAL,
+    farms INTEGER,
+    plan_ha REAL,
+    fact_ha REAL,
+    PRIMARY KEY (district, year, type, program, crop)
+);
+-- Соответствие наименований хозяйств в разных наборах данных (ingest/entities.py);
+-- bin = '' там, где БИН нет (книги посевов)
+CREATE TABLE IF NOT EXISTS farm_names (
+    district TEXT NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    bin TEXT NOT NULL DEFAULT '',
+    form TEXT,
+    key TEXT,
+    farm_id INTEGER,
+    PRIMARY KEY (district, source, name, bin)
+);
+CREATE INDEX IF NOT EXISTS farm_names_farm ON farm_names (farm_id);
+CREATE TABLE IF NOT EXISTS capacities (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    kind TEXT,
+    count INTEGER,
+    capacity TEXT,
+    load_pct REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS capacities_district_year ON capacities (district, year);
+-- Инвестиционные проекты района (ingest/projects.py)
+CREATE TABLE IF NOT EXISTS projects (
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    project TEXT,
+    initiator TEXT,
+    industry TEXT,
+    cost_mln REAL,
+    jobs INTEGER,
+    period TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_district_year ON projects (district, year);
+-- Заявки на субсидии из API Qoldau (ingest/qoldau.py): из них пересобирается
+-- реестр subsidies района за год, в котором изменилась хотя бы одна заявка
+CREATE TABLE IF NOT EXISTS applications (
+    id TEXT PRIMARY KEY,
+    district TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    recipient TEXT,
+    bin TEXT,
+    subsidy TEXT,
+    amount REAL,
+    date TEXT,
+    status TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS applications_district_year ON applications (district, year);
+-- Точка продолжения синхронизации с внешним источником: курсор и ETag по потоку (району)
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    cursor TEXT,
+    etag TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (source, stream)
+);
+"""
+
+# Имена столбцов в хранилище -> имена столбцов в DataFrame страниц
+SUBSIDY_COLUMNS = {
+    'district': 'Район', 'year': 'Год', 'recipient': 'Получатель', 'bin': 'БИН',
+    'type': 'Тип', 'program': 'Программа', 'subsidy': 'Субсидия', 'amount': 'Сумма_тг',
+    'date': 'Дата', 'source': 'Источник',
+}
+CROP_COLUMNS = {
+    'district': 'Район', 'year': 'Год', 'farm': 'Хозяйство', 'crop': 'Культура',
+    'date': 'Дата', 'plan_ha': 'План_га', 'fact_ha': 'Факт_га', 'sheet': 'Лист',
+}
+CONCENTRATION_COLUMNS = {
+    'dimension': 'Измерение', 'value': 'Значение', 'recipients': 'Получателей', 'amount': 'Сумма_тг',
+    'share_pct': 'Доля_%', 'hhi': 'HHI', 'gini': 'Джини', 'top1_pct': 'Топ1_%', 'top5_pct': 'Топ5_%',
+    'top10_pct': 'Топ10_%', 'lorenz': 'Лоренц',
+}
+APPLICATION_COLUMNS = {
+    'id': 'id', 'district': 'Район', 'year': 'Год', 'recipient': 'Получатель', 'bin': 'БИН',
+    'subsidy': 'Субсидия', 'amount': 'Сумма_тг', 'date': 'Дата', 'status': 'Статус',
+    'updated_at': 'Изменена',
+}
+FARM_NAME_COLUMNS = {
+    'district': 'Район', 'source': 'Источник', 'name': 'Название', 'bin': 'БИН',
+    'form': 'Форма', 'key': 'Ключ', 'farm_id': 'farm_id',
+}
+ROLLUP_COLUMNS = {
+    'district': 'Район', 'year': 'Год', 'type': 'Тип', 'program': 'Программа', 'crop': 'Культура',
+    'payments': 'Выплат', 'recipients': 'Получателей', 'amount': 'Сумма_тг',
+    'farms': 'Хозяйств', 'plan_ha': 'План_га', 'fact_ha': 'Факт_га',
+}
+CAPACITY_COLUMNS = {
+    'kind': 'Тип_переработки', 'count': 'Количество', 'capacity': 'Мощность',
+    'load_pct': 'Загрузка_%', 'status': 'Статус',
+}
+PROJECT_COLUMNS = {
+    'project': 'Проект', 'initiator': 'Инициатор', 'industry': 'Отрасль', 'cost_mln': 'Стоимость_млн_тг',
+    'jobs': 'Рабочих_мест', 'period': 'Срок', 'status': 'Статус',
+}
+
+# Сортировка реестра получателей: столбец на странице -> столбец запроса Store.recipients
+RECIPIENT_SORT = {
+    'Сумма_тг': 'amount',
+    'Получатель': 'recipient',
+    'Выплат': 'payments',
+    'Последняя_выплата': 'last_date',
+}
+
+RECIPIENT_TOTALS_SQL = """
+    INSERT INTO recipient_totals
+    SELECT district, year, recipient, bin, type, program, COUNT(*), SUM(amount), MAX(date)
+    FROM subsidies WHERE {where}
+    GROUP BY district, year, recipient, bin, type, program
+"""
+
+# Разные написания района в именах файлов
+DISTRICT_ALIASES = {
+    'аршалы': 'аршалынскии',
+}
+
+
+def district_key(name):
+    """Ключ района: «Аршалынский район», «Аршалынскии», «АРШАЛЫ» -> «аршалынскии»"""
+    key = str(name).lower().replace('ё', 'е').replace('й', 'и')
+    key = re.sub(r'\bраион\b', '', key)
+    key = re.sub(r'[^a-zа-я0-9]+', '', key)
+    return DISTRICT_ALIASES.get(key, key)
+
+
+class Store:
+    """Соединение с хранилищем; безопасно для потоков сессий Streamlit"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # LOWER() в SQLite понимает только латиницу — поиск по названию через Python
+        self._conn.create_function('casefold', 1, lambda v: v.casefold() if v else v, deterministic=True)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+        # Хранилище из прошлой версии: итоги по получателям ещё не посчитаны
+        with self._lock:
+            missing = self._conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM subsidies) AND NOT EXISTS (SELECT 1 FROM recipient_totals)"
+            ).fetchone()[0]
+        if missing:
+            self._write([(RECIPIENT_TOTALS_SQL.format(where="1 = 1"), ())])
+        with self._lock:
+            stale = self._conn.execute(
+                "SELECT DISTINCT district, year FROM recipient_totals "
+                "EXCEPT SELECT DISTINCT district, year FROM concentration").fetchall()
+        for district, year in stale:
+            totals = self.query("SELECT recipient, bin, type, program, amount FROM recipient_totals "
+                                "WHERE district = ? AND year = ?", (district, year))
+            totals = totals.rename(columns=SUBSIDY_COLUMNS)
+            self._write(self._concentration_statements(district, year, totals))
+        # Куб ещё не посчитан для реестров и книг, загруженных прошлой версией
+        for table, measure, rollup in (('subsidies', 'payments', subsidy_rollup), ('crops', 'farms', crop_rollup)):
+            with self._lock:
+                stale = self._conn.execute(
+                    f"SELECT DISTINCT district, year FROM {table} "
+                    f"EXCEPT SELECT district, year FROM rollup WHERE {measure} IS NOT NULL").fetchall()
+            for district, year in stale:
+                rows = self._select(table, SUBSIDY_COLUMNS if table == 'subsidies' else CROP_COLUMNS, district, year)
+                measures = SUBSIDY_MEASURES if table == 'subsidies' else CROP_MEASURES
+                self._write(self._rollup_statements(district, year, rollup(rows), measures))
+
+    # ---------- служебное ----------
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def _write(self, statements):
+        """Выполнить изменения одной транзакцией и увеличить номер ревизии"""
+        with self._lock, self._conn:
+            for sql, params in statements:
+                if isinstance(params, list):
+                    self._conn.executemany(sql, params)
+                else:
+                    self._conn.execute(sql, params or ())
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('revision', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1")
+
+    @property
+    def revision(self):
+        """Номер ревизии — ключ кэша Streamlit, меняется при любой записи"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return int(row[0]) if row else 0
+
+    def source_digest(self, path):
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM sources WHERE path = ?", (str(path),)).fetchone()
+        return row[0] if row else None
+
+    # ---------- запись ----------
+
+    def upsert_profile(self, profile, district=None, source=None, digest=None):
+        district = district or district_key(profile['name'])
+        statements = [(
+            "INSERT INTO districts (district, name, region, profile) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(district) DO UPDATE SET name = excluded.name, region = excluded.region, "
+            "profile = excluded.profile",
+            (district, profile['name'], profile.get('region'), json.dumps(profile, ensure_ascii=False)),
+        )]
+        if source and digest:
+            statements.append(("INSERT OR REPLACE INTO sources (path, sha256) VALUES (?, ?)",
+                               (str(source), digest)))
+        self._write(statements)
+
+    def _ensure_district(self, district, name=None):
+        return ("INSERT OR IGNORE INTO districts (district, name) VALUES (?, ?)",
+                (district, name or district.capitalize()))
+
+    def _replace_rows(self, table, columns, district, year, df, source=None, digest=None, derived=()):
+        """Заменить строки района за год одной транзакцией (вместе с производными таблицами)"""
+        self._write(self._replace_statements(table, columns, district, year, df, source, digest, derived))
+
+    def _replace_statements(self, table, columns, district, year, df, source=None, digest=None, derived=()):
+        rows = pd.DataFrame({col: df[name] for col, name in columns.items()
+                             if name in df and col not in ('district', 'year')})
+        if 'date' in rows:
+            rows['date'] = pd.to_datetime(rows['date']).dt.strftime('%Y-%m-%d')
+        rows.insert(0, 'year', int(year))
+        rows.insert(0, 'district', district)
+        rows = rows.astype(object).where(rows.notna(), None)
+        cols = ', '.join(rows.columns)
+        marks = ', '.join('?' * len(rows.columns))
+        statements = [
+            self._ensure_district(district),
+            (f"DELETE FROM {table} WHERE district = ? AND year = ?", (district, int(year))),
+            (f"INSERT INTO {table} ({cols}) VALUES ({marks})", list(rows.itertuples(index=False))),
+            *derived,
+        ]
+        if source and digest:
+            statements.append(("INSERT OR REPLACE INTO sources (path, sha256) VALUES (?, ?)",
+                               (str(source), digest)))
+        return statements
+
+    def _concentration_statements(self, district, year, registry):
+        """Пересчёт концентрации района за год — только по его реестру"""
+        table = subsidy_concentration(registry).rename(columns={v: k for k, v in CONCENTRATION_COLUMNS.items()})
+        table['lorenz'] = [json.dumps(np.round(a, 6).tolist()) for a in table['lorenz']]
+        rows = table[list(CONCENTRATION_COLUMNS)]
+        rows = rows.astype(object).where(rows.notna(), None)
+        key = (district, int(year))
+        cols = ', '.join(CONCENTRATION_COLUMNS)
+        marks = ', '.join('?' * len(CONCENTRATION_COLUMNS))
+        return [
+            ("DELETE FROM concentration WHERE district = ? AND year = ?", key),
+            (f"INSERT INTO concentration (district, year, {cols}) VALUES (?, ?, {marks})",
+             [key + tuple(r) for r in rows.itertuples(index=False)]),
+        ]
+
+    def _rollup_statements(self, district, year, cells, measures):
+        """Заменить в кубе района за год меры одного источника (реестра или книги посевов)
+
+        Общая ячейка (*, *, *) несёт меры обоих: меры источника обнуляются и
+        записываются заново, ячейки без мер удаляются.
+        """
+        names = {v: k for k, v in ROLLUP_COLUMNS.items()}
+        columns = [names[m] for m in measures]
+        rows = cells.rename(columns=names)[['type', 'program', 'crop', *columns]]
+        rows = rows.astype(object).where(rows.notna(), None)
+        key = (district, int(year))
+        empty = ' AND '.join(f"{c} IS NULL" for c in ('payments', 'recipients', 'amount', 'farms', 'plan_ha', 'fact_ha'))
+        return [
+            (f"UPDATE rollup SET {', '.join(f'{c} = NULL' for c in columns)} WHERE district = ? AND year = ?", key),
+            (f"INSERT INTO rollup (district, year, type, program, crop, {', '.join(columns)}) "
+             f"VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(columns))}) "
+             f"ON CONFLICT (district, year, type, program, crop) DO UPDATE SET "
+             f"{', '.join(f'{c} = excluded.{c}' for c in columns)}",
+             [key + tuple(r) for r in rows.itertuples(index=False)]),
+            (f"DELETE FROM rollup WHERE district = ? AND year = ? AND {empty}", key),
+        ]
+
+    def _subsidies_statements(self, district, year, df, source=None, digest=None):
+        key = (district, int(year))
+        derived = [
+            ("DELETE FROM recipient_totals WHERE district = ? AND year = ?", key),
+            (RECIPIENT_TOTALS_SQL.format(where="district = ? AND year = ?"), key),
+            *self._concentration_statements(district, year, df),
+            *self._rollup_statements(district, year, subsidy_rollup(df), SUBSIDY_MEASURES),
+        ]
+        return self._replace_statements('subsidies', SUBSIDY_COLUMNS, district, year, df, source, digest, derived)
+
+    def replace_subsidies(self, district, year, df, source=None, digest=None):
+        """Заменить реестр района за год (после повторной загрузки файла)
+
+        Итоги по получателям, концентрация и куб пересчитываются в той же
+        транзакции и только для этого района и года.
+        """
+        self._write(self._subsidies_statements(district, year, df, source, digest))
+
+    def apply_applications(self, district, changed, registry, source, stream, cursor, etag):
+        """Записать новые и изменённые заявки района вместе с точкой продолжения синхронизации
+
+        registry — {год: реестр субсидий}, собранный из всех заявок района за
+        годы, которых коснулись изменения (ingest/qoldau.py); реестры этих лет
+        заменяются в той же транзакции, что и заявки с курсором, — прерванная
+        синхронизация не оставляет хранилище наполовину обновлённым.
+        """
+        rows = changed.rename(columns={v: k for k, v in APPLICATION_COLUMNS.items()})[list(APPLICATION_COLUMNS)]
+        rows = rows.astype(object).where(rows.notna(), None)
+        cols = ', '.join(APPLICATION_COLUMNS)
+        marks = ', '.join('?' * len(APPLICATION_COLUMNS))
+        statements = [(f"INSERT OR REPLACE INTO applications ({cols}) VALUES ({marks})",
+                       list(rows.itertuples(index=False)))]
+        for year, df in registry.items():
+            statements += self._subsidies_statements(district, year, df)
+        statements.append((
+            "INSERT OR REPLACE INTO sync_state (source, stream, cursor, etag, synced_at) "
+            "VALUES (?, ?, ?, ?, datetime('now'))", (source, stream, cursor, etag)))
+        self._write(statements)
+
+    def save_sync_state(self, source, stream, cursor, etag):
+        """Точка продолжения без новых заявок (например, после ответа 304)"""
+        self._write([("INSERT OR REPLACE INTO sync_state (source, stream, cursor, etag, synced_at) "
+                      "VALUES (?, ?, ?, ?, datetime('now'))", (source, stream, cursor, etag))])
+
+    def replace_crops(self, district, year, df, source=None, digest=None):
+        """Заменить ход посевной района за год (и его ячейки куба)"""
+        self._replace_rows('crops', CROP_COLUMNS, district, year, df, source, digest,
+                           derived=self._rollup_statements(district, year, crop_rollup(df), CROP_MEASURES))
+
+    def replace_capacities(self, district, year, df, source=None, digest=None):
+        """Заменить перечень перерабатывающих мощностей района за год"""
+        self._replace_rows('capacities', CAPACITY_COLUMNS, district, year, df, source, digest)
+
+    def replace_projects(self, district, year, df, source=None, digest=None):
+        """Заменить перечень инвестиционных проектов района за год"""
+        self._replace_rows('projects', PROJECT_COLUMNS, district, year, df, source, digest)
+
+    def add_farm_names(self, matched):
+        """Добавить сопоставленные наименования (результат ingest.entities.match_farms)"""
+        rows = matched.rename(columns={v: k for k, v in FARM_NAME_COLUMNS.items()})
+        rows = rows.assign(bin=rows['bin'].fillna(''))[list(FARM_NAME_COLUMNS)]
+        rows = rows.astype(object).where(rows.notna(), None)
+        cols = ', '.join(FARM_NAME_COLUMNS)
+        marks = ', '.join('?' * len(FARM_NAME_COLUMNS))
+        self._write([(f"INSERT OR REPLACE INTO farm_names ({cols}) VALUES ({marks})",
+                      list(rows.itertuples(index=False)))])
+
+    # ---------- чтение ----------
+
+    def districts(self, region=None):
+        sql = "SELECT district, name, region FROM districts"
+        if region:
+            return self.query(sql + " WHERE region = ? ORDER BY name", (region,))
+        return self.query(sql + " ORDER BY name")
+
+    def profile(self, district):
+        with self._lock:
+            row = self._conn.execute("SELECT profile FROM districts WHERE district = ?", (district,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def years(self, table, district=None):
+        """Годы, за которые есть данные района (или хоть какого-то района)"""
+        assert table in ('subsidies', 'crops', 'capacities', 'projects')
+        if district is None:
+            df = self.query(f"SELECT DISTINCT year FROM {table} ORDER BY year")
+        else:
+            df = self.query(f"SELECT DISTINCT year FROM {table} WHERE district = ? ORDER BY year", (district,))
+        return df['year'].tolist()
+
+    def _select(self, table, columns, district, year):
+        sql = f"SELECT * FROM {table} WHERE district = ?"
+        params = [district]
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(int(year))
+        df = self.query(sql, params).rename(columns=columns)
+        if 'Дата' in df:
+            df['Дата'] = pd.to_datetime(df['Дата'])
+        return df
+
+    def subsidies(self, district, year=None):
+        return self._select('subsidies', SUBSIDY_COLUMNS, district, year)
+
+    def crops(self, district, year=None):
+        return self._select('crops', CROP_COLUMNS, district, year)
+
+    def crops_signature(self, district):
+        """Сводка хода посевной района по годам — меняется при перезаписи его книг посевов"""
+        df = self.query("SELECT year, COUNT(*) AS n, TOTAL(fact_ha) AS fact, MAX(date) AS last FROM crops "
+                        "WHERE district = ? GROUP BY year ORDER BY year", (district,))
+        return df.astype(str).to_numpy().tolist()
+
+    def district_signature(self, district):
+        """Сводка всех данных района — меняется при любой перезаписи его паспорта, реестров,
+        книг посевов, мощностей, инвестиционных проектов или соответствий хозяйств"""
+        signature = [self.profile(district), self.crops_signature(district)]
+        for sql in ("SELECT year, COUNT(*), TOTAL(amount), MAX(date) FROM subsidies "
+                    "WHERE district = ? GROUP BY year ORDER BY year",
+                    "SELECT year, kind, count, capacity, load_pct, status FROM capacities "
+                    "WHERE district = ? ORDER BY year, rowid",
+                    "SELECT year, COUNT(*), TOTAL(cost_mln), TOTAL(jobs) FROM projects "
+                    "WHERE district = ? GROUP BY year ORDER BY year",
+                    "SELECT COUNT(*), MAX(farm_id) FROM farm_names WHERE district = ?"):
+            signature.append(self.query(sql, (district,)).astype(str).to_numpy().tolist())
+        return signature
+
+    def applications(self, district, years):
+        """Заявки Qoldau района за годы"""
+        marks = ', '.join('?' * len(years))
+        df = self.query(f"SELECT * FROM applications WHERE district = ? AND year IN ({marks})",
+                        (district, *map(int, years)))
+        return df.rename(columns=APPLICATION_COLUMNS)
+
+    def sync_state(self, source):
+        """{поток: (курсор, ETag)} последней синхронизации с источником"""
+        df = self.query("SELECT stream, cursor, etag FROM sync_state WHERE source = ?", (source,))
+        return {r.stream: (r.cursor, r.etag) for r in df.itertuples(index=False)}
+
+    def rollup(self, district):
+        """Куб района за все годы (analytics/rollup.py)"""
+        df = self.query("SELECT * FROM rollup WHERE district = ? ORDER BY year, type, program, crop", (district,))
+        df = df.rename(columns=ROLLUP_COLUMNS)
+        measures = [*SUBSIDY_MEASURES, *CROP_MEASURES]
+        df[measures] = df[measures].astype('float64')
+        return df
+
+    def top_recipients(self, district, year, n=10):
+        """Крупнейшие получатели за год с разбивкой по программам — по итогам получателей"""
+        return self.query(
+            "SELECT recipient AS Получатель, program AS Программа, SUM(amount) AS Сумма_тг "
+            "FROM recipient_totals WHERE district = ? AND year = ? GROUP BY recipient, program "
+            "ORDER BY Сумма_тг DESC, recipient LIMIT ?", (district, int(year), int(n)))
+
+    def subsidy_source(self, district, year):
+        """Файл (или API), из которого загружен реестр района за год"""
+        with self._lock:
+            row = self._conn.execute("SELECT source FROM subsidies WHERE district = ? AND year = ? LIMIT 1",
+                                     (district, int(year))).fetchone()
+        return row[0] if row else None
+
+    def capacities(self, district, year=None):
+        df = self._select('capacities', CAPACITY_COLUMNS, district, year)
+        return df[list(CAPACITY_COLUMNS.values())]
+
+    def projects(self, district, year=None):
+        df = self._select('projects', PROJECT_COLUMNS, district, year)
+        return df[list(PROJECT_COLUMNS.values())]
+
+    def _recipient_filter(self, district, year, types, programs, search):
+        where, params = ["district = ?"], [district]
+        if year is not None:
+            where.append("year = ?")
+            params.append(int(year))
+        for col, values in (('type', types), ('program', programs)):
+            if values:
+                where.append(f"{col} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if search:
+            where.append("(instr(casefold(recipient), ?) > 0 OR instr(bin, ?) > 0)")
+            params.extend([search.casefold(), search])
+        return ' AND '.join(where), params
+
+    def recipients(self, district, year=None, types=None, programs=None, search=None,
+                   sort='Сумма_тг', descending=True, limit=50, offset=0):
+        """Страница сводки по получателям: фильтр, сортировка и LIMIT/OFFSET в SQL.
+
+        Возвращает (строки страницы, число получателей под фильтром) — в
+        браузер уходит только страница, а не весь реестр.
+        """
+        cond, params = self._recipient_filter(district, year, types, programs, search)
+        order = f"{RECIPIENT_SORT[sort]} {'DESC' if descending else 'ASC'}"
+        # COUNT(*) OVER () — число получателей под фильтром тем же проходом, что и страница
+        page = self.query(f"""
+            SELECT recipient, bin, type, SUM(payments) AS payments,
+                   GROUP_CONCAT(DISTINCT program) AS programs,
+                   SUM(amount) AS amount, MAX(last_date) AS last_date, COUNT(*) OVER () AS total
+            FROM recipient_totals WHERE {cond}
+            GROUP BY recipient, bin, type
+            ORDER BY {order}, recipient
+            LIMIT ? OFFSET ?
+        """, params + [int(limit), int(offset)])
+        if not page.empty:
+            total = int(page.pop('total').iloc[0])
+        else:
+            page = page.drop(columns='total')
+            with self._lock:
+                total = self._conn.execute(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM recipient_totals WHERE {cond} GROUP BY recipient, bin, type)",
+                    params).fetchone()[0]
+        page = page.rename(columns={
+            'recipient': 'Получатель', 'bin': 'БИН', 'type': 'Тип', 'payments': 'Выплат',
+            'programs': 'Программы', 'amount': 'Сумма_тг', 'last_date': 'Последняя_выплата',
+        })
+        page['Сумма_тг'] = page['Сумма_тг'].astype('float64')
+        page['Последняя_выплата'] = pd.to_datetime(page['Последняя_выплата'])
+        return page, total
+
+    def subsidy_facets(self, district, year=None):
+        """Значения фильтров реестра района: типы получателей и программы"""
+        cond, params = self._recipient_filter(district, year, None, None, None)
+        with self._lock:
+            types = [r[0] for r in self._conn.execute(
+                f"SELECT DISTINCT type FROM recipient_totals WHERE {cond} AND type IS NOT NULL ORDER BY type", params)]
+            programs = [r[0] for r in self._conn.execute(
+                f"SELECT DISTINCT program FROM recipient_totals WHERE {cond} AND program IS NOT NULL ORDER BY program",
+                params)]
+        return types, programs
+
+    def farm_names(self, district=None):
+        """Таблица соответствий хозяйств (района или всех районов)"""
+        sql = "SELECT * FROM farm_names"
+        params = ()
+        if district is not None:
+            sql += " WHERE district = ?"
+            params = (district,)
+        df = self.query(sql, params).rename(columns=FARM_NAME_COLUMNS)
+        df['farm_id'] = df['farm_id'].astype('float64')
+        return df
+
+    def unmatched_farm_names(self, district=None):
+        """Наименования из реестров и книг посевов, которых ещё нет в таблице соответствий"""
+        cond = "WHERE district = ?" if district is not None else ""
+        params = (district,) * 2 if district is not None else ()
+        df = self.query(f"""
+            SELECT district, 'subsidies' AS source, recipient AS name, COALESCE(bin, '') AS bin
+            FROM recipient_totals {cond} GROUP BY 1, 3, 4
+            UNION
+            SELECT district, 'crops', farm, '' FROM crops {cond} GROUP BY 1, 3
+            EXCEPT
+            SELECT district, source, name, bin FROM farm_names
+        """, params)
+        return df.dropna(subset=['name']).rename(columns=FARM_NAME_COLUMNS)
+
+    def max_farm_id(self):
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(farm_id) FROM farm_names").fetchone()
+        return row[0] or 0
+
+    def concentration(self, district, year):
+        """Готовая концентрация субсидий района за год (см. analytics/concentration.py)"""
+        df = self.query("SELECT * FROM concentration WHERE district = ? AND year = ? ORDER BY dimension, amount DESC",
+                        (district, int(year)))
+        df = df.drop(columns=['district', 'year']).rename(columns=CONCENTRATION_COLUMNS)
+        df['Лоренц'] = [np.array(json.loads(v)) for v in df['Лоренц']]
+        return df
+
+    def compare(self, year=None, region=None):
+        """Сводка по всем районам одним запросом по кубу — для режима сравнения
+
+        Без года (реестров нет ни у одного района) получатели складываются по годам.
+        """
+        where, params = [], []
+        if region:
+            where.append("d.region = ?")
+            params.append(region)
+        cond = f"WHERE {' AND '.join(where)}" if where else ""
+        year_cond = "AND year = ?" if year is not None else ""
+        year_params = [int(year)] if year is not None else []
+        # Концентрация хранится по годам — в сводке за все годы её нет
+        if year is not None:
+            gini = "k.gini, k.top10_pct"
+            gini_join = ("LEFT JOIN concentration k ON k.district = d.district "
+                         "AND k.dimension = 'Все' AND k.year = ?")
+        else:
+            gini, gini_join = "NULL AS gini, NULL AS top10_pct", ""
+        sql = f"""
+            SELECT d.district, d.name, d.region,
+                   json_extract(d.profile, '$.population') AS population,
+                   json_extract(d.profile, '$.arable_land_ha') AS arable_land_ha,
+                   s.subsidies_tg, s.recipients, c.sown_ha, {gini}
+            FROM districts d
+            LEFT JOIN (SELECT district, SUM(amount) AS subsidies_tg, SUM(recipients) AS recipients
+                       FROM rollup WHERE type = '*' AND program = '*' AND crop = '*'
+                         AND payments IS NOT NULL {year_cond}
+                       GROUP BY district) s
+                   ON s.district = d.district
+            LEFT JOIN (SELECT district, SUM(fact_ha) AS sown_ha FROM rollup
+                       WHERE type = '*' AND program = '*' AND crop != '*' {year_cond}
+                       GROUP BY district) c
+                   ON c.district = d.district
+            {gini_join}
+            {cond}
+            ORDER BY d.name
+        """
+        df = self.query(sql, year_params * 3 + params)
+        numeric = ['population', 'arable_land_ha', 'subsidies_tg', 'recipients', 'sown_ha', 'gini', 'top10_pct']
+        df[numeric] = df[numeric].astype('float64')
+        return df
+
+
+def data_signature(data_dir=None):
+    """Имена, размеры и mtime файлов каталога данных и подкаталогов районов — дёшево
+    проверить, есть ли что переносить в хранилище"""
+    data_dir = Path(data_dir or DATA_DIR)
+    if not data_dir.is_dir():
+        return ()
+    entries = list(data_dir.iterdir())
+    entries += [p for d in entries if d.is_dir() for p in d.iterdir()]
+    return tuple(sorted((str(p), info.st_size, info.st_mtime_ns) for p in entries
+                        if p.is_file() and (info := p.stat())))
+
+
+def sync_from_files(store, data_dir=None, workers=1):
+    """Перенести реестры субсидий, книги посевов, мощности, проекты и паспорта в хранилище;
+    неизменившиеся файлы пропускаются
+
+    После загрузки новые наименования хозяйств сопоставляются с известными
+    (ingest/entities.py), чтобы страницы могли соединять субсидии и посевы.
+    Старые .xls и .doc разбираются в workers процессах (ingest/legacy.py);
+    файл с ошибкой разбора пропускается до следующего обновления.
+    """
+    from ingest._cache import Manifest
+    from ingest.entities import resolve_farms
+    from ingest.legacy import sync_legacy
+    from ingest.sowing import load_sowing_progress
+    from ingest.subsidies import FILE_PATTERN, cached_subsidies_workbook, subsidy_files
+
+    data_dir = Path(data_dir or DATA_DIR)
+    manifest = Manifest(CACHE_DIR / 'subsidies' / 'manifest.json')
+    updated = []
+
+    for path in subsidy_files(data_dir):
+        digest = manifest.digest(path)
+        if store.source_digest(path) == digest:
+            continue
+        m = FILE_PATTERN.match(path.name)
+        df = cached_subsidies_workbook(path, manifest)
+        store.replace_subsidies(district_key(m['district']), int(m['year']), df, path, digest)
+        updated.append(path.name)
+
+    for path in sorted(data_dir.glob('ПОСЕВ_*_*.xlsx')) if data_dir.is_dir() else []:
+        m = re.match(r'ПОСЕВ_(?P<district>.+?)_.*?(?P<year>\d{4})', path.stem)
+        if not m:
+            continue
+        digest = manifest.digest(path)
+        if store.source_digest(path) == digest:
+            continue
+        df = load_sowing_progress(path)
+        store.replace_crops(district_key(m['district']), int(m['year']), df, path, digest)
+        updated.append(path.name)
+
+    manifest.save()
+    status = sync_legacy(store, data_dir, workers)
+    updated += [path.name for path, result in status.items() if not isinstance(result, Exception)]
+    # Новые наименования хозяйств — в таблицу соответствий (известные не пересматриваются)
+    resolve_farms(store)
+    return updated
+
+
+if __name__ == "__main__":
+    s = Store()
+    for name in sync_from_files(s, workers=None):
+        print("обновлён:", name)
+    print(f"районов в хранилище: {len(s.districts())}, ревизия {s.revision}")
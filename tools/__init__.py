@@ -0,0 +1 @@
+"""Служебные скрипты: замеры производительности и обслуживание данных"""
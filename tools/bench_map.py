@@ -0,0 +1,193 @@
+"""
+Замер карты участков (ingest/parcels.py, views/overview.py) на синтетических границах.
+
+Для каждого набора участков (tools/synthetic.py) — отдельный каталог
+данных района по умолчанию:
+
+- подготовка — разбор GeoJSON и упрощение по масштабам (холодная) и
+  чтение готовых уровней из кэша;
+- окна карты «район», «хозяйство» и «участок» — масштаб по границам
+  (fit_zoom), сколько участков попало в окно, время запроса к R-дереву
+  (медиана) и объём GeoJSON, уходящего в браузер;
+- страница «Обзор» через streamlit.testing (AppTest) в отдельном
+  процессе — весь район и одно хозяйство в фильтре карты: исключения на
+  странице и объём графика карты.
+
+Набор из одного участка в сотню метров проверяет крупные масштабы
+(fit_zoom 17–18), на которых ползунок масштаба раньше падал.
+
+    python -m tools.bench_map                              # 1 малый, 1 000 и 5 000 участков
+    python -m tools.bench_map --parcels 20000 --json map.json
+    python -m tools.bench_map --no-page                    # без отрисовки страницы
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SIZES = (1_000, 5_000)
+# Участок 100 × 100 м — меньше любого из ZOOM_LEVELS
+SMALL_PARCEL = (0.0009, 0.0009)
+QUERY_RUNS = 20
+
+CHILD = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file(sys.argv[1], default_timeout=900)
+at.session_state['page'] = sys.argv[2]
+at.run()
+
+def chart_kb():
+    return sum(c.proto.ByteSize() for c in at.get('plotly_chart')) / 1024
+
+def report(view):
+    print(json.dumps({
+        'view': view,
+        'zoom': next((s.value for s in at.select_slider if (s.key or '').startswith('parcel_zoom')), None),
+        'chart_kb': chart_kb(),
+        'error': str(at.exception[0].value) if at.exception else None,
+    }), flush=True)
+
+report('район')
+focus = next((s for s in at.selectbox if (s.key or '').startswith('parcel_focus')), None)
+if focus is not None and not at.exception and len(focus.options) > 1:
+    focus.set_value(focus.options[1]).run()
+    report('хозяйство')
+"""
+
+
+def write_parcels(data_dir, n_parcels, size=None):
+    """GeoJSON синтетических участков в data/parcels/<район по умолчанию>/ -> (путь, вершин)"""
+    from config import DEFAULT_DISTRICT
+    from ingest.parcels import parcels_dir
+    from tools.synthetic import synthetic_parcels
+
+    collection = synthetic_parcels(n_parcels, **({'size': size} if size else {}))
+    folder = parcels_dir(DEFAULT_DISTRICT, data_dir)
+    folder.mkdir(parents=True)
+    path = folder / 'участки.geojson'
+    path.write_text(json.dumps(collection, ensure_ascii=False), encoding='utf-8')
+    return path, sum(len(f['geometry']['coordinates'][0]) for f in collection['features'])
+
+
+def views(index):
+    """Окна карты: весь район, первое хозяйство и первый участок -> {вид: границы}"""
+    from ingest.parcels import extent
+
+    farm = index.props['Хозяйство'].dropna().iloc[0]
+    return {
+        'район': extent(index),
+        'хозяйство': extent(index, (index.props['Хозяйство'] == farm).to_numpy()),
+        'участок': extent(index, [0]),
+    }
+
+
+def measure_views(index):
+    from ingest.parcels import feature_collection, fit_zoom, viewport, visible
+
+    rows = []
+    for view, bounds in views(index).items():
+        zoom = fit_zoom(bounds)
+        window = viewport(((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2), zoom)
+        timings = []
+        for _ in range(QUERY_RUNS):
+            t = time.perf_counter()
+            ids, shapes = visible(index, window, zoom)
+            timings.append(time.perf_counter() - t)
+        rows.append({
+            'view': view, 'zoom': zoom, 'shown': len(ids),
+            'query_ms': statistics.median(timings) * 1000,
+            'geojson_kb': len(feature_collection(ids, shapes).encode()) / 1024,
+        })
+    return rows
+
+
+def render_page(env):
+    """Страница «Обзор» в отдельном процессе -> строки по видам карты"""
+    from views import PAGES
+
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD, str(ROOT / 'app2.py'), next(iter(PAGES))],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows = [json.loads(line) for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not rows:
+        return [{'view': 'страница', 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'процесс упал'}]
+    return rows
+
+
+def run(datasets, page):
+    from config import DEFAULT_DISTRICT
+    from ingest.parcels import load_parcel_index
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, n_parcels, size in datasets:
+            base = Path(tmp) / str(len(results))
+            path, vertices = write_parcels(base / 'data', n_parcels, size)
+            cache = base / 'cache' / 'parcels' / DEFAULT_DISTRICT
+            t = time.perf_counter()
+            load_parcel_index(DEFAULT_DISTRICT, base / 'data', cache)
+            cold = time.perf_counter() - t
+            t = time.perf_counter()
+            index = load_parcel_index(DEFAULT_DISTRICT, base / 'data', cache)
+            warm = time.perf_counter() - t
+            result = {
+                'dataset': name, 'parcels': n_parcels, 'vertices': vertices,
+                'source_mb': path.stat().st_size / 2**20, 'build_s': cold, 'cached_ms': warm * 1000,
+                'views': measure_views(index), 'page': None,
+            }
+            if page:
+                env = {**os.environ, 'TALDAU_DATA_DIR': str(base / 'data'), 'TALDAU_CACHE_DIR': str(base / 'cache'),
+                       'TALDAU_STORE': str(base / 'taldau.sqlite'), 'PYTHONPATH': str(ROOT)}
+                result['page'] = render_page(env)
+            results.append(result)
+            print_result(result)
+    return results
+
+
+def print_result(r):
+    vertices = f"{r['vertices']:,}".replace(',', ' ')
+    print(f"\n{r['dataset']}: {vertices} вершин, GeoJSON {r['source_mb']:.1f} МБ · "
+          f"подготовка {r['build_s']:.1f} с, из кэша {r['cached_ms']:.0f} мс")
+    print(f"  {'окно':<10} {'масштаб':>7} {'участков':>8} {'запрос, мс':>10} {'GeoJSON, КБ':>11}")
+    for v in r['views']:
+        print(f"  {v['view']:<10} {v['zoom']:>7} {v['shown']:>8} {v['query_ms']:>10.2f} {v['geojson_kb']:>11.1f}")
+    for p in r['page'] or []:
+        if p.get('error'):
+            print(f"  страница, {p['view']}: ошибка: {p['error']}")
+        else:
+            print(f"  страница, {p['view']}: масштаб {p['zoom']}, график {p['chart_kb']:.1f} КБ")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parcels', type=int, nargs='+', default=SIZES, help='участков в наборе')
+    parser.add_argument('--no-page', action='store_true', help='не отрисовывать страницу «Обзор»')
+    parser.add_argument('--json', help='сохранить отчёт в файл')
+    args = parser.parse_args(argv)
+
+    try:
+        import shapely  # noqa: F401
+    except ImportError:
+        sys.exit("Нужен пакет shapely: pip install shapely")
+
+    datasets = [('1 участок 100 м', 1, SMALL_PARCEL)] + [(f'{n} участков', n, None) for n in args.parcels]
+    results = run(datasets, not args.no_page)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding='utf-8')
+    failed = [p for r in results for p in r['page'] or [] if p.get('error')]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
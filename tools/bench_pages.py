@@ -0,0 +1,173 @@
+"""
+Замер отрисовки страниц дашборда на синтетических данных разного размера.
+
+Для каждого размера реестра субсидий (tools/synthetic.py) создаётся
+отдельное хранилище, и каждая страница из views.PAGES отрисовывается в
+новом процессе через streamlit.testing (AppTest):
+
+- холодная отрисовка — первый запуск скрипта сразу на этой странице
+  (импорты, загрузчики и графики без кэша);
+- тёплая — медиана повторных запусков в том же процессе (кэши заполнены);
+- пик памяти — максимальный RSS процесса;
+- объём ответа — сумма сериализованных элементов страницы (protobuf),
+  отдельно графики Plotly и таблицы Arrow.
+
+Отчёт печатается таблицей и сохраняется в JSON; с --compare сравнивается
+с прошлым отчётом, и при замедлении сверх порога команда завершается с
+кодом 1 — её можно ставить в проверку перед выкладкой.
+
+    python -m tools.bench_pages                          # 10 … 1 000 000 строк
+    python -m tools.bench_pages --sizes 10 100000 --json bench.json
+    python -m tools.bench_pages --compare bench.json     # сравнить с прошлым замером
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SIZES = (10, 10_000, 100_000, 1_000_000)
+WARM_RUNS = 3
+# Регрессия: медленнее прошлого замера на 20% и при этом больше чем на 50 мс
+SLOWER = 1.2
+MIN_DELTA_MS = 50
+METRICS = ('cold_ms', 'warm_ms')
+
+CHILD = """
+import json, resource, statistics, sys, time
+from streamlit.testing.v1 import AppTest
+
+page, warm_runs = sys.argv[2], int(sys.argv[3])
+at = AppTest.from_file(sys.argv[1], default_timeout=900)
+at.session_state['page'] = page
+t = time.perf_counter()
+at.run()
+cold = time.perf_counter() - t
+warm = []
+for _ in range(warm_runs):
+    t = time.perf_counter()
+    at.run()
+    warm.append(time.perf_counter() - t)
+
+sizes = {}
+def walk(node):
+    proto = getattr(node, 'proto', None)
+    if proto is not None and hasattr(proto, 'ByteSize'):
+        kind = type(proto).__name__
+        sizes[kind] = sizes.get(kind, 0) + proto.ByteSize()
+    for child in getattr(node, 'children', {}).values():
+        walk(child)
+walk(at._tree)
+
+print(json.dumps({
+    'cold_ms': cold * 1000,
+    'warm_ms': statistics.median(warm) * 1000 if warm else None,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'payload_kb': sum(sizes.values()) / 1024,
+    'charts_kb': sizes.get('PlotlyChart', 0) / 1024,
+    'tables_kb': (sizes.get('Dataframe', 0) + sizes.get('Arrow', 0)) / 1024,
+    'error': str(at.exception[0].value) if at.exception else None,
+}))
+"""
+
+
+def seed_store(path, n_rows):
+    """Хранилище с синтетическим реестром района по умолчанию за 2025 год"""
+    from config import DEFAULT_DISTRICT
+    from store import Store
+    from tools.synthetic import synthetic_subsidies
+
+    store = Store(path)
+    store.replace_subsidies(DEFAULT_DISTRICT, 2025, synthetic_subsidies(n_rows, DEFAULT_DISTRICT))
+    return store
+
+
+def render(page, env, warm_runs):
+    """Один процесс — одна страница: холодная отрисовка и warm_runs повторных"""
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD, str(ROOT / 'app2.py'), page, str(warm_runs)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'процесс упал'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(sizes, pages, warm_runs):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            base = Path(tmp) / str(n_rows)
+            # Пустой каталог данных: в хранилище только синтетический реестр и паспорт района
+            (base / 'data').mkdir(parents=True)
+            env = {**os.environ, 'TALDAU_DATA_DIR': str(base / 'data'), 'TALDAU_CACHE_DIR': str(base / 'cache'),
+                   'TALDAU_STORE': str(base / 'taldau.sqlite'), 'PYTHONPATH': str(ROOT)}
+            seed_store(base / 'taldau.sqlite', n_rows)
+            for page in pages:
+                r = render(page, env, warm_runs)
+                results.append({'rows': n_rows, 'page': page, **r})
+                print_row(results[-1])
+    return results
+
+
+def print_header():
+    print(f"{'строк':>9}  {'страница':<24} {'холодная, мс':>12} {'тёплая, мс':>10} {'RSS, МБ':>8} "
+          f"{'ответ, КБ':>10} {'графики':>8} {'таблицы':>8}")
+
+
+def print_row(r):
+    if r.get('error') and 'cold_ms' not in r:
+        print(f"{r['rows']:>9}  {r['page']:<24} ошибка: {r['error']}")
+        return
+    print(f"{r['rows']:>9}  {r['page']:<24} {r['cold_ms']:>12.0f} {r['warm_ms'] or 0:>10.0f} {r['rss_mb']:>8.0f} "
+          f"{r['payload_kb']:>10.1f} {r['charts_kb']:>8.1f} {r['tables_kb']:>8.1f}")
+    if r.get('error'):
+        print(f"{'':>11}ошибка на странице: {r['error']}")
+
+
+def compare(results, baseline):
+    """Строки отчёта, где страница стала заметно медленнее прошлого замера"""
+    before = {(r['rows'], r['page']): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = before.get((r['rows'], r['page']))
+        if not old:
+            continue
+        for metric in METRICS:
+            new_ms, old_ms = r.get(metric), old.get(metric)
+            if new_ms and old_ms and new_ms > old_ms * SLOWER and new_ms - old_ms > MIN_DELTA_MS:
+                regressions.append(f"{r['rows']:>9}  {r['page']:<24} {metric}: {old_ms:.0f} -> {new_ms:.0f} мс")
+    return regressions
+
+
+def main(argv=None):
+    from views import PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='строк в реестре субсидий')
+    parser.add_argument('--pages', nargs='+', default=list(PAGES), help='заголовки страниц из меню')
+    parser.add_argument('--warm', type=int, default=WARM_RUNS, help='повторных отрисовок на страницу')
+    parser.add_argument('--json', help='сохранить отчёт в файл')
+    parser.add_argument('--compare', help='прошлый отчёт (JSON) для поиска регрессий')
+    args = parser.parse_args(argv)
+
+    print_header()
+    results = run(args.sizes, args.pages, args.warm)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding='utf-8')
+    failed = [r for r in results if r.get('error')]
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+        if regressions:
+            print("\nМедленнее прошлого замера:", *regressions, sep='\n')
+        failed += regressions
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
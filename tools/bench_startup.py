@@ -0,0 +1,111 @@
+"""
+Замер холодного старта дашборда.
+
+Каждый прогон — отдельный процесс Python: скрипт открывается через
+streamlit.testing (AppTest) и отрисовывает страницу по умолчанию. Время
+считается от запуска скрипта до конца первой отрисовки, включая импорты.
+Сравниваются текущий app2.py и однофайловая версия дашборда из истории git
+(последний коммит, где все страницы были в app2.py).
+
+    python -m tools.bench_startup            # 5 прогонов на вариант
+    python -m tools.bench_startup -n 10 --baseline <коммит>
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Модули, загрузку которых отслеживаем: их импорт и составляет холодный старт
+HEAVY_MODULES = ('plotly.express', 'plotly.subplots', 'openpyxl', 'scipy', 'analytics.montecarlo',
+                 'charts.sankey')
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+t2 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'render_ms': (t2 - t1) * 1000,
+    'error': str(at.exception[0].value) if at.exception else None,
+    'modules': [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+}))
+"""
+
+
+def _git(*args):
+    return subprocess.run(['git', *args], cwd=ROOT, check=True, capture_output=True).stdout
+
+
+def monolith_rev():
+    """Последний коммит, где страницы ещё были функциями в app2.py"""
+    split = _git('log', '-1', '--format=%H', '-G', r'^def page_overview', '--', 'app2.py').decode().strip()
+    if split and b'def page_overview' not in _git('show', f'{split}:app2.py'):
+        return f'{split}^'
+    return 'HEAD'
+
+
+def export_tree(rev, dest):
+    """Дерево репозитория на коммите rev во временный каталог"""
+    with tarfile.open(fileobj=BytesIO(_git('archive', rev))) as tar:
+        tar.extractall(dest)
+    return Path(dest) / 'app2.py'
+
+
+def run_once(entry):
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, str(entry), json.dumps(HEAVY_MODULES)],
+        cwd=entry.parent, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench(entry, runs):
+    run_once(entry)  # прогрев: кэш на диске, байт-код, хранилище
+    results = [run_once(entry) for _ in range(runs)]
+    errors = {r['error'] for r in results if r['error']}
+    return {
+        'render_ms': statistics.median(r['render_ms'] for r in results),
+        'import_ms': statistics.median(r['import_ms'] for r in results),
+        'modules': results[-1]['modules'],
+        'error': errors.pop() if errors else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5, help='число замеров на вариант')
+    parser.add_argument('--baseline', help='коммит с однофайловой версией (по умолчанию — найти в истории)')
+    args = parser.parse_args(argv)
+
+    variants = {'текущий': ROOT / 'app2.py'}
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            variants['однофайловый'] = export_tree(args.baseline or monolith_rev(), tmp)
+        except subprocess.CalledProcessError as e:
+            print(f'базовая версия недоступна: {e.stderr.decode().strip()}', file=sys.stderr)
+
+        # Один каталог кэша на все прогоны, чтобы варианты не делили данные с рабочим
+        os.environ.setdefault('TALDAU_CACHE_DIR', str(Path(tmp) / 'cache'))
+        print(f"{'вариант':<14} {'отрисовка, мс':>14} {'импорт AppTest, мс':>19}  загружено")
+        for name, entry in variants.items():
+            r = bench(entry, args.runs)
+            loaded = ', '.join(r['modules']) or '—'
+            print(f"{name:<14} {r['render_ms']:>14.0f} {r['import_ms']:>19.0f}  {loaded}")
+            if r['error']:
+                print(f"  ошибка: {r['error']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
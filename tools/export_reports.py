@@ -0,0 +1,419 @@
+"""
+Пакетный экспорт справок по районам (HTML и PDF) — для пакета документов Сената.
+
+Справка района собирается из того же содержимого, что и страницы
+дашборда: паспорт, индикаторы локализации, субсидии и концентрация,
+посевы, рекомендации. Графики строят фабрики страниц (@cached_figure).
+
+Районы обрабатываются в пуле процессов. Графики с одинаковыми входными
+данными (индикаторы, оценки, общие для всех районов) строятся один раз:
+кэш графиков всех процессов лежит в общем каталоге (charts/cache.py).
+Для каждого района запоминается хэш его данных в хранилище
+(Store.district_signature) — район, данные которого не менялись с
+прошлого экспорта, пропускается.
+
+Справка — один HTML-файл, графики рисует plotly.js, который кладётся
+рядом с отчётами один раз (сеть не нужна). PDF печатает из HTML
+безголовый Chrome/Chromium (путь — в TALDAU_CHROME или в PATH).
+
+    python -m tools.export_reports                         # все районы хранилища, HTML
+    python -m tools.export_reports аршалынскии --format html pdf
+    python -m tools.export_reports --workers 8 --out reports --force
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from config import BASE_DIR, DEFAULT_DISTRICT
+from ingest._cache import read_json, write_json
+
+# Увеличить при изменении содержимого справки — все отчёты соберутся заново
+REPORT_VERSION = 2
+OUT_DIR = BASE_DIR / 'reports'
+FORMATS = ('html', 'pdf')
+PLOTLY_JS = 'plotly.min.js'
+CHROME_NAMES = ('chromium', 'chromium-browser', 'google-chrome', 'google-chrome-stable', 'chrome')
+# Сколько виртуального времени Chrome даёт plotly.js нарисовать графики перед печатью, мс
+PRINT_BUDGET_MS = 15000
+
+STYLE = """
+body { font-family: 'Segoe UI', Arial, sans-serif; color: #222; max-width: 1100px; margin: 0 auto; padding: 1.5rem; }
+h1 { color: #1E3A5F; margin-bottom: 0.2rem; }
+h2 { color: #1E3A5F; border-bottom: 2px solid #1E3A5F; padding-bottom: 0.3rem; margin-top: 2rem; }
+.sub { color: #666; margin-top: 0; }
+.metrics { display: grid; grid-template-columns: repeat(4, 1fr); gap: 0.8rem; margin: 1rem 0; }
+.metric { background: #f0f7ff; border-radius: 8px; padding: 0.8rem; }
+.metric .label { font-size: 0.85rem; color: #555; }
+.metric .value { font-size: 1.4rem; font-weight: bold; color: #1E3A5F; }
+.charts { display: grid; grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); gap: 0.8rem; }
+.chart { break-inside: avoid; }
+.note { background: #e7f3ff; border: 1px dashed #0066cc; padding: 0.5rem; border-radius: 5px; font-size: 0.85rem; }
+table { border-collapse: collapse; margin: 0.5rem 0; }
+td, th { border: 1px solid #ccc; padding: 0.3rem 0.6rem; font-size: 0.9rem; text-align: left; }
+section { break-before: page; }
+section:first-of-type { break-before: auto; }
+@page { size: A4; margin: 12mm; }
+"""
+
+SCRIPT = """
+document.querySelectorAll('.chart').forEach(function (div) {
+  var spec = JSON.parse(document.getElementById(div.dataset.spec).textContent);
+  Plotly.newPlot(div, spec.data, spec.layout, {staticPlot: true, responsive: true});
+});
+"""
+
+
+# ==================== СОДЕРЖИМОЕ ====================
+
+def _number(value, unit=''):
+    if value != value:      # NaN — в данных нет
+        return 'н/д'
+    return f"{value:,.0f} {unit}".replace(',', ' ').strip()
+
+
+def _metrics(items):
+    cells = ''.join(f'<div class="metric"><div class="label">{html.escape(label)}</div>'
+                    f'<div class="value">{html.escape(str(value))}</div></div>' for label, value in items)
+    return f'<div class="metrics">{cells}</div>'
+
+
+class _Charts:
+    """Графики справки: JSON из кэша графиков -> блоки <div> и данные для plotly.js"""
+
+    def __init__(self):
+        self.specs = []
+
+    def __call__(self, *figures):
+        divs = []
+        for fig in figures:
+            self.specs.append(str(fig).replace('</', '<\\/'))
+            n = len(self.specs)
+            height = fig.height or 450
+            divs.append(f'<div class="chart" data-spec="spec-{n}" style="height: {height}px"></div>')
+        return f'<div class="charts">{"".join(divs)}</div>'
+
+    def scripts(self):
+        return ''.join(f'<script type="application/json" id="spec-{n}">{spec}</script>'
+                       for n, spec in enumerate(self.specs, 1))
+
+
+def markdown(text):
+    """Markdown рекомендаций -> HTML: заголовки, таблицы, списки, **жирный**"""
+    def inline(line):
+        return re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', html.escape(line.strip()))
+
+    out, lists, table = [], [], []
+
+    def close_table():
+        if table:
+            head, *rows = [[inline(c) for c in row.strip('|').split('|')] for row in table
+                           if not re.fullmatch(r'[|\s:-]+', row)]
+            out.append('<table><tr>' + ''.join(f'<th>{c}</th>' for c in head) + '</tr>'
+                       + ''.join('<tr>' + ''.join(f'<td>{c}</td>' for c in row) + '</tr>' for row in rows)
+                       + '</table>')
+            table.clear()
+
+    def close_lists(indent=-1):
+        while lists and lists[-1][0] > indent:
+            out.append(f'</{lists.pop()[1]}>')
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        item = re.match(r'(\s*)(-|\d+\.)\s+(.*)', line)
+        if stripped.startswith('|'):
+            close_lists()
+            table.append(stripped)
+            continue
+        close_table()
+        if item:
+            indent, tag = len(item[1]), 'ul' if item[2] == '-' else 'ol'
+            close_lists(indent)
+            if not lists or lists[-1][0] < indent:
+                out.append(f'<{tag}>')
+                lists.append((indent, tag))
+            out.append(f'<li>{inline(item[3])}')   # </li> необязателен: вложенный список остаётся внутри пункта
+        elif stripped.startswith('#'):
+            close_lists()
+            level = min(len(stripped) - len(stripped.lstrip('#')) + 1, 6)
+            out.append(f'<h{level}>{inline(stripped.lstrip("#"))}</h{level}>')
+        elif stripped:
+            close_lists()
+            out.append(f'<p>{inline(stripped)}</p>')
+    close_table()
+    close_lists()
+    return '\n'.join(out)
+
+
+def passport_section(district):
+    from loaders import load_district_profile
+
+    profile = load_district_profile(district)
+    if 'population' not in profile:
+        return '<p class="note">Паспорт района ещё не загружен.</p>'
+    return _metrics([
+        ("Население", _number(profile['population'], 'чел')),
+        ("До Астаны", _number(profile.get('distance_to_astana', 0), 'км')),
+        ("Пашня", _number(profile.get('arable_land_ha', 0), 'га')),
+        ("Предприятия", _number(profile.get('industrial_enterprises', 0))),
+    ])
+
+
+def indicators_section(charts):
+    from views.smart_governance import INDICATORS, create_localization_gauge
+
+    return ('<h2>Индикаторы локализации</h2>'
+            + charts(*(create_localization_gauge(*indicator) for indicator in INDICATORS))
+            + '<p class="note">Оценочные значения — требуют верификации.</p>')
+
+
+def subsidies_section(district, charts):
+    from analytics.rollup import cells
+    from loaders import load_concentration, load_rollup, load_subsidies_totals, load_top_recipients
+    from views.subsidies import (
+        concentration_insight,
+        create_lorenz_chart,
+        create_subsidy_analysis,
+        create_top_recipients_chart,
+        lorenz_curves,
+    )
+
+    parts = ['<h2>Субсидии</h2>']
+    totals = load_subsidies_totals(district)
+    if totals is None:
+        return parts[0] + '<p class="note">Реестры субсидий по району не загружены.</p>'
+    cube, year = load_rollup(district), totals['year']
+    parts.append(_metrics([
+        (f"Объём субсидий {totals['year']}", f"{totals['total'] / 1e6:.1f} млн ₸"),
+        ("Получателей", totals['recipients_count']),
+        ("Крупнейший получатель", totals['top_recipient']),
+    ]))
+    parts.append(charts(create_subsidy_analysis(cells(cube, ['Тип'], Год=year), cells(cube, ['Программа'], Год=year)),
+                        create_top_recipients_chart(load_top_recipients(district, year))))
+    conc = load_concentration(district, totals['year'])
+    if not conc.empty:
+        overall = conc[conc['Измерение'] == 'Все'].iloc[0]
+        parts.append(_metrics([
+            ("Индекс Херфиндаля (HHI)", _number(overall['HHI'])),
+            ("Коэффициент Джини", f"{overall['Джини']:.2f}"),
+            ("Доля топ-10 получателей", f"{overall['Топ10_%']:.0f}%"),
+            ("Доля крупнейшего", f"{overall['Топ1_%']:.0f}%"),
+        ]))
+        parts.append(f'<p><b>Концентрация:</b> {html.escape(concentration_insight(conc))}</p>')
+        parts.append(charts(create_lorenz_chart(lorenz_curves(conc))))
+    return ''.join(parts)
+
+
+def crops_section(district, charts):
+    from analytics.rollup import cells, last_year
+    from loaders import load_crops_data, load_rollup, load_sowing_data
+    from views.crops import (
+        create_crop_structure_chart,
+        create_sowing_progress_chart,
+        create_top_farms_chart,
+        culture_sums,
+        sowing_by_date,
+        top_farms,
+    )
+
+    parts = ['<h2>Посевы</h2>']
+    progress = load_sowing_data(district)
+    crops = load_crops_data(district)
+    cube = load_rollup(district)
+    year = last_year(cube, 'Факт_га')
+    if crops.empty or year is None:
+        return parts[0] + '<p class="note">Данные о посевах по району не загружены.</p>'
+    total = cells(cube, Год=year).iloc[0]
+    plan, fact = total['План_га'], total['Факт_га']
+    sums = culture_sums(cube, year)
+    parts.append(_metrics([
+        ("План посева", _number(plan, 'га')),
+        ("Факт посева", _number(fact, 'га') + (f" ({(fact / plan - 1) * 100:+.1f}%)" if plan else '')),
+        ("Пшеница (факт)", _number(sums.get('Пшеница', 0), 'га')),
+        ("Хозяйств", _number(total['Хозяйств'])),
+    ]))
+    figures = [create_crop_structure_chart(sums), create_top_farms_chart(top_farms(crops))]
+    if not progress.empty:
+        figures.append(create_sowing_progress_chart(sowing_by_date(progress)))
+    parts.append(charts(*figures))
+    return ''.join(parts)
+
+
+def recommendations_section():
+    from views.recommendations import RECOMMENDATIONS
+
+    return '<h2>Рекомендации</h2>' + ''.join(markdown(text) for text in RECOMMENDATIONS.values())
+
+
+def build_report(district):
+    """HTML-справка района"""
+    from loaders import get_store, load_district_profile
+
+    profile = load_district_profile(district)
+    region = get_store().districts().set_index('district')['region'].get(district)
+    region = region if isinstance(region, str) else ''
+    charts = _Charts()
+    body = [
+        f'<h1>{html.escape(profile["name"])}</h1>',
+        f'<p class="sub">{html.escape(region)} · Локализация добавленной стоимости · '
+        f'справка от {time.strftime("%d.%m.%Y")}</p>',
+        '<section>', passport_section(district), indicators_section(charts), '</section>',
+        '<section>', subsidies_section(district, charts), '</section>',
+        '<section>', crops_section(district, charts), '</section>',
+        '<section>', recommendations_section(), '</section>',
+    ]
+    return (f'<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+            f'<title>{html.escape(profile["name"])}</title><script src="{PLOTLY_JS}"></script>'
+            f'<style>{STYLE}</style></head><body>{"".join(body)}{charts.scripts()}'
+            f'<script>{SCRIPT}</script></body></html>')
+
+
+def shared_figures():
+    """Графики, одинаковые во всех справках, — строятся один раз до запуска пула"""
+    from views.smart_governance import INDICATORS, create_localization_gauge
+
+    for indicator in INDICATORS:
+        create_localization_gauge(*indicator)
+
+
+# ==================== ЭКСПОРТ ====================
+
+def find_chrome():
+    path = os.environ.get('TALDAU_CHROME')
+    return path or next((found for name in CHROME_NAMES if (found := shutil.which(name))), None)
+
+
+def print_pdf(html_path, pdf_path, chrome):
+    """Печать HTML в PDF безголовым Chrome (после того как plotly.js нарисует графики)"""
+    command = [chrome, '--headless=new', '--disable-gpu', '--no-pdf-header-footer',
+               f'--virtual-time-budget={PRINT_BUDGET_MS}', f'--print-to-pdf={pdf_path}', html_path.as_uri()]
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        # Под root Chrome не запускается в песочнице (контейнеры)
+        command.insert(1, '--no-sandbox')
+    proc = subprocess.run(command, capture_output=True, text=True)
+    if proc.returncode != 0 or not pdf_path.exists():
+        raise RuntimeError(f"Chrome не напечатал PDF: {proc.stderr.strip().splitlines()[-1:]}")
+
+
+def data_hash(store, district):
+    """Хэш данных района и версии справки — ключ пропуска неизменившихся районов"""
+    import plotly
+
+    payload = json.dumps([REPORT_VERSION, plotly.__version__, store.district_signature(district)],
+                         ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _quiet_streamlit():
+    """Загрузчики (хранилище в st.cache_resource, вызовы st.*) работают и без сессии Streamlit — без предупреждений об этом"""
+    from streamlit.logger import set_log_level
+
+    set_log_level('error')
+
+
+def _init_worker(figure_dir):
+    from charts.cache import FIGURES
+
+    _quiet_streamlit()
+    FIGURES.directory = Path(figure_dir)
+
+
+def export_district(district, out_dir, formats, chrome):
+    """Справка одного района во всех форматах; возвращает время сборки, с"""
+    start = time.perf_counter()
+    html_path = out_dir / f'{district}.html'
+    tmp = html_path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(build_report(district), encoding='utf-8')
+    os.replace(tmp, html_path)
+    if 'pdf' in formats:
+        print_pdf(html_path, out_dir / f'{district}.pdf', chrome)
+    return time.perf_counter() - start
+
+
+def export(districts=None, out_dir=OUT_DIR, formats=('html',), workers=None, force=False):
+    """Экспорт справок; возвращает {район: 'собран' | 'без изменений' | текст ошибки}"""
+    import plotly.offline
+
+    _quiet_streamlit()
+    from charts.cache import FIGURES
+    from loaders import get_store
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    chrome = find_chrome() if 'pdf' in formats else None
+    if 'pdf' in formats and chrome is None:
+        raise RuntimeError("Для PDF нужен Chrome или Chromium: укажите путь в TALDAU_CHROME")
+
+    store = get_store()   # синхронизация с каталогом данных — один раз, до запуска пула
+    districts = districts or store.districts()['district'].tolist()
+    index_path = out_dir / 'index.json'
+    index = read_json(index_path)
+    hashes = {d: data_hash(store, d) for d in districts}
+    todo = [d for d in districts if force or index.get(d) != hashes[d]
+            or not all((out_dir / f'{d}.{fmt}').exists() for fmt in formats)]
+    status = {d: 'без изменений' for d in districts if d not in todo}
+    if not todo:
+        return status
+
+    js = out_dir / PLOTLY_JS
+    if not js.exists():
+        js.write_text(plotly.offline.get_plotlyjs(), encoding='utf-8')
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as figure_dir:
+        FIGURES.directory = Path(figure_dir)
+        shared_figures()
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        # spawn: дочерние процессы не наследуют соединение SQLite родителя
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(figure_dir,)) as pool:
+            futures = {pool.submit(export_district, d, out_dir, formats, chrome): d for d in todo}
+            for future in as_completed(futures):
+                district = futures[future]
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    status[district] = f'ошибка: {e}'
+                    index.pop(district, None)
+                else:
+                    status[district] = f'собран за {seconds:.1f} с'
+                    index[district] = hashes[district]
+                print(f"{district:<24} {status[district]}", flush=True)
+        FIGURES.directory = None
+    write_json(index, index_path)
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('districts', nargs='*', help=f'ключи районов (по умолчанию — все; например {DEFAULT_DISTRICT})')
+    parser.add_argument('--out', default=OUT_DIR, type=Path, help='каталог отчётов')
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=['html'], dest='formats')
+    parser.add_argument('--workers', type=int, default=None, help='процессов (по умолчанию — по числу ядер)')
+    parser.add_argument('--force', action='store_true', help='собрать и неизменившиеся районы')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        status = export(args.districts, args.out, args.formats, args.workers, args.force)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    built = sum(s.startswith('собран') for s in status.values())
+    failed = sum(s.startswith('ошибка') for s in status.values())
+    print(f"\nсобрано: {built}, без изменений: {len(status) - built - failed}, ошибок: {failed} "
+          f"за {time.perf_counter() - start:.1f} с -> {args.out}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Нагрузочный тест: сколько одновременных сессий выдерживает один экземпляр.
+
+Дашборд запускается локально (streamlit run app2.py) на свободном порту,
+к нему подключаются N клиентов по тому же websocket, что и браузер
+(/_stcore/stream). Каждый клиент ведёт себя как пользователь: открывает
+страницу по умолчанию, затем переходит по разделам меню (views.PAGES)
+в случайном порядке, между переходами «читает» страницу — пауза вокруг
+--think секунд. Задержка перехода — от отправки нового значения меню до
+сообщения script_finished, как её видит браузер.
+
+Число сессий растёт ступенями (--sessions); открытые сессии не
+закрываются, на каждой ступени добавляются новые. По ступени печатаются
+p50/p95/p99 задержки, загрузка CPU сервера, его RSS и прирост RSS на
+добавленную сессию к прошлой ступени (/proc, только Linux; у первой
+ступени в прирост входят кэши, наполненные прогревом). Деградация —
+первая ступень, где p95 больше первой в --degrade раз или есть ошибки и
+таймауты: предыдущая ступень — сколько сессий держит экземпляр.
+
+Клиенты работают в одном процессе asyncio и сами занимают CPU: для
+замеров выше пары сотен сессий запускайте тест на машине с запасом ядер.
+
+    python -m tools.load_test                               # 1 … 50 сессий, по 60 с на ступень
+    python -m tools.load_test --sessions 5 10 20 --duration 30 --think 2
+    python -m tools.load_test --pages "🏠 Обзор" "💵 Субсидии" --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STAGES = (1, 5, 10, 20, 50)
+DURATION_S = 60
+THINK_S = 5.0
+TIMEOUT_S = 120
+DEGRADE = 2.0
+MENU_KEY = 'page'  # ключ st.sidebar.radio в app2.py
+
+
+# ==================== СЕРВЕР ====================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    """streamlit run app2.py без браузера; ждёт ответа /_stcore/health"""
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(ROOT / 'app2.py'),
+         '--server.headless', 'true', '--server.port', str(port),
+         '--browser.gatherUsageStats', 'false'],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"сервер не запустился: {proc.stderr.read().strip()[-500:]}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("сервер не ответил за 60 с")
+
+
+def server_usage(pid):
+    """(секунды CPU, RSS в МБ) процесса по /proc; (None, None) вне Linux"""
+    try:
+        fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')  # utime + stime
+        status = Path(f'/proc/{pid}/status').read_text()
+        rss_kb = next(int(line.split()[1]) for line in status.splitlines() if line.startswith('VmRSS:'))
+        return cpu, rss_kb / 1024
+    except (OSError, ValueError, StopIteration):
+        return None, None
+
+
+# ==================== КЛИЕНТ ====================
+
+async def rerun(ws, widgets=()):
+    """Перезапуск скрипта с состояниями виджетов -> (задержка, с; виджет меню или None)
+
+    Исключение на странице — ошибка замера: упавшая страница отдаётся быстро
+    и иначе улучшила бы задержку.
+    """
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = BackMsg()
+    msg.rerun_script.query_string = ''
+    for widget_id, value in widgets:
+        state = msg.rerun_script.widget_states.widgets.add()
+        state.id, state.string_value = widget_id, value  # st.radio передаёт подпись варианта
+    started = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+    menu = failed = None
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await ws.recv())
+        kind = forward.WhichOneof('type')
+        if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+            element = forward.delta.new_element
+            if element.WhichOneof('type') == 'radio' and element.radio.id.endswith(f'-{MENU_KEY}'):
+                menu = element.radio
+            elif element.WhichOneof('type') == 'exception':
+                failed = element.exception.message
+        elif kind == 'script_finished':
+            if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                raise RuntimeError("ошибка компиляции app2.py")
+            if failed is not None:
+                raise RuntimeError(f"исключение на странице: {failed}")
+            return time.perf_counter() - started, menu
+
+
+async def session(url, pages, think, state, samples):
+    """Один пользователь: первая отрисовка, затем переходы по меню до остановки теста"""
+    import websockets
+
+    rng = random.Random()
+    try:
+        async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as ws:
+            elapsed, menu = await asyncio.wait_for(rerun(ws), TIMEOUT_S)
+            samples.append((state['stage'], 'первая', elapsed))
+            if menu is None:
+                raise RuntimeError(f"в ответе нет меню с ключом {MENU_KEY!r}")
+            targets = [p for p in pages if p in menu.options]
+            while True:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+                page = rng.choice(targets)
+                stage = state['stage']
+                elapsed, _ = await asyncio.wait_for(rerun(ws, [(menu.id, page)]), TIMEOUT_S)
+                samples.append((stage, page, elapsed))
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        samples.append((state['stage'], 'таймаут', None))
+    except Exception as exc:
+        samples.append((state['stage'], f'ошибка: {exc}', None))
+
+
+# ==================== ЗАМЕР ====================
+
+def percentiles(values):
+    if len(values) < 2:
+        return (values[0],) * 3 if values else (None,) * 3
+    q = statistics.quantiles(values, n=100, method='inclusive')
+    return q[49], q[94], q[98]
+
+
+async def warm_up(url, pages):
+    """Каждая страница один раз до замера: импорт модулей и кэши загрузчиков не входят в p95"""
+    import websockets
+
+    started = time.perf_counter()
+    async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as ws:
+        _, menu = await asyncio.wait_for(rerun(ws), TIMEOUT_S)
+        if menu is None:
+            raise RuntimeError(f"в ответе нет меню с ключом {MENU_KEY!r}")
+        for page in pages:
+            await asyncio.wait_for(rerun(ws, [(menu.id, page)]), TIMEOUT_S)
+    return time.perf_counter() - started
+
+
+async def ramp(port, pid, stages, duration, think, pages):
+    url = f'ws://127.0.0.1:{port}/_stcore/stream'
+    state, samples, tasks, results = {'stage': 0}, [], [], []
+    # Прирост RSS на сессию — к прошлой ступени, у первой — к серверу до прогрева:
+    # после прогрева память частью освобождается, и прирост выходил отрицательным
+    _, last_rss = server_usage(pid)
+    last_sessions = 0
+    print(f"прогрев: {len(pages)} страниц за {await warm_up(url, pages):.1f} с", flush=True)
+    print_header()
+    try:
+        for stage, n_sessions in enumerate(stages):
+            state['stage'] = stage
+            # Новые сессии входят не разом, а вразброс в пределах паузы чтения
+            added = n_sessions - len(tasks)
+            for _ in range(added):
+                tasks.append(asyncio.create_task(session(url, pages, think, state, samples)))
+                await asyncio.sleep(think / added)
+            cpu_before, _ = server_usage(pid)
+            started = time.monotonic()
+            await asyncio.sleep(duration)
+            cpu_after, rss = server_usage(pid)
+            wall = time.monotonic() - started
+
+            done = [s for s in samples if s[0] == stage]
+            latencies = [s[2] * 1000 for s in done if s[2] is not None]
+            p50, p95, p99 = percentiles(latencies)
+            alive = sum(not t.done() for t in tasks)
+            results.append({
+                'sessions': n_sessions,
+                'alive': alive,
+                'reruns': len(latencies),
+                'errors': [s[1] for s in done if s[2] is None],
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                'cpu_pct': (cpu_after - cpu_before) / wall * 100 if cpu_after is not None else None,
+                'rss_mb': rss,
+                'rss_per_session_mb': (rss - last_rss) / (n_sessions - last_sessions) if rss is not None else None,
+                'pages': {page: statistics.median(s[2] * 1000 for s in done if s[1] == page and s[2] is not None)
+                          for page in {s[1] for s in done if s[2] is not None}},
+            })
+            print_row(results[-1])
+            last_rss, last_sessions = rss, n_sessions
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+def degradation(results, factor):
+    """Первая ступень, где p95 вырос в factor раз против первой или появились ошибки"""
+    base = results[0]['p95_ms'] if results else None
+    for r in results:
+        if r['errors'] or r['p95_ms'] is None or (base and r['p95_ms'] > base * factor):
+            return r
+    return None
+
+
+def print_header():
+    print(f"{'сессий':>7} {'живых':>6} {'переходов':>9} {'p50, мс':>8} {'p95, мс':>8} {'p99, мс':>8} "
+          f"{'CPU, %':>7} {'RSS, МБ':>8} {'на сессию':>9} {'ошибок':>6}")
+
+
+def _num(value, width, digits=0):
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'—':>{width}}"
+
+
+def print_row(r):
+    print(f"{r['sessions']:>7} {r['alive']:>6} {r['reruns']:>9} {_num(r['p50_ms'], 8)} {_num(r['p95_ms'], 8)} "
+          f"{_num(r['p99_ms'], 8)} {_num(r['cpu_pct'], 7)} {_num(r['rss_mb'], 8)} "
+          f"{_num(r['rss_per_session_mb'], 9, 1)} {len(r['errors']):>6}", flush=True)
+
+
+def main(argv=None):
+    from views import PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=STAGES, help='ступени числа сессий')
+    parser.add_argument('--duration', type=float, default=DURATION_S, help='секунд замера на ступень')
+    parser.add_argument('--think', type=float, default=THINK_S, help='средняя пауза между переходами, с')
+    parser.add_argument('--pages', nargs='+', default=list(PAGES), help='заголовки страниц из меню')
+    parser.add_argument('--degrade', type=float, default=DEGRADE, help='рост p95 против первой ступени')
+    parser.add_argument('--port', type=int, help='порт сервера (по умолчанию свободный)')
+    parser.add_argument('--json', help='сохранить отчёт в файл')
+    args = parser.parse_args(argv)
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        sys.exit("Нужен пакет websockets: pip install websockets")
+
+    unknown = [p for p in args.pages if p not in PAGES]
+    if unknown:
+        sys.exit(f"Нет таких страниц в меню: {', '.join(unknown)}")
+    stages = sorted(set(args.sessions))
+    port = args.port or free_port()
+    server = start_server(port)
+    try:
+        results = asyncio.run(ramp(port, server.pid, stages, args.duration, args.think, args.pages))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    worst = degradation(results, args.degrade)
+    if worst is None:
+        print(f"\nДеградации нет до {stages[-1]} сессий")
+    else:
+        held = [r['sessions'] for r in results if r['sessions'] < worst['sessions']]
+        reason = f"ошибок: {len(worst['errors'])}" if worst['errors'] else f"p95 {_num(worst['p95_ms'], 0)} мс"
+        print(f"\nЗадержка растёт с {worst['sessions']} сессий ({reason}); "
+              f"без деградации: {held[-1] if held else 'ни одной ступени'}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
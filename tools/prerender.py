@@ -0,0 +1,450 @@
+"""
+Статический снимок дашборда: страницы всех районов как HTML/JSON-сайт.
+
+Каждая страница из views.PAGES отрисовывается для каждого района тем же
+скриптом app2.py через streamlit.testing (AppTest), на текущих данных и
+с фильтрами по умолчанию. Дерево элементов переводится в HTML: заголовки,
+текст, метрики, колонки, вкладки (<details>), таблицы; графики Plotly —
+в JSON-файл страницы, их рисует plotly.js в браузере. Виджеты заменяются
+подписью «фильтр: значение», по которому собран снимок.
+
+Сайт отдаёт любой веб-сервер без Python (nginx, S3): страницы не
+обращаются к серверу дашборда. Из файловой системы (file://) графики не
+загрузятся — браузер не даёт fetch() читать JSON рядом со страницей.
+
+Страница собирается заново, только если изменился хэш её входов
+(manifest.json): версия кода и данные, которые читает страница
+(PAGE_INPUTS) — сводка района в хранилище, файлы участков и снимков,
+для «Сравнения районов» — данные всех районов. «Рекомендации» и «Smart
+Governance» от данных не зависят и после первой сборки пересобираются
+только при изменении кода.
+
+    python -m tools.prerender                                # все районы -> site/
+    python -m tools.prerender аршалынскии --out /var/www/taldau
+    python -m tools.prerender --workers 4 --force
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from config import BASE_DIR, DEFAULT_DISTRICT
+from ingest._cache import read_json, write_json
+from tools.export_reports import PLOTLY_JS, markdown
+
+# Увеличить при изменении вёрстки снимка — все страницы соберутся заново
+PRERENDER_VERSION = 1
+OUT_DIR = BASE_DIR / 'site'
+ROOT = BASE_DIR
+# Таблицы длиннее — обрезаются: снимок для чтения, выгрузка — в дашборде
+MAX_TABLE_ROWS = 500
+CURRENT = ' class="current"'
+WIDGETS = {'selectbox', 'multiselect', 'slider', 'select_slider', 'number_input', 'text_input',
+           'toggle', 'checkbox', 'radio', 'date_input'}
+
+STYLE = """
+body { font-family: 'Segoe UI', Arial, sans-serif; color: #222; margin: 0; }
+header { background: #1E3A5F; color: #fff; padding: 0.6rem 1.5rem; display: flex; flex-wrap: wrap; gap: 0.4rem 1rem;
+         align-items: center; }
+header a { color: #fff; text-decoration: none; opacity: 0.8; }
+header a.current { opacity: 1; font-weight: bold; border-bottom: 2px solid #fff; }
+header select { margin-left: auto; }
+main { max-width: 1200px; margin: 0 auto; padding: 1rem 1.5rem; }
+.row { display: flex; flex-wrap: wrap; gap: 1rem; }
+.row > .col { min-width: 220px; }
+.metric .label { font-size: 0.85rem; color: #555; }
+.metric .value { font-size: 1.6rem; }
+.metric .delta { font-size: 0.85rem; color: #1a7f37; }
+.caption, .widget { font-size: 0.85rem; color: #666; }
+.alert { padding: 0.8rem 1rem; border-radius: 6px; margin: 0.5rem 0; background: #e7f3ff; }
+.alert.success { background: #e6f4ea; } .alert.warning { background: #fef3cd; } .alert.error { background: #fde2e1; }
+details > summary { cursor: pointer; font-weight: bold; padding: 0.4rem 0; }
+.table { overflow-x: auto; }
+table { border-collapse: collapse; margin: 0.5rem 0; }
+td, th { border: 1px solid #ddd; padding: 0.25rem 0.5rem; font-size: 0.85rem; text-align: left; }
+td { text-align: right; }
+footer { color: #888; font-size: 0.8rem; padding: 1rem 1.5rem; }
+"""
+
+SCRIPT = """
+fetch(document.body.dataset.charts).then(function (r) { return r.json(); }).then(function (specs) {
+  document.querySelectorAll('.chart').forEach(function (div) {
+    var spec = specs[+div.dataset.chart];
+    Plotly.newPlot(div, spec.data, spec.layout, {responsive: true, displaylogo: false});
+  });
+});
+fetch('../districts.json').then(function (r) { return r.json(); }).then(function (districts) {
+  var select = document.getElementById('district');
+  districts.forEach(function (d) { select.add(new Option(d.name, d.district, false, d.district === select.dataset.current)); });
+  select.onchange = function () { location.href = '../' + select.value + '/' + select.dataset.page; };
+});
+"""
+
+
+# ==================== ВХОДЫ СТРАНИЦ ====================
+
+def _all_districts(store):
+    return store.districts()['district'].tolist()
+
+
+def _district(store, district):
+    return store.district_signature(district)
+
+
+def _parcels(store, district):
+    from ingest.parcels import parcels_signature
+    return parcels_signature(district)
+
+
+def _ndvi(store, district):
+    from ingest.ndvi import folder_signature
+    return folder_signature(district)
+
+
+def _forecast(store, district=None):
+    """Прогноз урожайности обучается на посевах всех районов и файлах погоды"""
+    from ingest.features import sources_signature
+    return [sources_signature(), [store.crops_signature(d) for d in _all_districts(store)]]
+
+
+def _every_district(store, district=None):
+    return [store.district_signature(d) for d in _all_districts(store)]
+
+
+# Модуль страницы -> данные, которые она читает; входы с district=None общие для всех районов
+PAGE_INPUTS = {
+    'views.overview': (_district, _parcels),
+    'views.value_chain': (_district,),
+    'views.subsidies': (_district,),
+    'views.crops': (_district, _ndvi, _forecast),
+    'views.compare': (_every_district,),
+    'views.smart_governance': (),
+    'views.recommendations': (),
+}
+SHARED_INPUTS = (_forecast, _every_district)
+
+
+def code_digest():
+    """Хэш исходников дашборда (без tools/): изменился код — снимок устарел"""
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(ROOT.rglob('*.py')):
+        relative = path.relative_to(ROOT)
+        if relative.parts[0] == 'tools' or '__pycache__' in relative.parts:
+            continue
+        h.update(str(relative).encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def page_hashes(store, districts, pages):
+    """{(район, заголовок): хэш входов страницы}; общие входы считаются один раз"""
+    import plotly
+    import streamlit
+
+    from views import PAGES
+
+    common = [PRERENDER_VERSION, plotly.__version__, streamlit.__version__, code_digest()]
+    names = store.districts().set_index('district')['name']
+    shared = {}
+    hashes = {}
+    for district in districts:
+        for title in pages:
+            inputs = []
+            for source in PAGE_INPUTS.get(PAGES[title][0], (_every_district,)):
+                if source in SHARED_INPUTS:
+                    if source not in shared:
+                        shared[source] = source(store)
+                    inputs.append(shared[source])
+                else:
+                    inputs.append(source(store, district))
+            payload = json.dumps([common, title, district, names.get(district), inputs], ensure_ascii=False, default=str)
+            hashes[district, title] = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return hashes
+
+
+# ==================== ЭЛЕМЕНТЫ -> HTML ====================
+
+def page_slug(title):
+    """Имя файла страницы: модуль без views. (overview, value_chain, …)"""
+    from views import PAGES
+    return PAGES[title][0].rsplit('.', 1)[-1]
+
+
+def _number(value):
+    if value != value:      # NaN
+        return ''
+    return f"{value:,.0f}".replace(',', ' ') if abs(value) >= 100 else f"{value:.2f}"
+
+
+def _widget_value(value):
+    if isinstance(value, (list, tuple)):
+        return ', '.join(map(str, value)) if value else 'все'
+    if isinstance(value, bool):
+        return 'да' if value else 'нет'
+    return '—' if value is None or value == '' else str(value)
+
+
+def _table(df):
+    note = ''
+    if len(df) > MAX_TABLE_ROWS:
+        note = f'<p class="caption">Первые {MAX_TABLE_ROWS} строк из {len(df)}.</p>'
+        df = df.head(MAX_TABLE_ROWS)
+    return f'<div class="table">{df.to_html(index=False, na_rep="", float_format=_number, border=0)}</div>{note}'
+
+
+class Page:
+    """Одна отрисованная страница: HTML основной области и графики для JSON-файла"""
+
+    def __init__(self):
+        self.charts = []
+
+    def element(self, node):
+        kind = node.type
+        proto = getattr(node, 'proto', None)
+        if kind in ('markdown', 'caption', 'divider', 'code', 'latex'):
+            if kind == 'divider':
+                return '<hr>'
+            if kind in ('code', 'latex'):
+                return f'<pre>{html.escape(proto.body)}</pre>'
+            body = proto.body if proto.allow_html else markdown(proto.body)
+            return f'<div class="caption">{body}</div>' if kind == 'caption' else body
+        if kind in ('title', 'header', 'subheader'):
+            return f'<{proto.tag}>{html.escape(proto.body)}</{proto.tag}>'
+        if kind == 'metric':
+            delta = f'<div class="delta">{html.escape(proto.delta)}</div>' if proto.delta else ''
+            return (f'<div class="metric"><div class="label">{html.escape(proto.label)}</div>'
+                    f'<div class="value">{html.escape(proto.body)}</div>{delta}</div>')
+        if kind in ('info', 'success', 'warning', 'error'):
+            return f'<div class="alert {kind}">{markdown(proto.body)}</div>'
+        if kind in ('dataframe', 'table'):
+            return _table(node.value)
+        if kind == 'plotly_chart':
+            self.charts.append(proto.spec)
+            height = json.loads(proto.spec).get('layout', {}).get('height') or 450
+            return f'<div class="chart" data-chart="{len(self.charts) - 1}" style="height: {height}px"></div>'
+        if kind in WIDGETS:
+            return (f'<p class="widget">{html.escape(node.label)}: '
+                    f'<b>{html.escape(_widget_value(node.value))}</b></p>')
+        if hasattr(node, 'children'):
+            return self.block(node)
+        return ''   # элементы без статического вида (кнопки, загрузка файлов)
+
+    def block(self, node):
+        children = list(node.children.values())
+        if node.type == 'tab_container':
+            return ''.join(f'<details{" open" if i == 0 else ""}><summary>{html.escape(tab.label)}</summary>'
+                           f'{self.block(tab)}</details>' for i, tab in enumerate(children))
+        inner = ''.join(self.element(child) for child in children)
+        if node.type == 'expander':
+            return f'<details{" open" if node.proto.expanded else ""}><summary>{html.escape(node.label)}</summary>{inner}</details>'
+        if node.type == 'column':
+            return f'<div class="col" style="flex: {node.weight or 1}">{inner}</div>'
+        if children and all(child.type == 'column' for child in children):
+            return f'<div class="row">{inner}</div>'
+        return inner
+
+
+def render_page(district, title, name):
+    """(HTML страницы, имя JSON графиков, JSON графиков) — отрисовка app2.py на выбранных районе и странице
+
+    Имя JSON содержит хэш графиков: страница и её графики меняются вместе,
+    а веб-сервер может отдавать JSON с долгим кэшированием.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from views import PAGES
+
+    at = AppTest.from_file(str(ROOT / 'app2.py'), default_timeout=900)
+    at.session_state['district'] = district
+    at.session_state['page'] = title
+    main = sys.modules['__main__']
+    try:
+        at.run()
+    finally:
+        # AppTest оставляет app2.py в __main__, а по нему пул находит функции следующих задач
+        sys.modules['__main__'] = main
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    page = Page()
+    body = page.block(at.main)
+    slug = page_slug(title)
+    charts = '[' + ','.join(page.charts) + ']'
+    charts_name = f'{slug}.{hashlib.blake2b(charts.encode(), digest_size=5).hexdigest()}.json'
+    nav = ''.join(f'<a href="{page_slug(t)}.html"{CURRENT if t == title else ""}>{html.escape(t)}</a>' for t in PAGES)
+    document = (
+        f'<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f'<title>{html.escape(title)} · {html.escape(name)}</title>'
+        f'<link rel="stylesheet" href="../site.css"><script src="../{PLOTLY_JS}" defer></script></head>'
+        f'<body data-charts="{charts_name}"><header>{nav}'
+        f'<select id="district" data-current="{html.escape(district)}" data-page="{slug}.html"></select></header>'
+        f'<main>{body}</main><footer>Снимок от {time.strftime("%d.%m.%Y %H:%M")} · фильтры по умолчанию</footer>'
+        f'<script defer src="../site.js"></script></body></html>'
+    )
+    return document, charts_name, charts
+
+
+# ==================== СБОРКА ====================
+
+def _write(path, text):
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _quiet_streamlit():
+    """AppTest и загрузчики работают без сервера Streamlit — без предупреждений об этом"""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    # AppTest выставляет уровень журнала из конфигурации Streamlit при каждом запуске
+    config.set_option('logger.level', 'error')
+    set_log_level('error')
+
+
+def _init_worker(figure_dir):
+    from charts.cache import FIGURES
+
+    _quiet_streamlit()
+    FIGURES.directory = Path(figure_dir)
+
+
+def prerender_district(district, name, titles, out_dir):
+    """Страницы одного района; возвращает {заголовок: время сборки, с | текст ошибки}"""
+    folder = out_dir / district
+    folder.mkdir(parents=True, exist_ok=True)
+    result = {}
+    for title in titles:
+        start = time.perf_counter()
+        try:
+            document, charts_name, charts = render_page(district, title, name)
+        except Exception as e:
+            result[title] = f'ошибка: {e}'
+            continue
+        slug = page_slug(title)
+        # Графики — до страницы: новая страница не ссылается на ещё не записанный JSON
+        _write(folder / charts_name, charts)
+        _write(folder / f'{slug}.html', document)
+        for old in folder.glob(f'{slug}.*.json'):
+            if old.name != charts_name:
+                old.unlink()
+        result[title] = time.perf_counter() - start
+    return result
+
+
+def prerender(districts=None, out_dir=OUT_DIR, pages=None, workers=None, force=False):
+    """Сборка снимка; возвращает {(район, заголовок): 'собрана …' | 'без изменений' | текст ошибки}"""
+    _quiet_streamlit()
+    from loaders import get_store
+    from views import PAGES
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    store = get_store()   # синхронизация с каталогом данных — один раз, до запуска пула
+    table = store.districts()
+    names = table.set_index('district')['name'].to_dict()
+    districts = districts or table['district'].tolist()
+    pages = pages or list(PAGES)
+
+    manifest_path = out_dir / 'manifest.json'
+    manifest = read_json(manifest_path)
+    hashes = page_hashes(store, districts, pages)
+    key = '{}/{}'.format
+    todo = {}
+    for district, title in hashes:
+        if (force or manifest.get(key(district, page_slug(title))) != hashes[district, title]
+                or not (out_dir / district / f'{page_slug(title)}.html').exists()):
+            todo.setdefault(district, []).append(title)
+    status = {page: 'без изменений' for page in hashes if page[1] not in todo.get(page[0], ())}
+
+    for district, result in build(todo, names, out_dir, workers):
+        for title, outcome in result.items():
+            if isinstance(outcome, str):
+                status[district, title] = outcome
+                manifest.pop(key(district, page_slug(title)), None)
+            else:
+                status[district, title] = f'собрана за {outcome:.1f} с'
+                manifest[key(district, page_slug(title))] = hashes[district, title]
+            print(f"{district:<24} {title:<24} {status[district, title]}", flush=True)
+        # Манифест — после каждого района: прерванная сборка не теряет готовые страницы
+        write_json(manifest, manifest_path)
+    write_shell(out_dir, names)
+    return status
+
+
+def build(todo, names, out_dir, workers=None):
+    """Устаревшие страницы в пуле процессов, по задаче на район; выдаёт (район, {заголовок: с | ошибка})"""
+    from charts.cache import FIGURES
+
+    if not todo:
+        return
+    with tempfile.TemporaryDirectory(dir=out_dir) as figure_dir:
+        FIGURES.directory = Path(figure_dir)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        try:
+            # spawn: дочерние процессы не наследуют соединение SQLite родителя
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(figure_dir,)) as pool:
+                futures = {pool.submit(prerender_district, d, names.get(d, d), titles, out_dir): d
+                           for d, titles in todo.items()}
+                for future in as_completed(futures):
+                    district = futures[future]
+                    try:
+                        yield district, future.result()
+                    except Exception as e:
+                        yield district, {title: f'ошибка: {e}' for title in todo[district]}
+        finally:
+            FIGURES.directory = None
+
+
+def write_shell(out_dir, names):
+    """Общие файлы сайта: plotly.js, стили, скрипт, список собранных районов и стартовая страница"""
+    import plotly.offline
+
+    from views import PAGES
+
+    js = out_dir / PLOTLY_JS
+    if not js.exists():
+        js.write_text(plotly.offline.get_plotlyjs(), encoding='utf-8')
+    _write(out_dir / 'site.css', STYLE)
+    _write(out_dir / 'site.js', SCRIPT)
+    # В переключатель — только районы, у которых есть страницы
+    built = [d for d in names if (out_dir / d).is_dir()]
+    _write(out_dir / 'districts.json', json.dumps([{'district': d, 'name': names[d]} for d in built],
+                                                  ensure_ascii=False))
+    first = DEFAULT_DISTRICT if DEFAULT_DISTRICT in built else next(iter(built), DEFAULT_DISTRICT)
+    slug = next((page_slug(t) for t in PAGES if (out_dir / first / f'{page_slug(t)}.html').exists()), 'overview')
+    _write(out_dir / 'index.html', f'<!DOCTYPE html><meta charset="utf-8">'
+                                   f'<meta http-equiv="refresh" content="0; url={first}/{slug}.html">')
+
+
+def main(argv=None):
+    from views import PAGES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('districts', nargs='*', help=f'ключи районов (по умолчанию — все; например {DEFAULT_DISTRICT})')
+    parser.add_argument('--out', default=OUT_DIR, type=Path, help='каталог сайта')
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), help='заголовки страниц (по умолчанию — все)')
+    parser.add_argument('--workers', type=int, default=None, help='процессов (по умолчанию — по числу ядер)')
+    parser.add_argument('--force', action='store_true', help='собрать и неизменившиеся страницы')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    status = prerender(args.districts, args.out, args.pages, args.workers, args.force)
+    built = sum(s.startswith('собрана') for s in status.values())
+    failed = sum(s.startswith('ошибка') for s in status.values())
+    print(f"\nсобрано: {built}, без изменений: {len(status) - built - failed}, ошибок: {failed} "
+          f"за {time.perf_counter() - start:.1f} с -> {args.out}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
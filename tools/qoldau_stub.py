@@ -0,0 +1,163 @@
+"""
+Заглушка API выгрузки заявок Qoldau — для проверки ingest/qoldau.py без доступа к API.
+
+Отдаёт синтетические заявки районов (tools/synthetic.py) по контракту из
+ingest/qoldau.py: постранично, с фильтром updated_since и ETag района.
+Можно добавить задержку ответа и долю ошибок 429/503, чтобы проверить
+повторы, а POST /_touch меняет часть заявок района — следующая
+синхронизация должна забрать только их.
+
+    python -m tools.qoldau_stub --districts 20 --rows 50000 --port 8765
+    python -m tools.qoldau_stub --fail-rate 0.2 --latency 50
+    curl -X POST 'http://127.0.0.1:8765/_touch?district=аршалынскии&n=10'
+
+Из кода: server = serve(port=0) запускает заглушку в фоновом потоке,
+адрес — f'http://127.0.0.1:{server.server_port}', остановка — server.shutdown().
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tools.synthetic import synthetic_subsidies
+
+DISTRICTS = ('аршалынскии', 'целиноградскии', 'шортандинскии', 'бурабаискии', 'зерендинскии',
+             'есильскии', 'атбасарскии', 'аккольскии', 'астраханскии', 'буландынскии')
+START = datetime(2025, 1, 1)
+
+
+class Applications:
+    """Заявки районов в памяти; каждое изменение сдвигает время изменения заявки вперёд"""
+
+    def __init__(self, districts, rows, year=2025, seed=0):
+        self._lock = threading.Lock()
+        self._clock = START
+        self.items = {}
+        for i, district in enumerate(districts):
+            df = synthetic_subsidies(rows, district, year, seed=seed + i)
+            self.items[district] = [{
+                'id': f'{district}-{n}',
+                'district': district,
+                'year': year,
+                'recipient': r.Получатель,
+                'bin': r.БИН,
+                'subsidy': r.Субсидия,
+                'amount': r.Сумма_тг,
+                'date': r.Дата.strftime('%Y-%m-%d'),
+                'status': 'paid',
+                'updated_at': self._tick(),
+            } for n, r in enumerate(df.itertuples(index=False))]
+
+    def _tick(self):
+        self._clock += timedelta(seconds=1)
+        return self._clock.strftime('%Y-%m-%dT%H:%M:%S')
+
+    def etag(self, district):
+        """Версия данных района: последнее изменение и число заявок"""
+        items = self.items.get(district, [])
+        version = f"{district}|{len(items)}|{max((a['updated_at'] for a in items), default='')}"
+        return '"' + hashlib.blake2b(version.encode(), digest_size=8).hexdigest() + '"'
+
+    def changed(self, district, since):
+        with self._lock:
+            items = [a for a in self.items.get(district, []) if not since or a['updated_at'] >= since]
+        return sorted(items, key=lambda a: (a['updated_at'], a['id']))
+
+    def touch(self, district, n, rng):
+        """Изменить n заявок района: сумма, иногда — отказ"""
+        with self._lock:
+            chosen = rng.sample(self.items.get(district, []), min(n, len(self.items.get(district, []))))
+            for a in chosen:
+                a['amount'] = round(a['amount'] * rng.uniform(0.5, 1.5), -2)
+                a['status'] = 'rejected' if rng.random() < 0.1 else 'paid'
+                a['updated_at'] = self._tick()
+        return len(chosen)
+
+
+def make_handler(data, fail_rate=0.0, latency=0.0, seed=0):
+    rng = random.Random(seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'   # keep-alive: клиент переиспользует соединения пула
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if latency:
+                time.sleep(latency)
+            if url.path != '/applications':
+                return self._send(404)
+            if rng.random() < fail_rate:
+                return self._send(rng.choice((429, 503)), headers={'Retry-After': '0'})
+            district = query.get('district', '')
+            etag = data.etag(district)
+            if 'page_token' not in query and self.headers.get('If-None-Match') == etag:
+                return self._send(304, headers={'ETag': etag})
+            items = data.changed(district, query.get('updated_since'))
+            offset, limit = int(query.get('page_token', 0)), int(query.get('limit', 500))
+            page = items[offset:offset + limit]
+            body = json.dumps({
+                'items': page,
+                'next_page_token': str(offset + limit) if offset + limit < len(items) else None,
+            }, ensure_ascii=False).encode()
+            self._send(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path != '/_touch':
+                return self._send(404)
+            n = data.touch(query.get('district', ''), int(query.get('n', 1)), rng)
+            self._send(200, json.dumps({'touched': n}).encode(), {'Content-Type': 'application/json'})
+
+    return Handler
+
+
+def serve(port=8765, districts=DISTRICTS, rows=1000, fail_rate=0.0, latency=0.0, seed=0):
+    """Заглушка в фоновом потоке; возвращает сервер (server.data — заявки)"""
+    data = Applications(districts, rows, seed=seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(data, fail_rate, latency, seed))
+    server.daemon_threads = True
+    server.data = data
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--districts', type=int, default=len(DISTRICTS), help='районов (синтетические сверх списка)')
+    parser.add_argument('--rows', type=int, default=1000, help='заявок на район')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='доля ответов 429/503')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, мс')
+    args = parser.parse_args(argv)
+
+    districts = list(DISTRICTS[:args.districts]) + [f'раион{i}' for i in range(len(DISTRICTS), args.districts)]
+    server = serve(args.port, districts, args.rows, args.fail_rate, args.latency / 1000)
+    print(f"заглушка Qoldau: http://127.0.0.1:{server.server_port} · районов {len(districts)} · "
+          f"заявок {args.rows * len(districts)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
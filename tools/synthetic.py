@@ -0,0 +1,80 @@
+"""
+Синтетические данные для замеров: реестр субсидий и границы участков любого размера.
+
+Распределения похожи на настоящие выгрузки: сотни получателей на район,
+суммы с тяжёлым хвостом (немногие получают большую часть), типы и
+программы в тех же категориях, что даёт разбор книг (ingest/subsidies.py).
+"""
+
+import numpy as np
+import pandas as pd
+
+from ingest.subsidies import PROGRAM_KEYWORDS, SUBSIDY_SCHEMA
+
+FORMS = ('ТОО', 'КХ', 'ПК', 'ИП')
+FORM_WEIGHTS = (0.35, 0.5, 0.05, 0.1)
+# Сторона квадрата соседних участков одного хозяйства, клеток сетки
+FARM_CELLS = 3
+PROGRAMS = tuple(dict.fromkeys(category for _, category in PROGRAM_KEYWORDS)) + ('Прочие',)
+
+
+def synthetic_subsidies(n_rows, district='аршалынскии', year=2025, seed=0):
+    """Реестр из n_rows выплат: в среднем по 10 выплат на получателя"""
+    rng = np.random.default_rng(seed)
+    n_recipients = max(10, n_rows // 10)
+    forms = rng.choice(FORMS, n_recipients, p=FORM_WEIGHTS)
+    names = pd.Series([f'{form} "Хозяйство {i}"' for i, form in enumerate(forms)])
+    bins = pd.Series([f'{i:012d}' for i in rng.integers(10**11, 10**12, n_recipients)])
+    # Чем «крупнее» получатель, тем чаще и больше выплаты — отсюда концентрация
+    weight = rng.pareto(1.2, n_recipients) + 1
+    who = rng.choice(n_recipients, n_rows, p=weight / weight.sum())
+    program = rng.choice(PROGRAMS, n_rows)
+    df = pd.DataFrame({
+        'Район': district,
+        'Год': year,
+        'Получатель': names.to_numpy()[who],
+        'БИН': bins.to_numpy()[who],
+        'Тип': forms[who],
+        'Программа': program,
+        'Субсидия': program,
+        'Сумма_тг': np.round(rng.lognormal(13, 1.2, n_rows) * weight[who] ** 0.5, -2),
+        'Дата': pd.Timestamp(year, 1, 1) + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D'),
+        'Источник': 'synthetic',
+    })
+    return df.astype(SUBSIDY_SCHEMA)
+
+
+def synthetic_parcels(n_parcels, center=(71.0, 50.6), vertices=200, seed=0, size=(0.004, 0.01)):
+    """Границы n_parcels участков (FeatureCollection) вокруг center — как оцифрованные вручную.
+
+    Участки — прямоугольники со сторонами из диапазона size (градусов широты;
+    по умолчанию 0,4–1,1 км) сеткой, каждая сторона разбита на vertices / 4
+    точек с дрожанием в несколько метров. Участки хозяйства — соседние
+    клетки сетки (квадрат FARM_CELLS × FARM_CELLS).
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(n_parcels)))
+    step = 0.011                                  # шаг сетки, градусов широты (~1,2 км)
+    lon_scale = 1 / np.cos(np.radians(center[1]))
+    forms = rng.choice(FORMS, max(10, n_parcels // 8), p=FORM_WEIGHTS)
+    crops = ('Пшеница', 'Ячмень', 'Масличные', 'Кормовые', 'Горох')
+    t = np.linspace(0, 1, vertices // 4, endpoint=False)
+    features = []
+    for i in range(n_parcels):
+        row, col = divmod(i, side)
+        w, h = rng.uniform(*size, 2)
+        x0 = center[0] + (col - side / 2) * step * lon_scale
+        y0 = center[1] + (row - side / 2) * step
+        xs = np.concatenate([x0 + t * w * lon_scale, np.full_like(t, x0 + w * lon_scale),
+                             x0 + (1 - t) * w * lon_scale, np.full_like(t, x0)])
+        ys = np.concatenate([np.full_like(t, y0), y0 + t * h, np.full_like(t, y0 + h), y0 + (1 - t) * h])
+        xs = xs + rng.normal(0, 3e-5, xs.size) * lon_scale
+        ys = ys + rng.normal(0, 3e-5, ys.size)
+        ring = np.column_stack([xs, ys]).round(6).tolist()
+        farm = (row // FARM_CELLS * -(-side // FARM_CELLS) + col // FARM_CELLS) % len(forms)
+        features.append({
+            'type': 'Feature',
+            'properties': {'Хозяйство': f'{forms[farm]} "Хозяйство {farm}"', 'Культура': crops[rng.integers(len(crops))]},
+            'geometry': {'type': 'Polygon', 'coordinates': [ring + ring[:1]]},
+        })
+    return {'type': 'FeatureCollection', 'features': features}
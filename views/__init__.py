@@ -0,0 +1,39 @@
+"""Страницы дашборда.
+
+Каждая страница — отдельный модуль со своими фабриками графиков. Модуль
+(вместе с plotly.express и расчётными зависимостями) импортируется только
+когда страницу открывают впервые, поэтому холодный старт отрисовывает
+«Обзор», не загружая код остальных разделов.
+
+Пакет называется views, а не pages: каталог pages/ рядом со скриптом
+Streamlit сам превращает в многостраничную навигацию.
+"""
+
+import importlib
+
+import perf
+
+# Заголовок в меню -> (модуль, функция страницы); порядок — порядок меню
+PAGES = {
+    "🏠 Обзор": ("views.overview", "page_overview"),
+    "🔗 Цепочки стоимости": ("views.value_chain", "page_value_chain"),
+    "💵 Субсидии": ("views.subsidies", "page_subsidies"),
+    "🌾 Посевы": ("views.crops", "page_crops"),
+    "📊 Сравнение районов": ("views.compare", "page_compare"),
+    "🖥️ Smart Governance": ("views.smart_governance", "page_smart_governance"),
+    "📝 Рекомендации": ("views.recommendations", "page_recommendations"),
+}
+
+
+def load_page(title):
+    """Функция страницы по заголовку меню; модуль импортируется при первом вызове
+
+    Импорт модуля входит в замер страницы (perf.py) — на холодном старте
+    это заметная часть времени.
+    """
+    module, func = PAGES[title]
+
+    @perf.traced('page', func)
+    def page():
+        return getattr(importlib.import_module(module), func)()
+    return page
@@ -0,0 +1,22 @@
+"""Форматы числовых столбцов таблиц.
+
+Числа уходят в браузер как есть (Arrow), а разряды и единицы расставляет
+сам st.dataframe по column_config — на сервере ничего не форматируется
+построчно, и сортировка в таблице остаётся числовой.
+"""
+
+import streamlit as st
+
+
+def tenge_column(label=None, help=None):
+    """Сумма в тенге: «91,558,200 ₸» (значения округляются заранее — %d отбрасывает дробь)"""
+    return st.column_config.NumberColumn(label, help=help, format="%,d ₸")
+
+
+def percent_column(label=None, help=None):
+    """Проценты в шкале 0–100: «42%»"""
+    return st.column_config.NumberColumn(label, help=help, format="%.0f%%")
+
+
+def integer_column(label=None, help=None):
+    return st.column_config.NumberColumn(label, help=help, format="%,d")
@@ -0,0 +1,58 @@
+"""Страница «📊 Сравнение районов»"""
+
+import plotly.express as px
+import streamlit as st
+
+from charts.cache import cached_figure, show_chart
+from loaders import current_district, get_store
+from views._format import percent_column
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_compare_chart(chart):
+    """Объём субсидий по районам, текущий район выделен"""
+    fig = px.bar(chart, x='Субсидии_тг', y='Район', orientation='h',
+                 color='Текущий', color_discrete_map={True: '#DC3545', False: '#2E86AB'},
+                 title='Объём субсидий по районам (топ-30)')
+    fig.update_layout(height=max(300, 22 * len(chart)), showlegend=False,
+                      yaxis={'categoryorder': 'total ascending'})
+    return fig
+
+# ==================== СТРАНИЦА ====================
+
+def page_compare():
+    """Сравнение районов области/страны"""
+    st.header("📊 Сравнение районов")
+    
+    store = get_store()
+    districts = store.districts()
+    regions = sorted(districts['region'].dropna().unique())
+    years = store.years('subsidies')
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        region = st.selectbox("Область", ["Все области"] + regions)
+    with col2:
+        year = st.selectbox("Год субсидий", years[::-1]) if years else None
+    
+    summary = store.compare(year, None if region == "Все области" else region)
+    summary['Субсидии_на_га_тг'] = summary['subsidies_tg'] / summary['sown_ha']
+    summary['Текущий'] = summary['district'] == current_district()
+    summary = summary.rename(columns={
+        'name': 'Район', 'region': 'Область', 'population': 'Население',
+        'arable_land_ha': 'Пашня_га', 'subsidies_tg': 'Субсидии_тг',
+        'recipients': 'Получателей', 'sown_ha': 'Посев_га', 'gini': 'Джини', 'top10_pct': 'Топ10_%',
+    })
+    
+    st.metric("Районов в сравнении", len(summary))
+    
+    chart = summary.dropna(subset=['Субсидии_тг']).nlargest(30, 'Субсидии_тг')
+    if not chart.empty:
+        show_chart(create_compare_chart(chart))
+    
+    st.dataframe(summary[['Район', 'Область', 'Население', 'Пашня_га', 'Субсидии_тг',
+                          'Получателей', 'Джини', 'Топ10_%', 'Посев_га', 'Субсидии_на_га_тг']],
+                 width='stretch', hide_index=True,
+                 column_config={'Джини': st.column_config.NumberColumn(format="%.2f"),
+                                'Топ10_%': percent_column('Топ-10 получателей')})
@@ -0,0 +1,298 @@
+"""Страница «🌾 Посевы»"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from analytics.rollup import cells, last_year
+from charts.cache import cached_figure, show_chart
+from config import DEFAULT_DISTRICT
+from loaders import (
+    current_district,
+    load_crops_data,
+    load_farm_index,
+    load_farm_support,
+    load_rollup,
+    load_sowing_data,
+    load_vegetation,
+    load_yield_forecast,
+)
+import perf
+from views._format import integer_column, tenge_column
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_crop_structure_chart(culture_sums):
+    """Структура посевных площадей по культурам"""
+    fig = px.pie(values=list(culture_sums.values()), 
+                 names=list(culture_sums.keys()),
+                 title='Структура посевных площадей (га)',
+                 color_discrete_sequence=px.colors.qualitative.Set2)
+    fig.update_layout(height=350)
+    return fig
+
+@cached_figure
+def create_top_farms_chart(crops):
+    """Крупнейшие землепользователи по факту посева"""
+    fig = px.bar(crops, 
+                 x='Факт_га', y='Хозяйство', orientation='h',
+                 title='Крупнейшие землепользователи',
+                 color='Выполнение_%',
+                 color_continuous_scale='RdYlGn',
+                 range_color=[50, 150])
+    fig.update_layout(height=350, yaxis={'categoryorder':'total ascending'})
+    return fig
+
+@cached_figure
+def create_sowing_progress_chart(by_date):
+    """Засеянная площадь нарастающим итогом по отчётным датам"""
+    fig = px.line(by_date, x='Дата', y='Факт_га', color='Культура', markers=True,
+                  title='Засеяно нарастающим итогом (га)',
+                  color_discrete_sequence=px.colors.qualitative.Set2)
+    fig.update_layout(height=350)
+    return fig
+
+@cached_figure
+def create_ndvi_chart(series):
+    """NDVI хозяйств по датам снимков"""
+    fig = px.line(series, x='Дата', y='NDVI', color='Хозяйство', markers=True,
+                  title='Вегетационный индекс NDVI по снимкам Sentinel-2',
+                  color_discrete_sequence=px.colors.qualitative.Set2)
+    fig.update_layout(height=350, yaxis_range=[0, 1])
+    return fig
+
+@cached_figure
+def create_harvest_chart(by_crop):
+    """Прогноз валового сбора по культурам с интервалом"""
+    fig = px.bar(by_crop, x='Культура', y='Сбор_т',
+                 error_y=by_crop['Сбор_верхняя_т'] - by_crop['Сбор_т'],
+                 error_y_minus=by_crop['Сбор_т'] - by_crop['Сбор_нижняя_т'],
+                 title='Прогноз валового сбора (т)',
+                 color_discrete_sequence=['#28A745'])
+    fig.update_layout(height=350)
+    return fig
+
+# ==================== ДАННЫЕ ГРАФИКОВ ====================
+
+def culture_sums(cube, year):
+    """Факт посева по культурам за год, га — ячейки куба"""
+    by_crop = cells(cube, ['Культура'], Год=year).sort_values('Факт_га', ascending=False)
+    return dict(zip(by_crop['Культура'], by_crop['Факт_га']))
+
+def top_farms(crops, n=10):
+    """Крупнейшие хозяйства по факту посева (без итоговой строки КХ)"""
+    return crops[crops['Хозяйство'] != 'КХ (всего)'].nlargest(n, 'Факт_га')
+
+def filter_farms(farms, cultures=(), types=(), min_area=0):
+    """Хозяйства по фильтру; farms отсортированы по убыванию факта (load_farm_index).
+
+    min_area — по всему посеву хозяйства; с выбранными культурами «Факт_га» —
+    посев только этих культур.
+    """
+    # Факт по убыванию: хозяйства не меньше min_area — начало таблицы
+    farms = farms.iloc[:np.searchsorted(-farms['Факт_га'].to_numpy(), -min_area, 'right')]
+    if types:
+        farms = farms[farms['Тип'].isin(types)]
+    if cultures:
+        fact = farms[[f'{c}_факт' for c in cultures]].sum(axis=1)
+        farms = farms.assign(Факт_га=fact)[fact > 0].sort_values('Факт_га', ascending=False, kind='stable')
+    return farms
+
+def sowing_by_date(progress):
+    """Факт посева нарастающим итогом по датам и культурам"""
+    by_crop = progress[~progress['Культура'].isin(['Всего', 'Зерновые'])]
+    return by_crop.groupby(['Дата', 'Культура'], observed=True)['Факт_га'].sum().reset_index()
+
+# ==================== СТРАНИЦА ====================
+
+# Состояние посевов по NDVI в разгар вегетации: граница -> подпись
+NDVI_LEVELS = {0.3: 'Слабая', 0.5: 'Умеренная', 1.0: 'Хорошая'}
+
+def forecast_section(district):
+    """Прогноз урожайности по хозяйствам и культурам (analytics/yields.py)"""
+    forecast, model = load_yield_forecast(district)
+    forecast = forecast.dropna(subset=['Прогноз_ц_га']) if not forecast.empty else forecast
+    if forecast.empty:
+        return
+    st.subheader("🔮 Прогноз урожайности")
+    if model.columns:
+        st.caption(f"Модель обучена на {model.n_train} фактических урожаях хозяйств; интервал — 90%.")
+    else:
+        st.caption("Фактических урожаев для обучения пока нет (файлы УРОЖАЙНОСТЬ_*.csv) — прогноз равен "
+                   "средней урожайности культуры, интервал 90% — по обычному разбросу урожаев год к году.")
+
+    tonnes = ['Сбор_т', 'Сбор_нижняя_т', 'Сбор_верхняя_т']
+    by_crop = forecast.groupby('Культура', as_index=False)[tonnes].sum().sort_values('Сбор_т', ascending=False)
+    total = by_crop[tonnes].sum()
+    col1, col2 = st.columns(2)
+    with col1:
+        # Границы хозяйств сложены — интервал для района шире фактического (с запасом)
+        st.metric(f"Валовой сбор {forecast['Год'].max()}", f"{total['Сбор_т']:,.0f} т".replace(',', ' '),
+                  help=f"Интервал: {total['Сбор_нижняя_т']:,.0f} – {total['Сбор_верхняя_т']:,.0f} т".replace(',', ' '))
+    with col2:
+        area = forecast['Факт_га'].sum()
+        st.metric("Средняя урожайность", f"{total['Сбор_т'] * 10 / area:.1f} ц/га" if area else "—")
+    show_chart(create_harvest_chart(by_crop))
+
+    table = forecast[['Хозяйство', 'Культура', 'Факт_га', 'Прогноз_ц_га', 'Нижняя_ц_га', 'Верхняя_ц_га', 'Сбор_т']]
+    st.dataframe(table.sort_values('Сбор_т', ascending=False).round({'Факт_га': 0, 'Сбор_т': 0}),
+                 width='stretch', hide_index=True, column_config={
+                     'Факт_га': integer_column('Факт, га'),
+                     'Прогноз_ц_га': st.column_config.NumberColumn('Прогноз, ц/га', format="%.1f"),
+                     'Нижняя_ц_га': st.column_config.NumberColumn('от', format="%.1f"),
+                     'Верхняя_ц_га': st.column_config.NumberColumn('до', format="%.1f"),
+                     'Сбор_т': integer_column('Сбор, т'),
+                 })
+
+def vegetation_section(district):
+    """Состояние посевов хозяйств по последнему безоблачному снимку"""
+    vegetation, series = load_vegetation(district)
+    if vegetation.attrs.get('pending'):
+        st.caption(f"🛰️ Необработанных снимков Sentinel-2: {vegetation.attrs['pending']} — "
+                   f"посчитайте их командой `python -m ingest.ndvi {district}`.")
+    if vegetation.empty:
+        return
+    st.subheader("🛰️ Состояние посевов (Sentinel-2)")
+    vegetation['Вегетация'] = pd.cut(vegetation['NDVI'], [-1.0, *NDVI_LEVELS], labels=list(NDVI_LEVELS.values()))
+    weak = (vegetation['Вегетация'] == NDVI_LEVELS[0.3]).sum()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Хозяйств на снимках", f"{len(vegetation)}")
+    with col2:
+        area = vegetation['Факт_га']
+        mean = (vegetation['NDVI'] * area).sum() / area.sum() if area.sum() else vegetation['NDVI'].mean()
+        st.metric(f"NDVI на {vegetation['Дата'].max():%d.%m} (по площади)", f"{mean:.2f}")
+    with col3:
+        st.metric("Слабая вегетация", f"{weak}")
+    st.dataframe(vegetation.round({'Факт_га': 0}), width='stretch', hide_index=True, column_config={
+        'Факт_га': integer_column('Факт, га'),
+        'Дата': st.column_config.DateColumn('Снимок', format="DD.MM.YYYY"),
+        'NDVI': st.column_config.NumberColumn('NDVI', format="%.2f"),
+        'Изменение': st.column_config.NumberColumn('К прошлому снимку', format="%+.2f"),
+    })
+    top = vegetation['Хозяйство'].head(8)
+    show_chart(create_ndvi_chart(series[series['Хозяйство'].isin(top)].dropna(subset=['NDVI'])))
+
+@perf.fragment
+def farms_section(district):
+    """Крупнейшие хозяйства и субсидии на гектар по фильтру: культуры, форма хозяйства, площадь.
+
+    Виджеты перезапускают только этот фрагмент, а не страницу.
+    """
+    farms = load_farm_index(district)
+    st.subheader("🏢 Хозяйства по фильтру")
+    cultures = [c.removesuffix('_факт') for c in farms if c.endswith('_факт')]
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        chosen_cultures = st.multiselect("Культура", cultures, key=f'farm_filter_cultures_{district}')
+    with col2:
+        types = st.multiselect("Форма хозяйства", sorted(farms['Тип'].unique()), key=f'farm_filter_types_{district}')
+    with col3:
+        min_area = st.number_input("Посев от, га", min_value=0, step=500, key=f'farm_filter_area_{district}')
+    picked = filter_farms(farms, tuple(chosen_cultures), tuple(types), min_area)
+    if picked.empty:
+        st.info("Под фильтр не попало ни одно хозяйство.")
+        return
+    st.caption(f"Хозяйств: {len(picked)} · посев: {picked['Факт_га'].sum():,.0f} га".replace(',', ' '))
+    show_chart(create_top_farms_chart(picked.head(10)))
+    
+    # Субсидии и посевы одних и тех же хозяйств (по таблице соответствий)
+    support = load_farm_support(district)
+    if support.empty:
+        return
+    support = support[support['Хозяйство'].isin(picked['Хозяйство'])]
+    st.subheader("💵 Субсидии на гектар посева")
+    if support.empty:
+        st.caption("Среди отобранных хозяйств нет сопоставленных с реестром субсидий.")
+        return
+    covered = support['Субсидии_тг'].sum() / support.attrs['paid_total'] * 100 if support.attrs['paid_total'] else 0
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Хозяйств с посевом и субсидиями", f"{(support['Субсидии_тг'] > 0).sum()} из {len(support)}")
+    with col2:
+        per_ha = support['Субсидии_тг'].sum() / support['Посев_га'].sum() if support['Посев_га'].sum() else 0
+        st.metric(f"Субсидий на гектар ({support.attrs['year']})", f"{per_ha:,.0f} ₸".replace(',', ' '))
+    with col3:
+        st.metric("Доля субсидий, сопоставленных с посевом", f"{covered:.0f}%")
+    table = support.drop(columns='farm_id').round({'Посев_га': 0, 'Субсидии_тг': 0, 'Субсидии_на_га_тг': 0})
+    st.dataframe(table, width='stretch', hide_index=True, column_config={
+        'Посев_га': integer_column('Посев, га'),
+        'Субсидии_тг': tenge_column('Субсидии'),
+        'Субсидии_на_га_тг': tenge_column('На гектар'),
+    })
+
+def page_crops():
+    """Страница анализа посевов"""
+    st.header("🌾 Посевные площади и культуры")
+    
+    district = current_district()
+    progress = load_sowing_data(district)
+    crops = load_crops_data(district)
+    cube = load_rollup(district)
+    year = last_year(cube, 'Факт_га')
+    if crops.empty or year is None:
+        st.info("Данные о посевах по району не загружены.")
+        return
+    
+    if progress.empty:
+        st.success("✅ **Данные из файла**: ПОСЕВ_АРШАЛЫ_факт_2025.xlsx (лист '20 июня 2025 (итог)')")
+    else:
+        last_sheet = progress.loc[progress['Дата'].idxmax(), 'Лист']
+        st.success(f"✅ **Данные из файла**: книга посевов, {progress['Лист'].nunique()} отчётных листов (последний — '{last_sheet}')")
+    
+    # Итоги книги — из куба
+    total = cells(cube, Год=year).iloc[0]
+    plan, fact, farms = total['План_га'], total['Факт_га'], total['Хозяйств']
+    sums = culture_sums(cube, year)
+    wheat = sums.get('Пшеница', 0)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("План посева", f"{plan:,.0f} га".replace(',', ' '))
+    with col2:
+        st.metric("Факт посева", f"{fact:,.0f} га".replace(',', ' '), f"{(fact / plan - 1) * 100:+.1f}%" if plan else None)
+    with col3:
+        st.metric("Пшеница (факт)", f"{wheat:,.0f} га".replace(',', ' '), f"{wheat / fact * 100:.0f}% от всех" if fact else None)
+    with col4:
+        st.metric("Хозяйств", f"{farms:.0f}" if pd.notna(farms) else "н/д")
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Структура посевов (факт)")
+        
+        show_chart(create_crop_structure_chart(sums))
+    
+    # Динамика по отчётным листам книги
+    with col2:
+        if not progress.empty:
+            st.subheader("📈 Ход посевной по датам")
+            show_chart(create_sowing_progress_chart(sowing_by_date(progress)))
+    
+    farms_section(district)
+    vegetation_section(district)
+    forecast_section(district)
+    
+    # Оценки потенциала сделаны только для Аршалынского района
+    if district != DEFAULT_DISTRICT:
+        return
+    
+    # Детальная таблица с возможностью добавленной стоимости
+    st.subheader("💡 Потенциал локализации по культурам")
+    
+    potential = pd.DataFrame({
+        'Культура': ['Пшеница', 'Ячмень', 'Масличные', 'Кормовые', 'Горох'],
+        'Площадь_га': [sums.get(c, 0) for c in ['Пшеница', 'Ячмень', 'Масличные', 'Кормовые', 'Горох']],
+        'Текущая_переработка_%': ['~15% *', '~10% *', '~5% *', '~60% *', '~0% *'],
+        'Потенциал_переработки': ['Мука, макароны, хлеб', 'Крупа, солод, корма', 
+                                   'Масло, жмых', 'Комбикорма', 'Консервация, заморозка'],
+        'Инвестиции_нужны_млн': [500, 200, 300, 50, 150],
+        'Доп_рабочие_места': [50, 20, 30, 10, 15]
+    })
+    
+    st.dataframe(potential, width='stretch')
+    st.caption("* Оценочные данные — требуют верификации через опрос перерабатывающих предприятий")
@@ -0,0 +1,213 @@
+"""Страница «🏠 Обзор»"""
+
+import json
+
+import pandas as pd
+import plotly.colors
+import plotly.graph_objects as go
+import streamlit as st
+
+from charts.cache import cached_figure, show_chart
+from config import DEFAULT_DISTRICT
+from ingest.parcels import MAP_HEIGHT, extent, feature_collection, fit_zoom, level_for, viewport, visible
+from loaders import current_district, load_district_profile, load_investment_projects, load_parcels
+import perf
+
+# Раскраска участков: показатель -> (подпись, шкала, диапазон); культура — отдельными слоями
+PARCEL_COLORS = {
+    'Культура': ('Культура', None, None),
+    'Выполнение_%': ('Выполнение плана посева, %', 'RdYlGn', (50, 150)),
+    'Субсидии_на_га_тг': ('Субсидии на гектар, ₸', 'Blues', None),
+}
+NO_DATA = 'Нет данных'
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_land_structure_chart(land_data):
+    """Структура сельхозугодий"""
+    # go.Pie вместо px.pie: plotly.express не нужен для первой страницы
+    fig = go.Figure(go.Pie(labels=land_data['Тип'], values=land_data['Площадь'],
+                           marker_colors=['#2E86AB', '#28A745', '#FFC107']))
+    fig.update_layout(title='Структура сельхозугодий', height=300)
+    return fig
+
+@cached_figure
+def create_gap_chart(problem_data):
+    """Gap-анализ: текущие и целевые значения индикаторов"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Текущее %', x=problem_data['Показатель'], 
+                         y=problem_data['Текущее'], marker_color='#DC3545'))
+    fig.add_trace(go.Bar(name='Целевое %', x=problem_data['Показатель'], 
+                         y=problem_data['Целевое'], marker_color='#28A745'))
+    fig.update_layout(barmode='group', height=300, title='Gap-анализ локализации')
+    return fig
+
+@cached_figure
+def create_parcel_map(layers, color, center, zoom):
+    """Участки хозяйств на карте: слой — (название, GeoJSON, свойства участков); без данных — серым"""
+    label, scale, bounds = PARCEL_COLORS[color]
+    palette = plotly.colors.qualitative.Set2
+    fig = go.Figure()
+    for i, (name, geojson, parcels) in enumerate(layers):
+        value = parcels[color]
+        hover = (parcels['Хозяйство'].fillna('—') + '<br>' + parcels['Культура'].fillna('—') + '<br>'
+                 + parcels['Площадь_га'].round(0).map('{:,.0f} га'.format).str.replace(',', ' '))
+        if scale and name != NO_DATA:
+            hover += '<br>' + label + ': ' + value.round(0).map('{:,.0f}'.format).str.replace(',', ' ')
+            style = dict(z=value, colorscale=scale, colorbar=dict(title=label),
+                         zmin=bounds[0] if bounds else None, zmax=bounds[1] if bounds else None)
+        else:
+            fill = '#BBBBBB' if name == NO_DATA else palette[i % len(palette)]
+            style = dict(z=[0] * len(parcels), colorscale=[[0, fill], [1, fill]], showscale=False, showlegend=True)
+        fig.add_trace(go.Choroplethmap(geojson=json.loads(geojson), locations=parcels['Участок'], name=name,
+                                       hovertext=hover, hoverinfo='text', marker_line_width=0.5, **style))
+    fig.update_layout(map=dict(style='carto-positron', center=dict(lon=center[0], lat=center[1]), zoom=zoom),
+                      height=MAP_HEIGHT, margin=dict(l=0, r=0, t=0, b=0), legend=dict(title=label))
+    return fig
+
+# ==================== КАРТА ====================
+
+@perf.fragment
+def parcel_map(district):
+    """Карта участков хозяйств: культура, выполнение плана посева или субсидии на гектар.
+
+    Виджеты перезапускают только этот фрагмент. В браузер уходят участки,
+    видимые в окне карты (R-дерево), с геометрией, упрощённой для масштаба.
+    """
+    try:
+        parcels = load_parcels(district)
+    except ImportError:
+        st.caption("🗺️ Для карты участков нужен shapely: `pip install shapely`.")
+        return
+    if parcels is None:
+        return
+    props = parcels.props
+    st.subheader("🗺️ Участки хозяйств")
+    farms = sorted(props['Хозяйство'].dropna().unique())
+    col1, col2, col3 = st.columns([2, 2, 2])
+    with col1:
+        color = st.selectbox("Раскраска", list(PARCEL_COLORS), format_func=lambda c: PARCEL_COLORS[c][0],
+                             key=f'parcel_color_{district}')
+    with col2:
+        focus = st.selectbox("Хозяйство", [None] + farms, format_func=lambda f: "Весь район" if f is None else f,
+                             key=f'parcel_focus_{district}')
+    bounds = extent(parcels, None if focus is None else (props['Хозяйство'] == focus).to_numpy())
+    fit = fit_zoom(bounds)
+    with col3:
+        # Масштаб по умолчанию — чтобы район или хозяйство целиком поместились в окно;
+        # участок в сотню метров помещается только на 17–18
+        zoom = st.select_slider("Масштаб", list(range(max(fit - 1, 0), max(fit, 16) + 1)), value=fit,
+                                key=f'parcel_zoom_{district}_{focus}')
+    center = ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2)
+    ids, shapes = visible(parcels, viewport(center, zoom), zoom)
+
+    shown = props.iloc[ids]
+    value = shown[color]
+    groups = value.fillna(NO_DATA) if PARCEL_COLORS[color][1] is None else value.isna().map({True: NO_DATA, False: ''})
+    layers = []
+    for name in sorted(groups.unique(), key=lambda g: (g == NO_DATA, g)):
+        mask = (groups == name).to_numpy()
+        layers.append((name, feature_collection(ids[mask], shapes[mask]), shown[mask]))
+    show_chart(create_parcel_map(layers, color, center, zoom))
+    level = level_for(zoom)
+    st.caption(f"На карте {len(ids)} из {len(props)} участков · геометрия "
+               + ("исходная" if level is None else f"упрощена до пикселя масштаба {level}")
+               + " · участки вне окна и меньше пикселя не передаются")
+
+# ==================== СТРАНИЦА ====================
+
+def page_overview():
+    """Главная страница - обзор"""
+    profile = load_district_profile(current_district())
+    
+    st.markdown(f'<p class="main-header">🌾 {profile["name"]}</p>', unsafe_allow_html=True)
+    st.markdown('<p class="sub-header">Локализация добавленной стоимости: Smart Governance и территориальный эффект</p>', unsafe_allow_html=True)
+    
+    if 'population' not in profile:
+        st.info("Паспорт района ещё не загружен — доступны субсидии, посевы и сравнение районов.")
+        return
+    
+    def fmt(key, unit=""):
+        value = profile.get(key)
+        return f"{value:,} {unit}".strip() if value is not None else "н/д"
+    
+    # Ключевые метрики
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🏘️ Население", fmt('population', 'чел'), "↑ 0.3%")
+    with col2:
+        st.metric("🚗 До Астаны", fmt('distance_to_astana', 'км'), "Ключевое преимущество")
+    with col3:
+        st.metric("🌱 Пашня", fmt('arable_land_ha', 'га'))
+    with col4:
+        st.metric("🏭 Предприятия", fmt('industrial_enterprises'), "АПК + промышленность")
+    
+    st.divider()
+    
+    projects = load_investment_projects(current_district())
+    if not projects.empty:
+        st.subheader("💼 Инвестиционные проекты")
+        cols = st.columns(3)
+        cols[0].metric("Проектов", len(projects))
+        cols[1].metric("Стоимость", f"{projects['Стоимость_млн_тг'].sum():,.0f} млн ₸")
+        cols[2].metric("Рабочих мест", f"{projects['Рабочих_мест'].sum():,}")
+        st.dataframe(projects, width='stretch', hide_index=True,
+                     column_config={'Стоимость_млн_тг': st.column_config.NumberColumn("Стоимость, млн ₸", format="%.1f")})
+        st.divider()
+    
+    parcel_map(current_district())
+    
+    if current_district() != DEFAULT_DISTRICT:
+        return
+    
+    # Два столбца: карта + ключевая проблема
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.subheader("📍 Географическое положение")
+        st.info("""
+        **Стратегическое преимущество**: 71 км до столицы
+        
+        Район находится в уникальной позиции для:
+        - Прямых поставок в Астану
+        - Коротких цепочек поставок
+        - Пригородного агробизнеса
+        - Агротуризма выходного дня
+        """)
+        
+        # Показываем структуру земель
+        land_data = pd.DataFrame({
+            'Тип': ['Пашня', 'Пастбища', 'Прочие с/х угодья'],
+            'Площадь': [238500, 275300, 5600]
+        })
+        show_chart(create_land_structure_chart(land_data))
+    
+    with col2:
+        st.subheader("⚠️ Ключевая проблема")
+        st.markdown("""
+        <div class="warning-box">
+        <h4>Утечка добавленной стоимости</h4>
+        <p>Аршалынский район производит значительный объём агропродукции, но большая часть 
+        добавленной стоимости создаётся за пределами района:</p>
+        <ul>
+        <li>🌾 <b>~85% зерна</b> вывозится без переработки *</li>
+        <li>🥩 <b>~80% мяса</b> перерабатывается в Астане/области *</li>
+        <li>🥛 <b>~95% молока</b> уходит на переработку за пределы района *</li>
+        <li>💰 Фермер получает <b>~15-25%</b> от конечной цены *</li>
+        </ul>
+        <div class="estimate-note">
+        * <b>Оценочные данные</b> — требуют верификации через опрос СХТП района. 
+        Методика расчёта: (Объём производства - Объём местной переработки) / Объём производства × 100%
+        </div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Визуализация проблемы
+        problem_data = pd.DataFrame({
+            'Показатель': ['Доля фермера', 'Местная переработка', 'Цифровизация', 'Кооперация'],
+            'Текущее': [18, 15, 12, 20],
+            'Целевое': [35, 50, 60, 50]
+        })
+        
+        show_chart(create_gap_chart(problem_data))
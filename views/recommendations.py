@@ -0,0 +1,98 @@
+"""Страница «📝 Рекомендации»"""
+
+import streamlit as st
+
+# Вкладка -> текст (Markdown); тот же текст входит в отчёты районов (tools/export_reports.py)
+RECOMMENDATIONS = {
+    "🏛️ Для Сената/МСХ": """
+## Рекомендации для Сената Парламента РК и МСХ
+
+### 1. Нормативное регулирование
+
+| Мера | Описание | Ожидаемый эффект |
+|------|----------|------------------|
+| **Условные субсидии** | Привязка части субсидий к условию местной переработки (≥30%) | +15% локализации |
+| **Стандарт данных АПК** | Обязательный цифровой учёт для получателей господдержки | Прозрачность цепочек |
+| **Кооперативные льготы** | Налоговые преференции для агрокооперативов | Рост кооперации на 50% |
+
+### 2. Инвестиционная политика
+
+- 🏭 **Программа "Переработка на месте"**: Субсидирование до 50% стоимости перерабатывающего оборудования для пригородных районов
+- 🌐 **Цифровая инфраструктура**: Обеспечение 100% покрытия сельских территорий широкополосным интернетом
+- 📊 **Пилотный проект Smart Governance**: Аршалынский район как модельная территория
+
+### 3. Институциональные изменения
+
+- Создание **Агентства данных АПК** при МСХ
+- Включение **индикаторов локализации** в систему оценки акимов
+- Разработка **методики расчёта территориального эффекта** субсидий
+""",
+    "🏢 Для Акимата": """
+## Рекомендации для Акимата Аршалынского района
+
+### Краткосрочные (2026)
+
+1. **Создание цифрового реестра СХТП**
+   - Интеграция данных из всех источников
+   - Геопривязка земельных участков
+   - Открытый дашборд для мониторинга
+
+2. **Запуск пилотного кооператива "Аршалы-Агро"**
+   - Объединение 10-15 хозяйств
+   - Совместная логистика в Астану
+   - Цифровой учёт и прозрачное распределение
+
+3. **Маркетинговая платформа "Продукты Аршалы"**
+   - Бренд местной продукции
+   - Договоры с HoReCa Астаны
+   - Присутствие на маркетплейсах
+
+### Среднесрочные (2027-2028)
+
+1. **Инвестиции в переработку**
+   - Модернизация мельниц (загрузка с 40% до 80%)
+   - Мини-цех молокопереработки
+   - Убойный цех с холодильником
+
+2. **Smart Village пилот**
+   - IoT-мониторинг в 5 хозяйствах
+   - Агрометеостанции
+   - Прогнозная аналитика урожайности
+""",
+    "🌾 Для фермеров": """
+## Практические шаги для фермеров
+
+### Немедленные действия
+
+✅ **Цифровой учёт**: Перейти с бумаги на электронный учёт (даже Excel — это начало)
+
+✅ **Кооперация**: Объединиться с соседями для совместных закупок и продаж
+
+✅ **Прямые каналы**: Найти 2-3 прямых покупателя в Астане (рестораны, магазины)
+
+✅ **Качество и прослеживаемость**: Фиксировать происхождение продукции
+
+### Что это даёт?
+
+| Действие | Эффект для фермера |
+|----------|-------------------|
+| Прямые продажи в Астану | +15-25% к цене |
+| Участие в кооперативе | -20% затраты на логистику |
+| Цифровой учёт | Доступ к кредитам и субсидиям |
+| Местная переработка | +30-50% к стоимости продукции |
+
+### Контакты для поддержки
+
+- 📞 Акимат района: (отдел с/х)
+- 🌐 Портал субсидий: qoldau.kz
+- 🤝 Палата предпринимателей: Атамекен
+""",
+}
+
+def page_recommendations():
+    """Страница рекомендаций"""
+    st.header("📝 Рекомендации для Сената")
+    
+    for tab, text in zip(st.tabs(list(RECOMMENDATIONS)), RECOMMENDATIONS.values()):
+        with tab:
+            st.markdown(text)
@@ -0,0 +1,171 @@
+"""Страница «🖥️ Smart Governance»"""
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from charts.cache import cached_figure, show_chart
+
+# Индикаторы локализации (оценки): текущее значение, цель, подпись
+INDICATORS = [
+    (18, 35, "Доля фермера в цене (%)"),
+    (15, 50, "Местная переработка (%)"),
+    (12, 60, "Цифровизация АПК (%)"),
+]
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_localization_gauge(current_value, target_value, title):
+    """Индикатор-спидометр для коэффициента локализации"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=current_value,
+        delta={'reference': target_value, 'relative': True},
+        title={'text': title, 'font': {'size': 16}},
+        gauge={
+            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
+            'bar': {'color': "#2E86AB"},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 30], 'color': '#ffcdd2'},
+                {'range': [30, 50], 'color': '#fff9c4'},
+                {'range': [50, 100], 'color': '#c8e6c9'}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': target_value
+            }
+        }
+    ))
+    fig.update_layout(height=250, margin=dict(l=20, r=20, t=50, b=20))
+    return fig
+
+@cached_figure
+def create_roadmap_chart(stages):
+    """Дорожная карта: рост коэффициента локализации"""
+    fig = px.timeline(
+        stages,
+        x_start='Начало', x_end='Конец', y='Этап',
+        color='К_локализации',
+        title='Дорожная карта: рост коэффициента локализации'
+    )
+    fig.update_layout(height=250)
+    return fig
+
+# ==================== СТРАНИЦА ====================
+
+def page_smart_governance():
+    """Страница Smart Governance"""
+    st.header("🖥️ Smart Governance для локализации")
+    
+    # Индикаторы
+    st.subheader("📈 Текущие индикаторы локализации")
+    
+    for col, indicator in zip(st.columns(len(INDICATORS)), INDICATORS):
+        with col:
+            show_chart(create_localization_gauge(*indicator))
+    
+    st.divider()
+    
+    # Компоненты Smart Governance
+    st.subheader("🔧 Компоненты Smart Governance системы")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        ### 📊 1. Платформа данных
+        
+        **Текущее состояние:** Фрагментированные данные в Excel
+        
+        **Целевое состояние:**
+        - 🗺️ Геоинформационная система угодий
+        - 📡 IoT-мониторинг посевов (спутники + датчики)
+        - 💹 Рыночные цены в реальном времени
+        - 📋 Единый реестр СХТП с аналитикой
+        
+        **Эффект для локализации:**
+        - Прозрачность цепочек стоимости
+        - Выявление "узких мест" 
+        - Обоснование инвестиций в переработку
+        """)
+        
+        st.markdown("""
+        ### 🤝 2. Платформа кооперации
+        
+        **Текущее состояние:** Слабая горизонтальная интеграция
+        
+        **Целевое состояние:**
+        - 🏪 Цифровой кооператив "Аршалы-Агро"
+        - 📦 Совместная логистика до Астаны
+        - 🏭 Коллективные инвестиции в переработку
+        - 📊 Прозрачный учёт и распределение прибыли
+        
+        **Эффект для локализации:**
+        - Масштаб для переработки
+        - Переговорная сила с закупщиками
+        - Общие бренды
+        """)
+    
+    with col2:
+        st.markdown("""
+        ### 🎯 3. Data-driven субсидирование
+        
+        **Текущее состояние:** Субсидии без условий локализации
+        
+        **Целевое состояние:**
+        - 📍 Привязка к местной переработке
+        - 📈 KPI эффективности в реальном времени
+        - 🔄 Адаптивное распределение по результатам
+        - 🤖 ИИ-рекомендации по оптимизации
+        
+        **Эффект для локализации:**
+        - Стимул к переработке на месте
+        - Измеримый территориальный эффект
+        """)
+        
+        st.markdown("""
+        ### 🛒 4. Платформа "Аршалы → Астана"
+        
+        **Текущее состояние:** Посредники забирают маржу
+        
+        **Целевое состояние:**
+        - 🚚 B2B: прямые поставки в HoReCa Астаны
+        - 🛍️ B2C: "Фермерский рынок Аршалы" онлайн
+        - 📱 Приложение с прослеживаемостью
+        - 🚜 Оптимизированная логистика (71 км!)
+        
+        **Эффект для локализации:**
+        - +15-20% к цене фермера
+        - Короткие цепочки
+        - Бренд территории
+        """)
+    
+    st.divider()
+    
+    # Дорожная карта
+    st.subheader("🗺️ Дорожная карта внедрения")
+    
+    roadmap = pd.DataFrame({
+        'Этап': ['Пилот', 'Масштабирование', 'Зрелость'],
+        'Срок': ['2026', '2027-2028', '2029-2030'],
+        'Фокус': ['Платформа данных + 1 кооператив', 
+                  'Все СХТП + переработка', 
+                  'Полная экосистема Smart Governance'],
+        'Инвестиции_млн_тг': [50, 300, 500],
+        'Ожидаемый_К_локализации_%': [25, 40, 55]
+    })
+    
+    show_chart(create_roadmap_chart(pd.DataFrame({
+        'Этап': ['Пилот', 'Масштабирование', 'Зрелость'],
+        'Начало': ['2026-01-01', '2027-01-01', '2029-01-01'],
+        'Конец': ['2026-12-31', '2028-12-31', '2030-12-31'],
+        'К_локализации': [25, 40, 55]
+    })))
+    
+    st.dataframe(roadmap, width='stretch')
@@ -0,0 +1,277 @@
+"""Страница «💵 Субсидии»"""
+
+import math
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+
+from charts.cache import cached_figure, show_chart
+from analytics.concentration import LORENZ_POINTS
+from analytics.subsidy_filter import select
+from loaders import (
+    current_district,
+    get_store,
+    load_concentration,
+    load_subsidies_totals,
+    load_subsidy_index,
+)
+import perf
+from store import RECIPIENT_SORT
+from views._format import integer_column, percent_column, tenge_column
+
+PAGE_SIZES = (25, 50, 100)
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_subsidy_analysis(by_type, by_program):
+    """Анализ субсидий: суммы по типу получателя и по программе"""
+    fig = make_subplots(rows=1, cols=2, 
+                        subplot_titles=('По типу получателя', 'По программе'),
+                        specs=[[{'type': 'pie'}, {'type': 'pie'}]])
+    
+    # По типу
+    fig.add_trace(go.Pie(labels=by_type['Тип'], values=by_type['Сумма_тг'], 
+                         name="По типу", hole=0.4), row=1, col=1)
+    
+    # По программе
+    fig.add_trace(go.Pie(labels=by_program['Программа'], values=by_program['Сумма_тг'],
+                         name="По программе", hole=0.4), row=1, col=2)
+    
+    fig.update_layout(height=350, showlegend=True)
+    return fig
+
+@cached_figure
+def create_top_recipients_chart(top10):
+    """Крупнейшие получатели субсидий"""
+    fig = px.bar(top10, x='Сумма_тг', y='Получатель', orientation='h',
+                 color='Программа',
+                 title='Крупнейшие получатели субсидий')
+    fig.update_layout(height=400, yaxis={'categoryorder':'total ascending'})
+    return fig
+
+@cached_figure
+def create_lorenz_chart(curves):
+    """Кривые Лоренца: доля субсидий у беднейших p% получателей"""
+    fig = px.line(curves, x='Доля_получателей_%', y='Доля_субсидий_%', color='Группа',
+                  title='Кривые Лоренца')
+    fig.add_trace(go.Scatter(x=[0, 100], y=[0, 100], mode='lines', name='Равномерно',
+                             line=dict(color='#999999', dash='dash')))
+    fig.update_layout(height=380, xaxis_title='Получатели, % (по возрастанию суммы)',
+                      yaxis_title='Субсидии, %')
+    return fig
+
+# ==================== КОНЦЕНТРАЦИЯ ====================
+
+def lorenz_curves(conc):
+    """Кривые района в целом и по типам получателей — длинной таблицей для графика"""
+    rows = conc[conc['Измерение'].isin(['Все', 'Тип'])]
+    return pd.DataFrame({
+        'Группа': rows['Значение'].repeat(len(LORENZ_POINTS)).to_numpy(),
+        'Доля_получателей_%': list(LORENZ_POINTS * 100) * len(rows),
+        'Доля_субсидий_%': [v * 100 for curve in rows['Лоренц'] for v in curve],
+    })
+
+def concentration_section(conc):
+    """Показатели концентрации и кривые Лоренца"""
+    st.subheader("📐 Концентрация субсидий")
+    if conc.empty:
+        st.info("В реестре нет выплат с суммой.")
+        return
+    overall = conc[conc['Измерение'] == 'Все'].iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Индекс Херфиндаля (HHI)", f"{overall['HHI']:,.0f}".replace(',', ' '),
+                  help="Сумма квадратов долей получателей в %: до 1 500 — низкая, свыше 2 500 — высокая")
+    with col2:
+        st.metric("Коэффициент Джини", f"{overall['Джини']:.2f}", help="0 — поровну, 1 — всё у одного")
+    with col3:
+        st.metric("Доля топ-10 получателей", f"{overall['Топ10_%']:.0f}%")
+    with col4:
+        st.metric("Доля крупнейшего", f"{overall['Топ1_%']:.0f}%")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        show_chart(create_lorenz_chart(lorenz_curves(conc)))
+    with col2:
+        table = conc[conc['Измерение'] != 'Все'].drop(columns='Лоренц')
+        table = table.sort_values(['Измерение', 'Сумма_тг'], ascending=[False, False])
+        table['Сумма_тг'] = table['Сумма_тг'].round(0)
+        st.dataframe(table[['Измерение', 'Значение', 'Получателей', 'Доля_%', 'Джини', 'Топ10_%']],
+                     width='stretch', hide_index=True, column_config={
+                         'Доля_%': percent_column('Доля суммы'),
+                         'Джини': st.column_config.NumberColumn(format="%.2f"),
+                         'Топ10_%': percent_column('Топ-10'),
+                     })
+
+def concentration_insight(conc):
+    """Вывод о концентрации для блока выводов: по данным, а не по оценке"""
+    if conc.empty:
+        return "нет данных о выплатах"
+    by_type = conc[conc['Измерение'] == 'Тип'].set_index('Значение')['Доля_%']
+    overall = conc[conc['Измерение'] == 'Все'].iloc[0]
+    lead = f"{by_type.max():.0f}% субсидий получают {by_type.idxmax()}, " if not by_type.empty else ""
+    return f"{lead}топ-10 получателей — {overall['Топ10_%']:.0f}% суммы (Джини {overall['Джини']:.2f})"
+
+# ==================== ФИЛЬТРЫ ====================
+
+@perf.fragment
+def subsidy_filters(district, year):
+    """Выплаты по году, типу, программе и минимальной сумме.
+
+    Виджеты перезапускают только этот фрагмент, а не страницу; отбор —
+    по отсортированному индексу реестра (analytics/subsidy_filter.py).
+    """
+    st.subheader("🎛️ Выплаты по фильтру")
+    index = load_subsidy_index(district)
+    if index.empty:
+        st.info("В реестре нет выплат с суммой.")
+        return
+    years = index.years
+    col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
+    with col1:
+        chosen_year = st.selectbox("Год", [None] + years[::-1], key=f'subsidy_filter_year_{district}',
+                                   index=years[::-1].index(year) + 1 if year in years else 0,
+                                   format_func=lambda y: "Все годы" if y is None else str(y))
+    with col2:
+        types = st.multiselect("Тип получателя", index.types, key=f'subsidy_filter_types_{district}')
+    with col3:
+        programs = st.multiselect("Программа", index.programs, key=f'subsidy_filter_programs_{district}')
+    with col4:
+        min_amount = st.number_input("Выплата от, тыс ₸", min_value=0, step=100,
+                                     key=f'subsidy_filter_min_{district}')
+    if not get_store().years('subsidies', district):
+        st.caption("По выборке топ-10 получателей — полный реестр появится после загрузки файлов.")
+
+    picked = select(index, chosen_year, tuple(types), tuple(programs), min_amount * 1000)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Сумма выплат", f"{picked.amount / 1e6:.1f} млн ₸")
+    with col2:
+        st.metric("Выплат", f"{picked.payments}")
+    with col3:
+        st.metric("Получателей", f"{picked.recipients}")
+    if not picked.payments:
+        st.info("Под фильтр не попала ни одна выплата.")
+        return
+
+    show_chart(create_subsidy_analysis(picked.by_type, picked.by_program))
+    st.subheader("🏆 Топ-10 получателей")
+    show_chart(create_top_recipients_chart(picked.top))
+
+# ==================== РЕЕСТР ====================
+
+def recipient_explorer(district):
+    """Реестр получателей: фильтр, сортировка и страницы считаются в хранилище,
+    в браузер уходит только текущая страница"""
+    st.subheader("🔎 Реестр получателей")
+    store = get_store()
+    years = store.years('subsidies', district)
+    if not years:
+        st.caption("Полный реестр появится после загрузки файлов `<Район>__<год>_.xlsx`.")
+        return
+
+    col1, col2, col3, col4 = st.columns([1, 2, 2, 2])
+    with col1:
+        year = st.selectbox("Год", [None] + years[::-1], index=1,
+                            format_func=lambda y: "Все годы" if y is None else str(y))
+    types, programs = store.subsidy_facets(district, year)
+    with col2:
+        search = st.text_input("Получатель или БИН", placeholder="Поиск...")
+    with col3:
+        chosen_types = st.multiselect("Тип", types)
+    with col4:
+        chosen_programs = st.multiselect("Программа", programs)
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort = st.selectbox("Сортировка", list(RECIPIENT_SORT))
+    with col2:
+        descending = st.toggle("По убыванию", value=sort != 'Получатель')
+    with col3:
+        size = st.selectbox("Строк на странице", PAGE_SIZES, index=1)
+
+    # Новый фильтр — снова с первой страницы
+    filters = (district, year, search, tuple(chosen_types), tuple(chosen_programs), sort, descending, size)
+    if st.session_state.get('recipients_filters') != filters:
+        st.session_state['recipients_filters'] = filters
+        st.session_state['recipients_page'] = 1
+
+    def fetch(page_no):
+        return store.recipients(district, year, chosen_types, chosen_programs, search.strip(),
+                                sort, descending, limit=size, offset=(page_no - 1) * size)
+
+    page_no = st.session_state.get('recipients_page', 1)
+    rows, total = fetch(page_no)
+    n_pages = max(1, math.ceil(total / size))
+    if page_no > n_pages:
+        page_no = st.session_state['recipients_page'] = n_pages
+        rows, total = fetch(page_no)
+
+    rows['Сумма_тг'] = rows['Сумма_тг'].round(0)
+    st.dataframe(rows, width='stretch', hide_index=True, column_config={
+        'Сумма_тг': tenge_column('Сумма'),
+        'Выплат': integer_column(),
+        'Последняя_выплата': st.column_config.DateColumn('Последняя выплата', format="DD.MM.YYYY"),
+    })
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Страница", min_value=1, max_value=n_pages, key='recipients_page')
+    with col2:
+        first = (page_no - 1) * size + 1 if total else 0
+        st.caption(f"Получатели {first}–{first + len(rows) - 1 if total else 0} из {total} · страниц: {n_pages}")
+
+# ==================== СТРАНИЦА ====================
+
+def page_subsidies():
+    """Страница анализа субсидий"""
+    st.header("💵 Анализ государственных субсидий")
+    
+    district = current_district()
+    totals = load_subsidies_totals(district)
+    if totals is None:
+        st.info("Реестры субсидий по району не загружены.")
+        return
+    
+    st.success(f"✅ **Данные из файла**: {totals['source']}")
+    
+    # Ключевые метрики — из куба итогов
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(f"Общий объём субсидий {totals['year']}", f"{totals['total'] / 1e6:.1f} млн ₸")
+    with col2:
+        st.metric("Количество получателей", f"{totals['recipients_count']}")
+    with col3:
+        st.metric("Крупнейший получатель", totals['top_recipient'])
+    
+    st.divider()
+    subsidy_filters(district, totals['year'])
+    
+    conc = load_concentration(district, totals['year'])
+    st.subheader("🎯 Эффективность субсидирования")
+    st.markdown(f"""
+    <div class="insight-box">
+    <h4>Выводы для Smart Governance:</h4>
+    <ol>
+    <li><b>Концентрация:</b> {concentration_insight(conc)}</li>
+    <li><b>Программы:</b> Инвестиционные субсидии преобладают</li>
+    <li><b>Gap:</b> Мало субсидий на переработку и кооперацию</li>
+    </ol>
+    <h4>Рекомендации:</h4>
+    <ul>
+    <li>Условие локальной переработки для субсидий</li>
+    <li>Бонусы за участие в кооперативах</li>
+    <li>Data-driven мониторинг эффективности</li>
+    </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.divider()
+    concentration_section(conc)
+    
+    st.divider()
+    recipient_explorer(district)
@@ -0,0 +1,191 @@
+"""Страница «🔗 Цепочки стоимости»"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+
+from charts.cache import cached_figure, show_chart
+from charts.sankey import build_sankey, value_chain_paths
+from analytics import allocate
+from loaders import (
+    current_district,
+    load_capacity_flows,
+    load_localization,
+    load_processing_capacity,
+    load_simulation,
+)
+from views._format import integer_column, percent_column, tenge_column
+
+# ==================== ГРАФИКИ ====================
+
+@cached_figure
+def create_sankey_diagram(flows_df, top_k=8):
+    """Диаграмма Санки для потоков продукции (charts/sankey.py)"""
+    paths = value_chain_paths(flows_df, origin='Производство Аршалы')
+    return build_sankey(paths, ['Район', 'Продукция', 'Канал', 'Результат'], top_k=top_k,
+                        title="Потоки добавленной стоимости АПК Аршалынского района")
+
+@cached_figure
+def create_directions_chart(flows):
+    """Распределение продукции по направлениям сбыта"""
+    fig = px.bar(flows, x='Продукция', y=['Местная_переработка_%', 'Вывоз_в_Астану_%', 'Вывоз_другие_%'],
+                 title='Распределение продукции по направлениям (%)',
+                 barmode='stack',
+                 color_discrete_sequence=['#28A745', '#FFC107', '#DC3545'])
+    fig.update_layout(height=350)
+    return fig
+
+@cached_figure
+def create_leakage_chart(flows):
+    """Доля стоимости, уходящая из района"""
+    fig = px.bar(flows, x='Продукция', y='Потеря_стоимости_%',
+                 title='Доля стоимости, уходящая из района (%)',
+                 color='Потеря_стоимости_%',
+                 color_continuous_scale=['#28A745', '#FFC107', '#DC3545'])
+    fig.update_layout(height=350)
+    return fig
+
+@cached_figure
+def create_capacity_limit_chart(products):
+    """Местная переработка: оценка и предел при нынешних мощностях"""
+    fig = px.bar(products, x='Продукция', y=['Местная_переработка_%', 'Предел_переработки_%'],
+                 title='Местная переработка: оценка и предел мощностей (%)',
+                 barmode='group',
+                 color_discrete_sequence=['#FFC107', '#28A745'])
+    fig.update_layout(height=350)
+    return fig
+
+@cached_figure
+def create_uncertainty_chart(mc):
+    """Медианы и 90% интервалы Монте-Карло по продуктам"""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('К_локализации (%)', 'Потеря стоимости (%)'))
+    for col, (name, color) in enumerate([('К_локализации', '#28A745'), ('Потеря_стоимости', '#DC3545')], start=1):
+        fig.add_trace(go.Bar(
+            x=mc['Продукция'], y=mc[f'{name}_p50'], marker_color=color, name=name,
+            error_y=dict(type='data', symmetric=False,
+                         array=mc[f'{name}_p95'] - mc[f'{name}_p50'],
+                         arrayminus=mc[f'{name}_p50'] - mc[f'{name}_p5'])
+        ), row=1, col=col)
+    fig.update_layout(height=350, showlegend=False)
+    return fig
+
+# ==================== СТРАНИЦА ====================
+
+def capacity_section(district):
+    """Предел местной переработки при мощностях района и узкие места (analytics/allocation.py)"""
+    st.subheader("🏭 Предел локализации при нынешних мощностях")
+    capacities = load_processing_capacity(district)
+    if capacities.empty:
+        st.info("Для района нет перечня перерабатывающих мощностей.")
+        return
+    st.caption("Продукция распределяется по мельницам, элеваторам и другим предприятиям района так, "
+               "чтобы в районе осталось больше всего добавленной стоимости. Мощность можно изменить "
+               "в таблице или добавить предприятие — предел пересчитается.")
+
+    max_load = st.slider("Допустимая загрузка мощностей, %", 50, 100, 100, step=5)
+    plan = st.data_editor(
+        capacities[['Тип_переработки', 'Количество', 'Мощность', 'Мощность_т_год', 'Загрузка_%']],
+        num_rows='dynamic', hide_index=True, width='stretch', key=f'capacity_plan_{district}',
+        disabled=['Мощность'],
+        column_config={
+            'Мощность': st.column_config.TextColumn('Мощность в перечне'),
+            'Мощность_т_год': st.column_config.NumberColumn('Мощность, т/год', min_value=0, format="%,d"),
+            'Загрузка_%': percent_column('Загрузка сейчас'),
+        })
+    result = allocate(load_capacity_flows(district), plan.dropna(subset=['Тип_переработки']), max_load / 100)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("К_локализации по оценкам", f"{result.current:.1f}%")
+    with col2:
+        st.metric("Предел при мощностях", f"{result.maximum:.1f}%",
+                  delta=f"{result.maximum - result.current:+.1f} п.п.")
+    with col3:
+        st.metric("Узких мест", int(result.facilities['Узкое_место'].sum()))
+
+    products = result.products
+    show_chart(create_capacity_limit_chart(products))
+
+    over = products[products['Местная_переработка_%'] > products['Предел_переработки_%'] + 0.5]
+    if not over.empty:
+        st.warning("Оценка местной переработки выше, чем позволяют мощности: " + ", ".join(
+            f"{name} ({estimate:.0f}% при пределе {limit:.0f}%)" for name, estimate, limit
+            in zip(over['Продукция'], over['Местная_переработка_%'], over['Предел_переработки_%'])))
+
+    bottlenecks = result.facilities[result.facilities['Узкое_место']].sort_values('Теневая_цена_тг_т', ascending=False)
+    if not bottlenecks.empty:
+        st.markdown("**Узкие места** — +1 т мощности в год оставит в районе столько добавленной стоимости:")
+        st.dataframe(bottlenecks[['Тип_переработки', 'Мощность_т_год', 'Загрузка_т', 'Теневая_цена_тг_т']].round(0),
+                     hide_index=True, width='stretch', column_config={
+                         'Мощность_т_год': integer_column('Мощность, т/год'),
+                         'Загрузка_т': integer_column('Загрузка, т'),
+                         'Теневая_цена_тг_т': tenge_column('ДС на 1 т мощности'),
+                     })
+
+def page_value_chain():
+    """Страница анализа цепочек создания стоимости"""
+    st.header("🔗 Цепочки создания стоимости")
+    
+    # Предупреждение об источнике данных
+    st.warning("""
+    ⚠️ **Данные на этой странице — экспертные ОЦЕНКИ**, не из официальных источников.
+    
+    Для получения реальных данных рекомендуется:
+    - Провести опрос СХТП района о направлениях сбыта продукции
+    - Запросить данные у перерабатывающих предприятий
+    - Использовать статистику вывоза из района (акимат, таможня)
+    """)
+    
+    flows = load_localization()
+    
+    # Санки диаграмма
+    show_chart(create_sankey_diagram(flows))
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Анализ по продуктам")
+        
+        show_chart(create_directions_chart(flows))
+    
+    with col2:
+        st.subheader("💰 Потеря добавленной стоимости")
+        
+        show_chart(create_leakage_chart(flows))
+    
+    capacity_section(current_district())
+    
+    # Неопределённость экспертных оценок
+    st.subheader("🎲 Неопределённость оценок (Монте-Карло)")
+    st.caption("Каждая оценка долей и цен заменяется треугольным распределением ±разброс; "
+               "полосы — 90% интервал (5-й и 95-й перцентили).")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        share_spread = st.slider("Разброс долей направлений, ±%", 0, 100, 50, step=10)
+    with col2:
+        price_spread = st.slider("Разброс цен, ±%", 0, 50, 20, step=5)
+    with col3:
+        n_draws = st.select_slider("Число розыгрышей", [100_000, 1_000_000, 5_000_000], value=1_000_000,
+                                   format_func=lambda n: f"{n:,}".replace(',', ' '))
+    
+    mc, overall = load_simulation(share_spread / 100, price_spread / 100, n_draws)
+    st.metric("К_локализации района (медиана)", f"{overall['p50']:.1f}%",
+              help=f"90% интервал: {overall['p5']:.1f}% – {overall['p95']:.1f}%")
+    
+    show_chart(create_uncertainty_chart(mc))
+    
+    # Детальная таблица
+    st.subheader("📋 Детальные данные")
+    display_df = flows[['Продукция', 'Производство_т', 'Цена_производителя_тг', 'Цена_конечная_тг',
+                        'Маржа_посредников_%', 'Местная_переработка_%']].round(0)
+    st.dataframe(display_df, width='stretch', column_config={
+        'Производство_т': integer_column('Производство, т'),
+        'Цена_производителя_тг': tenge_column('Цена производителя'),
+        'Цена_конечная_тг': tenge_column('Цена конечная'),
+        'Маржа_посредников_%': percent_column('Маржа посредников'),
+        'Местная_переработка_%': percent_column('Местная переработка'),
+    })